@@ -1,5 +1,4 @@
 import os
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
@@ -7,9 +6,18 @@ load_dotenv('.env')
 
 class AIResponseGenerator:
     def __init__(self):
-        # Configurar la API de Google Generative AI
-        genai.configure(api_key=os.getenv('API_KEY_G'))
-        self.gen_model = genai.GenerativeModel("gemini-1.5-flash")
+        # Gemini se configura en la primera respuesta generada, no al arrancar
+        self._gen_model = None
+
+    @property
+    def gen_model(self):
+        if self._gen_model is None:
+            import google.generativeai as genai
+
+            # Configurar la API de Google Generative AI
+            genai.configure(api_key=os.getenv('API_KEY_G'))
+            self._gen_model = genai.GenerativeModel("gemini-1.5-flash")
+        return self._gen_model
     
     def generate_response(self, prompt):
         try:
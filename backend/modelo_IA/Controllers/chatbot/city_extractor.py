@@ -1,14 +1,14 @@
 import csv
 from pathlib import Path
-import spacy
 from spacy.matcher import PhraseMatcher
+from Controllers.chatbot.nlp import get_nlp
 from Controllers.chatbot.text_normalizer import TextNormalizer
 
 class CityExtractor:
     def __init__(self):
         self.base_dir = Path(__file__).parent
         self.cities_file = (self.base_dir / "../../Data/cities.txt").resolve()
-        self.nlp = spacy.load("es_core_news_sm")
+        self.nlp = get_nlp()
         self.cities = self._load_cities()
         self.matcher = self._setup_phrase_matcher()
     
@@ -28,7 +28,8 @@ class CityExtractor:
     
     def _setup_phrase_matcher(self):
         matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
-        patterns = [self.nlp(city) for city in self.cities]
+        # Con attr="LOWER" basta con tokenizar; no hace falta el pipeline completo
+        patterns = list(self.nlp.tokenizer.pipe(self.cities))
         matcher.add("CITIES", patterns)
         return matcher
     
@@ -1,6 +1,6 @@
 import re
 import json
-import spacy
+from Controllers.chatbot.nlp import get_nlp
 from Controllers.chatbot.text_normalizer import TextNormalizer
 from Utils.config import CONFIG
 from Utils.read_file import readFile
@@ -9,7 +9,7 @@ class IntentDetector:
     def __init__(self, city_extractor, time_extractor):
         self.city_extractor = city_extractor
         self.time_extractor = time_extractor
-        self.nlp = spacy.load("es_core_news_sm")
+        self.nlp = get_nlp()  # Compartido con CityExtractor
         
         # Cargar patrones desde el JSON
         path = CONFIG['RUTAS']['INTENT_PATTERNS']
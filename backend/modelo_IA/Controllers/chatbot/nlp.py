@@ -0,0 +1,19 @@
+# Controllers/chatbot/nlp.py
+import threading
+
+import spacy
+
+MODELO_SPACY = "es_core_news_sm"
+
+_nlp = None
+_lock = threading.Lock()
+
+
+def get_nlp():
+    """Modelo de spaCy cargado una sola vez y compartido por los extractores."""
+    global _nlp
+    if _nlp is None:
+        with _lock:
+            if _nlp is None:
+                _nlp = spacy.load(MODELO_SPACY)
+    return _nlp
@@ -7,3 +7,8 @@ class TextNormalizer:
         text = text.lower()
         return ''.join(c for c in unicodedata.normalize('NFD', text)
                        if unicodedata.category(c) != 'Mn')
+
+    @staticmethod
+    def normalize_city(city):
+        """Forma canónica de una ciudad (sin acentos, minúsculas y espacios simples)"""
+        return ' '.join(TextNormalizer.normalize_text(city).split())
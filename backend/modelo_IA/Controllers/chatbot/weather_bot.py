@@ -9,6 +9,7 @@ from Controllers.chatbot.intent_detector import IntentDetector
 from Controllers.chatbot.weather_data_processor import WeatherDataProcessor
 from Controllers.chatbot.ai_response_generator import AIResponseGenerator
 from Controllers.chatbot.context_manager import ContextManager
+from Utils.stage_executors import run_stage
 
 
 class WeatherBot:
@@ -28,11 +29,8 @@ class WeatherBot:
         original_message = message
         message_clean = self._clean_message(message)
         
-        # Detectar y guardar intención
-        intent = self._detect_and_store_intent(context_id, message_clean)
-        
-        # Extraer datos del mensaje
-        city, days = self._extract_location_and_time(message_clean)
+        # Intención, ciudad y días (spaCy y expresiones regulares: etapa de CPU)
+        intent, city, days = await run_stage("cpu", self._analyze_message, context_id, message_clean)
         
         self._log_processing_info(original_message,context_id, intent, city, days)
         
@@ -44,6 +42,12 @@ class WeatherBot:
         message_lower = message.lower()
         return message_lower.translate(str.maketrans("", "", string.punctuation))
 
+    def _analyze_message(self, context_id, message_clean):
+        """Detecta la intención y extrae ciudad y días."""
+        intent = self._detect_and_store_intent(context_id, message_clean)
+        city, days = self._extract_location_and_time(message_clean)
+        return intent, city, days
+
     def _detect_and_store_intent(self, context_id, message_clean):
         """Detecta la intención y la guarda en el contexto."""
         intent = self.intent_detector.detect_intent(message_clean)
@@ -64,7 +68,10 @@ class WeatherBot:
         print(f"Intent: {intent}, Last Intent: {last_intent}, Ciudad: {city}, Días: {days}")
 
     async def _handle_intent(self, intent, context_id, city, days, controller, db, user_id, message_clean):
-        """Maneja la intención usando el patrón Strategy."""
+        """Maneja la intención usando el patrón Strategy.
+
+        Las respuestas se generan con Gemini (bloqueante): corren en la etapa LLM.
+        """
         
         # Diccionario de estrategias para intenciones simples
         simple_intent_handlers = {
@@ -79,23 +86,23 @@ class WeatherBot:
         
         # Manejar intenciones simples
         if intent in simple_intent_handlers:
-            return simple_intent_handlers[intent]()
+            return await run_stage("llm", simple_intent_handlers[intent])
         
         # Manejar intenciones complejas
         if intent == "report":
             return await self._handle_report_intent(user_id, db)
         
         if intent == "affirmative":
-            return self._handle_affirmative_intent(context_id)
+            return await run_stage("llm", self._handle_affirmative_intent, context_id)
         
         if intent == "negative":
-            return {"response": self.ai_generator.generate_negative_response()}
+            return {"response": await run_stage("llm", self.ai_generator.generate_negative_response)}
         
-        if intent == "weather" or self.intent_detector.has_weather_intent(message_clean):
+        if intent == "weather" or await run_stage("cpu", self.intent_detector.has_weather_intent, message_clean):
             return await self._handle_weather_intent(context_id, city, days, controller, db, user_id)
         
         # Manejar contexto previo o respuesta por defecto
-        return self._handle_fallback_response(context_id)
+        return await run_stage("llm", self._handle_fallback_response, context_id)
 
     def _handle_farewell(self, context_id):
         """Maneja la intención de despedida."""
@@ -112,8 +119,9 @@ class WeatherBot:
         
         try:
             report_controller = ReportController()
-            report_file = report_controller.export_data_excel(db, user_id)
-            response_text = self.ai_generator.generate_report_response()
+            # Consulta y Excel en la etapa de persistencia
+            report_file = await run_stage("persistencia", report_controller.export_data_excel, db, user_id)
+            response_text = await run_stage("llm", self.ai_generator.generate_report_response)
             
             return {
                 "response": response_text,
@@ -144,13 +152,13 @@ class WeatherBot:
 
     async def _handle_weather_intent(self, context_id, city, days, controller, db, user_id):
         """Maneja las consultas del clima."""
-        # Validar y obtener ciudad
-        city = self._validate_and_get_city(context_id, city)
+        # Validar y obtener ciudad (si falta, la respuesta la genera Gemini)
+        city = await run_stage("llm", self._validate_and_get_city, context_id, city)
         if isinstance(city, dict):  # Es una respuesta de error
             return city
         
         # Validar y obtener días
-        days = self._validate_and_get_days(context_id, days, city)
+        days = await run_stage("llm", self._validate_and_get_days, context_id, days, city)
         if isinstance(days, dict):  # Es una respuesta de error
             return days
         
@@ -190,7 +198,7 @@ class WeatherBot:
                 weather_data["temp_c"], weather_data["humidity"]
             )
             
-            response = self.ai_generator.generate_response(prompt)
+            response = await run_stage("llm", self.ai_generator.generate_response, prompt)
             return {"response": response}
             
         except Exception as e:
@@ -0,0 +1,212 @@
+# fine_tuning.py - Ajuste fino incremental con las observaciones horarias nuevas
+"""
+Reentrenamiento en caliente del modelo de una versión del registro con las
+horas observadas desde la última corrida, sin volver a entrenar con todo el
+historial.
+
+- Se retoma el modelo con su optimizador (TimeSeriesModel.resume) y una tasa
+  de aprendizaje baja (CONFIG['AJUSTE_FINO']['LEARNING_RATE']); los
+  escaladores son los de la versión base, así que el espacio de entrada no cambia.
+- "Desde la última corrida" es el cursor por ciudad guardado en los
+  metadatos de la versión (observaciones_hasta): se leen solo las horas
+  posteriores, más INPUT_LENGTH horas de contexto para las primeras ventanas.
+  Si una corrida no registra versión el cursor no avanza y esas horas se
+  vuelven a usar en la siguiente (hasta MAX_HORAS por ciudad).
+- Por ciudad, las horas nuevas más recientes (VAL_SIZE) son la validación;
+  ninguna hora objetivo de entrenamiento cae en ella. Los huecos del almacén
+  cortan la serie: ninguna ventana cruza horas faltantes.
+- Se registra una versión nueva solo si el RMSE de validación mejora al de
+  la versión base.
+
+El costo depende de las horas nuevas: solo se abren los meses del almacén
+posteriores al cursor y solo se entrena sobre sus ventanas.
+
+Uso:
+    python -m Controllers.fine_tuning [--version vN] [--activar]
+"""
+
+import argparse
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from Controllers.model_registry import MODEL_FILE, SCALER_NPZ, SCALER_PKL
+from Etl.dataset import ConcatenatedWindows, WindowedSeries, column_view
+from Etl.observation_store import OBS_COLUMNS, get_observation_store
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Utils.config import CONFIG, HORA_S
+
+
+def _segments(epochs, features, min_rows):
+    """Tramos de horas consecutivas con al menos min_rows filas."""
+    cuts = np.flatnonzero(np.diff(epochs) != HORA_S) + 1
+    return [part for part in np.split(features, cuts) if len(part) >= min_rows]
+
+
+class FineTuner:
+    """
+    Ajuste fino de una versión del registro con las observaciones nuevas.
+    """
+
+    def __init__(self, registry=None, store=None):
+        """
+        Args:
+            registry: ModelRegistry. Por defecto el compartido.
+            store: HourlyObservationStore. Por defecto el compartido.
+        """
+        if registry is None:
+            from Controllers.model_registry import get_model_registry
+
+            registry = get_model_registry()
+        self.registry = registry
+        self.store = store or get_observation_store()
+
+    def new_windows(self, preprocessor, cursor):
+        """
+        Ventanas de entrenamiento y validación con las horas posteriores al cursor.
+
+        Args:
+            preprocessor: Solo se usa para construir las características.
+            cursor: {ciudad: último instante ya aprendido (segundos locales)}.
+
+        Returns:
+            Tuple[dict, dict, int]: ({'train', 'val'} ConcatenatedWindows o None,
+            nuevo cursor, horas nuevas leídas)
+        """
+        cfg = CONFIG["AJUSTE_FINO"]
+        input_length = CONFIG["SECUENCIA"]["INPUT_LENGTH"]
+        output_length = CONFIG["SECUENCIA"]["OUTPUT_LENGTH"]
+        target_idxs = [FEATURE_COLUMNS.index(col) for col in CONFIG["TARGET_COL"]]
+        parts = {"train": [], "val": []}
+        new_cursor = dict(cursor)
+        new_hours = 0
+
+        for city in self.store.cities():
+            since = cursor.get(city)
+            # Contexto: las primeras ventanas predicen la primera hora nueva
+            frame = self.store.export_training_frame(
+                [city], since_epoch=None if since is None else since - input_length * HORA_S
+            )
+            epochs = frame.index.values.astype("datetime64[s]").astype(np.int64)
+            values = frame[OBS_COLUMNS].to_numpy(dtype=np.float64)
+            if len(epochs) > cfg["MAX_HORAS"] + input_length:
+                epochs = epochs[-(cfg["MAX_HORAS"] + input_length):]
+                values = values[-(cfg["MAX_HORAS"] + input_length):]
+            nuevas = epochs[epochs > since] if since is not None else epochs[input_length:]
+            if len(nuevas) == 0:
+                continue
+            new_hours += len(nuevas)
+
+            # Las horas objetivo desde `cutoff` son de validación
+            val_hours = max(output_length, math.ceil(cfg["VAL_SIZE"] * len(nuevas)))
+            cutoff = nuevas[max(len(nuevas) - val_hours, 0)]
+            features = preprocessor.build_features(epochs, values)
+            train = epochs < cutoff
+            val = epochs >= cutoff - input_length * HORA_S
+            n_before = sum(len(p) for p in parts.values())
+            for name, mask in (("train", train), ("val", val)):
+                for segment in _segments(epochs[mask], features[mask], input_length + output_length):
+                    parts[name].append(WindowedSeries(segment, column_view(segment, target_idxs)))
+            if sum(len(p) for p in parts.values()) > n_before:
+                new_cursor[city] = int(epochs[-1])
+
+        windows = {name: ConcatenatedWindows(p) if p else None for name, p in parts.items()}
+        return windows, new_cursor, new_hours
+
+    def run(self, version=None, activate=False):
+        """
+        Ajusta la versión indicada (por defecto la activa) y registra el
+        resultado si mejora la validación.
+
+        Args:
+            version: Versión base del registro.
+            activate: Activar la versión nueva.
+
+        Returns:
+            dict | None: version (None si no mejoró), base, rmse_base, rmse y
+            horas_nuevas; None si no hay horas nuevas suficientes.
+        """
+        from Controllers.model_build import TimeSeriesModel
+
+        cfg = CONFIG["AJUSTE_FINO"]
+        base = version or self.registry.active_version() or self.registry.bootstrap()
+        if base is None:
+            raise ValueError("No hay una versión del modelo para ajustar.")
+        base_dir = self.registry.version_dir(base)
+        scaler_pkl = os.path.join(base_dir, SCALER_PKL)
+        if not os.path.exists(scaler_pkl):
+            raise ValueError(f"La versión {base} no tiene {SCALER_PKL}; no se puede ajustar.")
+
+        metadata = self.registry.metadata(base)
+        preprocessor = TimeSeriesPreprocessor().load_scalers(scaler_pkl)
+        windows, cursor, new_hours = self.new_windows(preprocessor, metadata.get("observaciones_hasta", {}))
+        if windows["train"] is None or windows["val"] is None:
+            print(f"[INFO] Horas nuevas insuficientes para ajustar {base} ({new_hours} horas)")
+            return None
+        print(f"[INFO] Ajuste fino de {base}: {new_hours} horas nuevas, "
+              f"{len(windows['train'])} ventanas de entrenamiento y {len(windows['val'])} de validación")
+
+        model = TimeSeriesModel().resume(os.path.join(base_dir, MODEL_FILE), learning_rate=cfg["LEARNING_RATE"])
+        base_metrics, _ = model.evaluate_windows(windows["val"], scaler=preprocessor, batch_size=cfg["BATCH_SIZE"])
+
+        import tensorflow as tf
+
+        stopper = tf.keras.callbacks.EarlyStopping(
+            monitor="val_loss", patience=cfg["PACIENCIA"], restore_best_weights=True
+        )
+        model.train_windows(
+            windows["train"], windows["val"], epochs=cfg["EPOCAS"], batch_size=cfg["BATCH_SIZE"],
+            scaler=preprocessor, callbacks=[stopper],
+        )
+        metrics, _ = model.evaluate_windows(windows["val"], scaler=preprocessor, batch_size=cfg["BATCH_SIZE"])
+
+        result = {
+            "version": None,
+            "base": base,
+            "rmse_base": float(base_metrics["rmse"]),
+            "rmse": float(metrics["rmse"]),
+            "horas_nuevas": new_hours,
+        }
+        if not metrics["rmse"] < base_metrics["rmse"] * (1.0 - cfg["MEJORA_MIN"]):
+            print(f"⚠️ El ajuste no mejora la validación (RMSE {result['rmse']:.4f} vs {result['rmse_base']:.4f}); "
+                  f"no se registra")
+            return result
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            model_path = os.path.join(tmp_dir, MODEL_FILE)
+            model.model.save(model_path)
+            npz = os.path.join(base_dir, SCALER_NPZ)
+            result["version"] = self.registry.register(
+                model_path,
+                scaler_pkl=scaler_pkl,
+                scaler_npz=npz if os.path.exists(npz) else None,
+                metadata={
+                    "source": "ajuste_fino",
+                    "base": base,
+                    "mae": float(metrics["mae"]),
+                    "rmse": result["rmse"],
+                    "rmse_base": result["rmse_base"],
+                    "horas_nuevas": new_hours,
+                    "observaciones_hasta": cursor,
+                },
+            )
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        if activate:
+            self.registry.set_active(result["version"])
+        print(f"✅ Ajuste fino registrado como {result['version']} "
+              f"(RMSE {result['rmse']:.4f} vs {result['rmse_base']:.4f})")
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ajuste fino con las observaciones nuevas")
+    parser.add_argument("--version", default=None, help="Versión base (por defecto la activa)")
+    parser.add_argument("--activar", action="store_true", help="Activar la versión nueva si mejora")
+    _args = parser.parse_args()
+
+    FineTuner().run(_args.version, activate=_args.activar)
@@ -0,0 +1,143 @@
+# horizon_engine.py - Pronóstico multi-día a partir de la última ventana
+"""
+Motor de horizonte: genera `hours` horas futuras partiendo solo de la última
+ventana observada (INPUT_LENGTH horas), con un despliegue autorregresivo.
+
+Cada paso ejecuta el modelo sobre la ventana actual y obtiene OUTPUT_LENGTH
+horas de temp_c y humidity. La ventana siguiente se arma con esas horas:
+- temp_c y humidity: las predicciones del paso anterior.
+- dewpoint_c: derivado de temperatura y humedad (fórmula de Magnus).
+- pressure_mb, wind_kph y wind_degree: persistencia diurna (el valor de la
+  misma hora del día anterior).
+- Características cíclicas: calculadas exactamente a partir del tiempo.
+
+El trabajo por solicitud es ceil(hours / OUTPUT_LENGTH) pasadas del modelo,
+sin importar cuánta historia haya. Se procesan varias series a la vez (eje 0)
+para que varias ciudades compartan cada pasada.
+"""
+
+import inspect
+import math
+
+import numpy as np
+
+from Etl.observation_store import OBS_COLUMNS
+from Utils.config import CONFIG, HORA_S
+
+# Constantes de Magnus (Alduchov y Eskridge, 1996)
+MAGNUS_A = 17.625
+MAGNUS_B = 243.04
+
+HORAS_DIA = 24
+
+_TEMP = OBS_COLUMNS.index("temp_c")
+_HUMIDITY = OBS_COLUMNS.index("humidity")
+_DEWPOINT = OBS_COLUMNS.index("dewpoint_c")
+
+
+def dewpoint_magnus(temp_c, humidity):
+    """
+    Punto de rocío (°C) a partir de temperatura (°C) y humedad relativa (%).
+    """
+    rh = np.clip(humidity, 1.0, 100.0)
+    gamma = np.log(rh / 100.0) + MAGNUS_A * temp_c / (MAGNUS_B + temp_c)
+    return MAGNUS_B * gamma / (MAGNUS_A - gamma)
+
+
+def history_days_needed(input_length=None):
+    """Días de history.json necesarios para armar una ventana de entrada."""
+    input_length = input_length or CONFIG["SECUENCIA"]["INPUT_LENGTH"]
+    return math.ceil(input_length / HORAS_DIA)
+
+
+class HorizonEngine:
+    """
+    Despliegue autorregresivo del modelo sobre la última ventana observada.
+    """
+
+    def __init__(self, predict_fn, scaler, preprocessor, target_names=None):
+        """
+        Args:
+            predict_fn: Inferencia sobre (n, INPUT_LENGTH, n_features) escalado; síncrona
+                        o asíncrona (p. ej. InferenceBatcher.predict).
+            scaler: CompiledScaler con los escaladores de características y objetivos.
+            preprocessor: TimeSeriesPreprocessor (para build_features).
+            target_names: Objetivos del modelo. Por defecto CONFIG['TARGET_COL'].
+        """
+        self.predict_fn = predict_fn
+        self.scaler = scaler
+        self.preprocessor = preprocessor
+        self.target_names = target_names or CONFIG["TARGET_COL"]
+        self.input_length = CONFIG["SECUENCIA"]["INPUT_LENGTH"]
+        self.steps = 0
+
+    def _features(self, epochs, values):
+        """Características escaladas de un lote de ventanas (b, input_length, n_features)."""
+        b, n = epochs.shape
+        features = self.preprocessor.build_features(
+            epochs.reshape(-1), values.reshape(b * n, -1)
+        )
+        return self.scaler.scale_features(features.reshape(b, n, -1), inplace=True)
+
+    def _next_rows(self, values, pred):
+        """
+        Observaciones de las horas predichas (b, output_length, n_obs).
+
+        `values` son las horas conocidas hasta ahora (observadas o predichas);
+        debe cubrir al menos un día.
+        """
+        n_pred = pred.shape[1]
+        # Persistencia diurna: cada hora repite la misma hora del último día conocido
+        rows = values[:, -HORAS_DIA:][:, np.arange(n_pred) % HORAS_DIA].copy()
+        temp = pred[:, :, self.target_names.index("temp_c")]
+        humidity = np.clip(pred[:, :, self.target_names.index("humidity")], 0.0, 100.0)
+        rows[:, :, _TEMP] = temp
+        rows[:, :, _HUMIDITY] = humidity
+        rows[:, :, _DEWPOINT] = dewpoint_magnus(temp, humidity)
+        return rows
+
+    async def rollout(self, epochs, values, hours):
+        """
+        Pronostica `hours` horas tras cada ventana.
+
+        Args:
+            epochs: Arreglo (b, INPUT_LENGTH) de segundos locales consecutivos.
+            values: Arreglo (b, INPUT_LENGTH, len(OBS_COLUMNS)) con las observaciones.
+            hours: Horas a pronosticar.
+
+        Returns:
+            np.ndarray: (b, hours, n_targets) en la escala original, en el orden
+            de target_names.
+        """
+        epochs = np.asarray(epochs, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if hours <= 0:
+            return np.empty((len(epochs), 0, len(self.target_names)))
+        if epochs.shape[1] != self.input_length:
+            raise ValueError(
+                f"❌ La ventana de entrada debe tener {self.input_length} horas, se recibieron {epochs.shape[1]}."
+            )
+
+        outputs = []
+        produced = 0
+        while True:
+            x = self._features(epochs, values)
+            pred = self.predict_fn(x)
+            if inspect.isawaitable(pred):
+                pred = await pred
+            pred = self.scaler.inverse_scale_target(
+                np.asarray(pred, dtype=np.float32), self.target_names
+            ).astype(np.float64)
+            self.steps += 1
+            outputs.append(pred)
+            produced += pred.shape[1]
+            if produced >= hours:
+                break
+
+            # Nueva ventana: las últimas input_length horas de (ventana + predicción)
+            new_rows = self._next_rows(values, pred)
+            new_epochs = epochs[:, -1:] + HORA_S * np.arange(1, pred.shape[1] + 1)
+            values = np.concatenate([values, new_rows], axis=1)[:, -self.input_length:]
+            epochs = np.concatenate([epochs, new_epochs], axis=1)[:, -self.input_length:]
+
+        return np.concatenate(outputs, axis=1)[:, :hours]
@@ -0,0 +1,459 @@
+# hyperparameter_search.py - Búsqueda de hiperparámetros en paralelo con halving sucesivo
+"""
+Búsqueda de hiperparámetros de TimeSeriesModel (LSTM_UNITS, LEARNING_RATE,
+BATCH_SIZE y longitudes de secuencia) sobre el espacio de
+CONFIG['BUSQUEDA']['ESPACIO'].
+
+- Los ensayos corren en un pool de procesos; cada proceso fija los hilos
+  intra/inter-op de TensorFlow (núcleos / workers) para que los ensayos en
+  paralelo no se peleen por los mismos núcleos.
+- Los datos se preparan una sola vez (almacén columnar y memmaps de
+  características, ver Etl/training_store.py); cada proceso abre los mismos
+  memmaps de solo lectura, así que el caché de páginas del sistema es uno
+  solo para todos los ensayos.
+- Halving sucesivo: todos los ensayos entrenan EPOCAS_MIN épocas, sigue el
+  mejor 1/ETA con ETA veces más épocas, y así hasta EPOCAS_MAX. Dentro de
+  cada peldaño hay parada temprana; un ensayo que se detiene o que no mejora
+  deja de entrenar pero conserva su mejor pérdida.
+- Ensayos y peldaños quedan en una base SQLite local (CONFIG['RUTAS']['BUSQUEDA']).
+- El mejor ensayo con las longitudes de CONFIG['SECUENCIA'] (las que se
+  sirven) se exporta al registro de modelos como una versión nueva (sin
+  activarla), con sus escaladores y los hiperparámetros en los metadatos.
+  Un ensayo con otras longitudes no se exporta aunque tenga menor pérdida;
+  para servirlo hay que cambiar la configuración de servicio y volver a exportar.
+
+Uso:
+    python -m Controllers.hyperparameter_search [--ensayos N] [--workers N] [--estudio NOMBRE] [--sin-registro]
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Controllers.model_registry import MODEL_FILE, SCALER_PKL, check_sequence
+from Etl.dataset import TimeSeriesDataset, column_view
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Etl.training_store import TrainingDataStore
+from Utils.config import CONFIG
+
+DB_FILE = "ensayos.sqlite"
+
+
+def sample_configs(n_trials, space=None, seed=None):
+    """
+    Configuraciones distintas tomadas al azar del espacio (una lista de
+    valores por hiperparámetro).
+
+    Returns:
+        list[dict]: Hasta n_trials configuraciones (menos si el espacio es chico).
+    """
+    space = space or CONFIG["BUSQUEDA"]["ESPACIO"]
+    rng = random.Random(CONFIG["BUSQUEDA"]["SEMILLA"] if seed is None else seed)
+    n_trials = min(n_trials, math.prod(len(values) for values in space.values()))
+    configs, seen = [], set()
+    while len(configs) < n_trials:
+        params = {name: rng.choice(values) for name, values in space.items()}
+        key = tuple(params.values())
+        if key not in seen:
+            seen.add(key)
+            configs.append(params)
+    return configs
+
+
+def rung_budgets(min_epochs, eta, max_epochs):
+    """Épocas acumuladas al final de cada peldaño: min, min*eta, ... hasta max."""
+    budgets, epochs = [], min_epochs
+    while epochs < max_epochs:
+        budgets.append(epochs)
+        epochs *= eta
+    budgets.append(max_epochs)
+    return budgets
+
+
+def promote(scores, eta):
+    """
+    Ensayos que pasan al peldaño siguiente: el mejor 1/eta (al menos uno).
+
+    Args:
+        scores: {id: val_loss} de los ensayos que pueden seguir entrenando.
+    """
+    ranked = sorted(scores, key=lambda trial_id: scores[trial_id])
+    return ranked[:max(1, len(ranked) // eta)] if ranked else []
+
+
+class TrialDatabase:
+    """
+    Ensayos y peldaños de las búsquedas en SQLite. Solo escribe el proceso
+    principal; los workers devuelven sus resultados.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: Archivo SQLite. Por defecto ensayos.sqlite en CONFIG['RUTAS']['BUSQUEDA'].
+        """
+        self.path = path or os.path.join(CONFIG["RUTAS"]["BUSQUEDA"], DB_FILE)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ensayos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                estudio TEXT NOT NULL,
+                params TEXT NOT NULL,
+                estado TEXT NOT NULL,
+                epocas INTEGER NOT NULL DEFAULT 0,
+                val_loss REAL,
+                ruta TEXT,
+                creado REAL NOT NULL,
+                actualizado REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ensayos_estudio ON ensayos (estudio)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS peldanos (
+                ensayo INTEGER NOT NULL REFERENCES ensayos (id),
+                peldano INTEGER NOT NULL,
+                epocas INTEGER NOT NULL,
+                val_loss REAL,
+                detenido INTEGER NOT NULL,
+                segundos REAL NOT NULL,
+                PRIMARY KEY (ensayo, peldano)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def create(self, estudio, params, ruta=None):
+        now = time.time()
+        cursor = self._conn.execute(
+            "INSERT INTO ensayos (estudio, params, estado, ruta, creado, actualizado) VALUES (?, ?, ?, ?, ?, ?)",
+            (estudio, json.dumps(params), "pendiente", ruta, now, now),
+        )
+        self._conn.commit()
+        return cursor.lastrowid
+
+    def update(self, trial_id, **fields):
+        """Actualiza columnas de un ensayo (estado, epocas, val_loss, ruta)."""
+        fields["actualizado"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._conn.execute(f"UPDATE ensayos SET {columns} WHERE id = ?", (*fields.values(), trial_id))
+        self._conn.commit()
+
+    def record_rung(self, trial_id, peldano, epocas, val_loss, detenido, segundos):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO peldanos VALUES (?, ?, ?, ?, ?, ?)",
+            (trial_id, peldano, epocas, val_loss, int(detenido), segundos),
+        )
+        self._conn.commit()
+
+    def _row(self, row):
+        trial = dict(row)
+        trial["params"] = json.loads(trial["params"])
+        return trial
+
+    def trials(self, estudio):
+        rows = self._conn.execute("SELECT * FROM ensayos WHERE estudio = ? ORDER BY id", (estudio,))
+        return [self._row(row) for row in rows]
+
+    def rungs(self, trial_id):
+        rows = self._conn.execute("SELECT * FROM peldanos WHERE ensayo = ? ORDER BY peldano", (trial_id,))
+        return [dict(row) for row in rows]
+
+    def best(self, estudio, secuencia=None):
+        """
+        Ensayo con menor val_loss del estudio, o None.
+
+        Args:
+            estudio: Nombre del estudio.
+            secuencia: {'INPUT_LENGTH', 'OUTPUT_LENGTH'}; si se indica, solo
+                       cuentan los ensayos con esas longitudes.
+        """
+        rows = self._conn.execute(
+            "SELECT * FROM ensayos WHERE estudio = ? AND val_loss IS NOT NULL ORDER BY val_loss",
+            (estudio,),
+        )
+        for row in rows:
+            trial = self._row(row)
+            if secuencia is None or all(trial["params"][name] == value for name, value in secuencia.items()):
+                return trial
+        return None
+
+    def close(self):
+        self._conn.close()
+
+
+# Estado de cada proceso del pool: el almacén y, por longitudes de secuencia,
+# las ventanas sobre los memmaps y los escaladores ajustados
+_worker = {}
+
+
+def _init_worker(store_root, series, intra_threads, inter_threads):
+    """Inicializador del pool: hilos de TensorFlow fijados antes de cualquier operación."""
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(intra_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_threads)
+    _worker.update(store_root=store_root, series=series, windows={})
+
+
+def _shared_windows(input_length, output_length):
+    """Ventanas y escaladores para unas longitudes de secuencia (una vez por proceso)."""
+    key = (input_length, output_length)
+    if key not in _worker["windows"]:
+        store = TrainingDataStore(_worker["store_root"])
+        target_idxs = [FEATURE_COLUMNS.index(col) for col in CONFIG["TARGET_COL"]]
+        features = [store.features(serie) for serie in _worker["series"]]
+        windows = TimeSeriesDataset(input_length, output_length).prepare_series_windows(
+            [(array, column_view(array, target_idxs)) for array in features]
+        )
+        preprocessor = TimeSeriesPreprocessor()
+        rows = CONFIG["DATOS_COLUMNARES"]["FILAS_POR_LOTE"]
+        for chunk in windows["train"].input_chunks(rows):
+            preprocessor.partial_fit_scalers(chunk)
+        for chunk in windows["train"].target_chunks(rows):
+            preprocessor.partial_fit_target_scaler(chunk, CONFIG["TARGET_COL"])
+        _worker["windows"][key] = (windows, preprocessor)
+    return _worker["windows"][key]
+
+
+def run_trial(task):
+    """
+    Entrena un ensayo hasta el final de un peldaño (en un proceso del pool).
+
+    Args:
+        task: dict con id, params, ruta, epocas (época final del peldaño),
+              inicio (épocas ya entrenadas), mejor (val_loss previa o None) y paciencia.
+
+    Returns:
+        dict: id, val_loss del peldaño, épocas entrenadas, detenido y segundos.
+    """
+    import tensorflow as tf
+
+    from Controllers.model_build import TimeSeriesModel
+
+    params = task["params"]
+    windows, preprocessor = _shared_windows(params["INPUT_LENGTH"], params["OUTPUT_LENGTH"])
+    model_path = os.path.join(task["ruta"], MODEL_FILE)
+
+    tf.keras.backend.clear_session()
+    if task["inicio"]:
+        model = TimeSeriesModel().resume(model_path)
+    else:
+        model = TimeSeriesModel(params["LSTM_UNITS"], params["LEARNING_RATE"]).build_model(
+            (params["INPUT_LENGTH"], windows["train"].n_features), output_length=params["OUTPUT_LENGTH"]
+        )
+        preprocessor.save_scalers(os.path.join(task["ruta"], SCALER_PKL))
+
+    stopper = tf.keras.callbacks.EarlyStopping(
+        monitor="val_loss", patience=task["paciencia"], restore_best_weights=True
+    )
+    start = time.perf_counter()
+    model.train_windows(
+        windows["train"], windows["val"], epochs=task["epocas"], batch_size=params["BATCH_SIZE"],
+        scaler=preprocessor, initial_epoch=task["inicio"], callbacks=[stopper], verbose=0,
+    )
+    val_loss = float(min(model.history.history["val_loss"]))
+    improved = math.isfinite(val_loss) and (task["mejor"] is None or val_loss < task["mejor"])
+    if improved:
+        # Se guarda con el optimizador para retomarlo en el peldaño siguiente
+        tmp_path = os.path.join(task["ruta"], f".{os.getpid()}.{MODEL_FILE}")
+        model.model.save(tmp_path)
+        os.replace(tmp_path, model_path)
+    return {
+        "id": task["id"],
+        "val_loss": val_loss if math.isfinite(val_loss) else None,
+        "epocas": task["inicio"] + len(model.history.history["val_loss"]),
+        "detenido": stopper.stopped_epoch > 0 or not improved,
+        "segundos": time.perf_counter() - start,
+    }
+
+
+class HyperparameterSearch:
+    """
+    Búsqueda con halving sucesivo sobre un pool de procesos.
+    """
+
+    def __init__(self, n_trials=None, workers=None, estudio=None, root=None, store=None, space=None):
+        """
+        Args:
+            n_trials: Configuraciones a probar. Por defecto CONFIG['BUSQUEDA']['ENSAYOS'].
+            workers: Procesos en paralelo. Por defecto CONFIG['BUSQUEDA']['WORKERS'].
+            estudio: Nombre de la búsqueda en la base de ensayos. Por defecto uno con la fecha.
+            root: Directorio de la base y de los modelos de cada ensayo.
+                  Por defecto CONFIG['RUTAS']['BUSQUEDA'].
+            store: TrainingDataStore con los datos. Por defecto el de CONFIG.
+            space: Espacio de búsqueda. Por defecto CONFIG['BUSQUEDA']['ESPACIO'].
+        """
+        cfg = CONFIG["BUSQUEDA"]
+        self.n_trials = n_trials or cfg["ENSAYOS"]
+        self.workers = min(workers or cfg["WORKERS"], self.n_trials)
+        self.estudio = estudio or time.strftime("busqueda-%Y%m%d-%H%M%S")
+        self.root = root or CONFIG["RUTAS"]["BUSQUEDA"]
+        self.store = store or TrainingDataStore()
+        self.space = space or cfg["ESPACIO"]
+        self.db = TrialDatabase(os.path.join(self.root, DB_FILE))
+
+    def _threads(self):
+        cfg = CONFIG["BUSQUEDA"]
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+        return cfg["HILOS_INTRA"] or max(1, cores // self.workers), cfg["HILOS_INTER"]
+
+    def prepare_data(self):
+        """
+        Prepara una sola vez los memmaps de características que comparten los
+        ensayos (ingesta del CSV si el almacén está vacío o el CSV cambió).
+
+        Returns:
+            list[str]: Series del almacén.
+        """
+        series = self.store.sync_csv(CONFIG["RUTAS"]["DATOS"])
+        for serie in series:
+            self.store.features(serie)
+        return series
+
+    def run(self):
+        """
+        Ejecuta la búsqueda.
+
+        Returns:
+            dict | None: Mejor ensayo (ver TrialDatabase.best).
+        """
+        cfg = CONFIG["BUSQUEDA"]
+        series = self.prepare_data()
+        budgets = rung_budgets(cfg["EPOCAS_MIN"], cfg["ETA"], cfg["EPOCAS_MAX"])
+        trials = {}
+        for params in sample_configs(self.n_trials, self.space):
+            trial_id = self.db.create(self.estudio, params)
+            ruta = os.path.join(self.root, self.estudio, str(trial_id))
+            os.makedirs(ruta, exist_ok=True)
+            self.db.update(trial_id, ruta=ruta)
+            trials[trial_id] = {"params": params, "ruta": ruta, "epocas": 0, "mejor": None, "detenido": False}
+
+        intra, inter = self._threads()
+        print(f"[INFO] Estudio {self.estudio}: {len(trials)} ensayos, peldaños {budgets} épocas, "
+              f"{self.workers} procesos x {intra} hilos")
+
+        active = list(trials)
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.store.root, series, intra, inter),
+        ) as pool:
+            for rung, budget in enumerate(budgets):
+                futures = {}
+                for trial_id in active:
+                    trial = trials[trial_id]
+                    self.db.update(trial_id, estado="activo")
+                    task = {
+                        "id": trial_id, "params": trial["params"], "ruta": trial["ruta"],
+                        "epocas": budget, "inicio": trial["epocas"], "mejor": trial["mejor"],
+                        "paciencia": cfg["PACIENCIA"],
+                    }
+                    futures[pool.submit(run_trial, task)] = trial_id
+
+                for future in as_completed(futures):
+                    trial_id = futures[future]
+                    trial = trials[trial_id]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"❌ Ensayo {trial_id} falló: {e}")
+                        trial["detenido"] = True
+                        self.db.update(trial_id, estado="error")
+                        continue
+                    trial["epocas"] = result["epocas"]
+                    trial["detenido"] = result["detenido"]
+                    if result["val_loss"] is not None and (trial["mejor"] is None or result["val_loss"] < trial["mejor"]):
+                        trial["mejor"] = result["val_loss"]
+                    self.db.record_rung(trial_id, rung, result["epocas"], result["val_loss"],
+                                        result["detenido"], result["segundos"])
+                    self.db.update(trial_id, epocas=trial["epocas"], val_loss=trial["mejor"])
+                    print(f"[INFO] Ensayo {trial_id} peldaño {rung}: val_loss {result['val_loss']} "
+                          f"({result['epocas']} épocas, {result['segundos']:.1f} s)")
+
+                # Los detenidos no siguen, pero conservan su mejor pérdida
+                for trial_id in active:
+                    if trials[trial_id]["detenido"] and trials[trial_id]["mejor"] is not None:
+                        self.db.update(trial_id, estado="detenido")
+                candidates = {trial_id: trials[trial_id]["mejor"] for trial_id in active
+                              if not trials[trial_id]["detenido"] and trials[trial_id]["mejor"] is not None}
+                if rung == len(budgets) - 1:
+                    for trial_id in candidates:
+                        self.db.update(trial_id, estado="completo")
+                    break
+                active = promote(candidates, cfg["ETA"])
+                for trial_id in candidates:
+                    if trial_id not in active:
+                        self.db.update(trial_id, estado="podado")
+                if not active:
+                    break
+
+        best = self.db.best(self.estudio)
+        if best is not None:
+            print(f"✅ Mejor ensayo {best['id']}: val_loss {best['val_loss']:.5f} {best['params']}")
+        return best
+
+    def export(self, registry=None):
+        """
+        Registra como una versión nueva del registro (no la activa) el mejor
+        ensayo con las longitudes de secuencia de CONFIG['SECUENCIA'], las que
+        se sirven.
+
+        Args:
+            registry: ModelRegistry. Por defecto el compartido.
+
+        Returns:
+            str | None: Versión registrada; None si ningún ensayo se puede servir.
+        """
+        best = self.db.best(self.estudio, CONFIG["SECUENCIA"])
+        if best is None:
+            print(f"⚠️ Ningún ensayo del estudio {self.estudio} usa la secuencia servida "
+                  f"{CONFIG['SECUENCIA']}; no se exporta")
+            return None
+        if registry is None:
+            from Controllers.model_registry import get_model_registry
+
+            registry = get_model_registry()
+        params = best["params"]
+        secuencia = {"INPUT_LENGTH": params["INPUT_LENGTH"], "OUTPUT_LENGTH": params["OUTPUT_LENGTH"]}
+        # Una versión con otra secuencia se activaría sin error y serviría pronósticos equivocados
+        check_sequence({"version": f"del ensayo {best['id']}", "secuencia": secuencia})
+        return registry.register(
+            os.path.join(best["ruta"], MODEL_FILE),
+            scaler_pkl=os.path.join(best["ruta"], SCALER_PKL),
+            metadata={
+                "source": "busqueda",
+                "estudio": self.estudio,
+                "ensayo": best["id"],
+                "params": params,
+                "secuencia": secuencia,
+                "val_loss": best["val_loss"],
+                "epocas": best["epocas"],
+            },
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros con halving sucesivo")
+    parser.add_argument("--ensayos", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--estudio", default=None)
+    parser.add_argument("--sin-registro", action="store_true", help="No exportar el mejor ensayo al registro")
+    _args = parser.parse_args()
+
+    _search = HyperparameterSearch(n_trials=_args.ensayos, workers=_args.workers, estudio=_args.estudio)
+    if _search.run() is not None and not _args.sin_registro:
+        _search.export()
@@ -4,6 +4,7 @@ Módulo que define el modelo de predicción de series temporales,
 incluyendo arquitectura, entrenamiento y evaluación.
 """
 
+import glob
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
@@ -17,6 +18,76 @@ from sklearn.metrics import r2_score
 import matplotlib.pyplot as plt
 from Utils.config import CONFIG
 
+def window_dataset(series, batch_size, scaler=None, target_names=None, shuffle=False,
+                   targets=True, cache=None, seed=123):
+    """
+    tf.data con las ventanas de una serie sin escalar (WindowedSeries o
+    ConcatenatedWindows): cada lote se arma al vuelo desde la serie base y
+    se escala dentro del grafo; la preparación del lote siguiente se solapa
+    con el paso de entrenamiento (prefetch).
+
+    Args:
+        series: Ventanas de Etl.dataset (pueden estar sobre memmaps).
+        batch_size: Ventanas por lote.
+        scaler: TimeSeriesPreprocessor ajustado (None si la serie ya está escalada).
+        target_names: Objetivos, en el orden de las columnas de la serie.
+        shuffle: Barajar con un búfer acotado (CONFIG['ENTRENAMIENTO']['BUFFER_SHUFFLE']).
+        targets: Incluir las salidas (False para predict).
+        cache: Archivo de caché: tras la primera época las ventanas se leen
+               de ahí y no de la serie.
+        seed: Semilla del barajado.
+
+    Returns:
+        tf.data.Dataset de (x, y) o de x, en float32
+    """
+    shapes = (
+        (None, series.input_length, series.n_features),
+        (None, series.output_length, series.n_targets),
+    )
+
+    def gather(indices):
+        x, y = series.batch(indices)
+        return x.astype(np.float64, copy=False), y.astype(np.float64, copy=False)
+
+    def load(indices):
+        x, y = tf.numpy_function(gather, [indices], (tf.float64, tf.float64), stateful=False)
+        x.set_shape(shapes[0])
+        y.set_shape(shapes[1])
+        return x, y
+
+    if scaler is not None:
+        compiled = scaler.compiled_scaler()
+        idx = [compiled.target_names.index(name) for name in target_names or CONFIG['TARGET_COL']]
+        vectors = [tf.constant(v) for v in (
+            compiled.feature_scale, compiled.feature_offset,
+            compiled.target_scale[idx], compiled.target_offset[idx],
+        )]
+
+    def scale(x, y):
+        # Mismas operaciones que CompiledScaler, en float64, y después a float32
+        if scaler is not None:
+            feature_scale, feature_offset, target_scale, target_offset = vectors
+            x = x * feature_scale + feature_offset
+            y = y * target_scale + target_offset
+        x, y = tf.cast(x, tf.float32), tf.cast(y, tf.float32)
+        return (x, y) if targets else x
+
+    buffer = min(len(series), CONFIG['ENTRENAMIENTO']['BUFFER_SHUFFLE'])
+    dataset = tf.data.Dataset.range(len(series))
+    if cache:
+        # Se guardan las ventanas sin escalar; se barajan ventanas ya leídas
+        dataset = dataset.batch(batch_size).map(load).unbatch().cache(cache)
+        if shuffle:
+            dataset = dataset.shuffle(buffer, seed=seed, reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size)
+    else:
+        # Se barajan índices (el búfer no guarda ventanas) y cada lote se lee junto
+        if shuffle:
+            dataset = dataset.shuffle(buffer, seed=seed, reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size).map(load, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.map(scale, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+
 class TimeSeriesModel:
     """
     Clase para la creación, entrenamiento y evaluación de modelos de series temporales.
@@ -33,20 +104,23 @@ class TimeSeriesModel:
         self.units = units or CONFIG['ENTRENAMIENTO']['LSTM_UNITS']
         self.learning_rate = learning_rate or CONFIG['ENTRENAMIENTO']['LEARNING_RATE']
         self.model = None
+        self._serve_fn = None
+        self.buckets = []
         self.history = None
         self.model_train = "El modelo no ha sido entrenado. Llame a train primero."
         
-    def build_model(self, input_shape):
+    def build_model(self, input_shape, output_length=None):
         """
         Construye la arquitectura del modelo.
         
         Args:
             input_shape: Forma de los datos de entrada (timesteps, features)
+            output_length: Horas predichas. Por defecto CONFIG['SECUENCIA']['OUTPUT_LENGTH'].
             
         Returns:
             self para encadenamiento de métodos
         """
-        output_shape = CONFIG['SECUENCIA']['OUTPUT_LENGTH'] 
+        output_shape = output_length or CONFIG['SECUENCIA']['OUTPUT_LENGTH']
         # Definir función de pérdida RMSE
         def root_mean_squared_error(y_true, y_pred):
             return tf.sqrt(tf.reduce_mean(tf.square(y_pred - y_true)))
@@ -94,8 +168,73 @@ class TimeSeriesModel:
         epochs = epochs or CONFIG['ENTRENAMIENTO']['EPOCHS']
         batch_size = batch_size or CONFIG['ENTRENAMIENTO']['BATCH_SIZE']
         
-        # Definir callbacks
-        callbacks = [
+        # Entrenar modelo
+        self.history = self.model.fit(
+            x=x_train,
+            y=y_train,
+            batch_size=batch_size,
+            epochs=epochs,
+            validation_data=(x_val, y_val),
+            callbacks=self._callbacks(),
+            verbose=2
+        )
+        
+        return self
+
+    def train_windows(self, train, val, epochs=None, batch_size=None, scaler=None, cache_dir=None,
+                      initial_epoch=0, callbacks=None, verbose=2):
+        """
+        Entrena sobre ventanas sin copia (Etl.dataset) con una canalización
+        tf.data (window_dataset): solo los lotes en curso se materializan.
+
+        Args:
+            train: Ventanas de entrenamiento.
+            val: Ventanas de validación.
+            epochs: Número de épocas para entrenamiento
+            batch_size: Tamaño del lote para entrenamiento
+            scaler: TimeSeriesPreprocessor ajustado; las ventanas se escalan en
+                    el grafo (None si ya están escaladas).
+            cache_dir: Directorio para la caché de ventanas. Por defecto
+                       CONFIG['RUTAS']['CACHE_TF_DATA'] (None: sin caché).
+            initial_epoch: Época desde la que se sigue (modelo retomado con resume);
+                           `epochs` es la época final, como en Keras.
+            callbacks: Callbacks de Keras. Por defecto los de _callbacks (que
+                       guardan el mejor modelo en CONFIG['RUTAS']['MODELO']).
+            verbose: Nivel de salida de model.fit.
+
+        Returns:
+            self para encadenamiento de métodos
+        """
+        if self.model is None:
+            self.build_model((train.input_length, train.n_features))
+
+        epochs = epochs or CONFIG['ENTRENAMIENTO']['EPOCHS']
+        batch_size = batch_size or CONFIG['ENTRENAMIENTO']['BATCH_SIZE']
+        cache_dir = cache_dir or CONFIG['RUTAS']['CACHE_TF_DATA']
+
+        caches = {'train': None, 'val': None}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            for name in caches:
+                caches[name] = os.path.join(cache_dir, name)
+                # Una caché de otro entrenamiento tendría otras ventanas
+                for path in glob.glob(f"{caches[name]}*"):
+                    os.remove(path)
+
+        self.history = self.model.fit(
+            window_dataset(train, batch_size, scaler, shuffle=True, cache=caches['train']),
+            epochs=epochs,
+            initial_epoch=initial_epoch,
+            validation_data=window_dataset(val, batch_size, scaler, cache=caches['val']),
+            callbacks=self._callbacks() if callbacks is None else callbacks,
+            verbose=verbose
+        )
+
+        return self
+
+    def _callbacks(self):
+        """Parada temprana, mejor modelo en disco y reducción de la tasa de aprendizaje."""
+        return [
             EarlyStopping(
                 monitor='val_loss',
                 patience=10,
@@ -113,19 +252,6 @@ class TimeSeriesModel:
                 min_lr=1e-6
             )
         ]
-        
-        # Entrenar modelo
-        self.history = self.model.fit(
-            x=x_train,
-            y=y_train,
-            batch_size=batch_size,
-            epochs=epochs,
-            validation_data=(x_val, y_val),
-            callbacks=callbacks,
-            verbose=2
-        )
-        
-        return self
     
     def predict(self, x):
         """
@@ -139,15 +265,92 @@ class TimeSeriesModel:
         """
         if self.model is None:
             raise ValueError(self.model_train)
-            
+
+        if self._serve_fn is not None:
+            return self._serve_predict(x)
         return self.model.predict(x)
+
+    def enable_serving(self, xla=None, max_bucket=None, warmup=True):
+        """
+        Activa la ruta de inferencia compilada.
+
+        Se exporta un tf.function con firma fija (None, input_length, n_features),
+        así que no se vuelve a trazar al cambiar el tamaño de lote. Los lotes se
+        rellenan a la siguiente potencia de dos (hasta `max_bucket`) para que XLA
+        compile un número acotado de formas; el calentamiento las compila todas.
+
+        Args:
+            xla: Compilar con XLA (jit_compile). Por defecto CONFIG['INFERENCIA']['XLA'].
+            max_bucket: Tamaño del mayor lote compilado; los lotes mayores se parten.
+            warmup: Ejecutar una pasada por cada tamaño de lote al activar.
+
+        Returns:
+            self para encadenamiento de métodos
+        """
+        if self.model is None:
+            raise ValueError(self.model_train)
+
+        cfg = CONFIG['INFERENCIA']
+        xla = cfg['XLA'] if xla is None else xla
+        max_bucket = max_bucket or cfg['BUCKET_MAX']
+        _, timesteps, n_features = self.model.input_shape
+        model = self.model
+
+        @tf.function(
+            input_signature=[tf.TensorSpec([None, timesteps, n_features], tf.float32)],
+            jit_compile=xla,
+        )
+        def serve(x):
+            return model(x, training=False)
+
+        self._serve_fn = serve
+        self.buckets = [2 ** i for i in range(int(np.log2(max_bucket)) + 1)]
+        if warmup:
+            for size in self.buckets:
+                serve(tf.zeros((size, timesteps, n_features), tf.float32))
+            print(f"Serving compilado listo (XLA={xla}, lotes={self.buckets})")
+        return self
+
+    def _serve_predict(self, x):
+        """Inferencia por la ruta compilada, rellenando cada lote a su bucket."""
+        x = np.asarray(x, dtype=np.float32)
+        if len(x) == 0:
+            # Sin ventanas no hay pasada: (0, OUTPUT_LENGTH, n_objetivos)
+            return np.zeros((0,) + tuple(self.model.output_shape[1:]), dtype=np.float32)
+        largest = self.buckets[-1]
+        outputs = []
+        for start in range(0, len(x), largest):
+            chunk = x[start:start + largest]
+            size = next(b for b in self.buckets if b >= len(chunk))
+            if size != len(chunk):
+                padding = np.zeros((size - len(chunk),) + chunk.shape[1:], dtype=np.float32)
+                chunk = np.concatenate([chunk, padding])
+            outputs.append(self._serve_fn(chunk).numpy()[:min(largest, len(x) - start)])
+        return np.concatenate(outputs)
     
     def evaluate(self, x_test, y_test, scaler=None):
         if self.model is None:
             raise ValueError(self.model_train)
 
         y_pred = self.predict(x_test)
+        return self._metrics(y_test, y_pred, scaler)
 
+    def evaluate_windows(self, test, scaler=None, batch_size=None):
+        """
+        evaluate sobre ventanas de Etl.dataset, prediciendo lote a lote. Con
+        `scaler` las ventanas están sin escalar y se escalan en el grafo.
+        """
+        if self.model is None:
+            raise ValueError(self.model_train)
+
+        batch_size = batch_size or CONFIG['ENTRENAMIENTO']['BATCH_SIZE']
+        y_pred = self.model.predict(window_dataset(test, batch_size, scaler, targets=False), verbose=0)
+        y_test = np.ascontiguousarray(test.y)
+        if scaler is not None:
+            y_test = scaler.scale_target(y_test, ['temp_c', 'humidity'])
+        return self._metrics(y_test, y_pred, scaler)
+
+    def _metrics(self, y_test, y_pred, scaler=None):
         if scaler is not None:
             y_test_orig = scaler.inverse_scale_target(y_test, ['temp_c', 'humidity']).squeeze()
             y_pred_orig = scaler.inverse_scale_target(y_pred, ['temp_c', 'humidity']).squeeze()
@@ -259,4 +462,35 @@ class TimeSeriesModel:
             compile=False  # <-- correcto aquí
         )
 
+        if CONFIG['INFERENCIA']['SERVING_COMPILADO']:
+            self.enable_serving()
+
+        return self
+
+    def resume(self, filepath=None, learning_rate=None):
+        """
+        Carga un modelo guardado con su compilación y el estado del optimizador
+        para seguir entrenándolo (load lo carga solo para inferencia).
+
+        Args:
+            filepath: Ruta del archivo con el modelo guardado
+            learning_rate: Nueva tasa de aprendizaje (por defecto la guardada)
+
+        Returns:
+            self para encadenamiento de métodos
+        """
+        filepath = filepath or CONFIG['RUTAS']['MODELO']
+
+        def root_mean_squared_error(y_true, y_pred):
+            return tf.sqrt(tf.reduce_mean(tf.square(y_pred - y_true)))
+
+        self.model = load_model(
+            filepath,
+            custom_objects={'root_mean_squared_error': root_mean_squared_error}
+        )
+        self._serve_fn = None
+        self.units = self.model.layers[0].units
+        if learning_rate is not None:
+            self.model.optimizer.learning_rate.assign(learning_rate)
+        self.learning_rate = float(self.model.optimizer.learning_rate.numpy())
         return self
\ No newline at end of file
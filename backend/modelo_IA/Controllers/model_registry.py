@@ -0,0 +1,299 @@
+# model_registry.py - Registro local de versiones del modelo
+"""
+Registro de modelos versionados en disco.
+
+Cada versión es un directorio con el modelo, los escaladores y sus metadatos:
+
+    registry/
+        v1/model.keras, scalers.npz, scalers.pkl, metadata.json
+        v2/...
+        ACTIVE          versión activa
+        history.json    versiones activadas, en orden (para revertir)
+
+Las escrituras se hacen en un temporal y se publican con os.replace, así un
+proceso que lee el registro nunca ve una versión a medio copiar.
+"""
+
+import json
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+
+from Controllers.horizon_engine import HorizonEngine
+from Etl.preprocessor import FEATURE_COLUMNS
+from Etl.scaling import load_compiled_scaler
+from Utils.config import CONFIG
+from Utils.inference_batcher import InferenceBatcher
+
+MODEL_FILE = "model.keras"
+SCALER_NPZ = "scalers.npz"
+SCALER_PKL = "scalers.pkl"
+METADATA_FILE = "metadata.json"
+ACTIVE_FILE = "ACTIVE"
+HISTORY_FILE = "history.json"
+
+
+def check_sequence(metadata):
+    """
+    Verifica que una versión use las longitudes de secuencia que se sirven.
+
+    El despliegue del horizonte y el servidor del modelo usan
+    CONFIG['SECUENCIA'], y un LSTM acepta ventanas de otra longitud sin
+    error, así que una versión distinta serviría pronósticos equivocados.
+
+    Raises:
+        ValueError: Si metadata['secuencia'] no coincide con CONFIG['SECUENCIA'].
+    """
+    secuencia = (metadata or {}).get("secuencia")
+    if secuencia is not None and secuencia != CONFIG["SECUENCIA"]:
+        raise ValueError(
+            f"La versión {metadata.get('version', '')} usa {secuencia}; se sirve {CONFIG['SECUENCIA']}."
+        )
+
+
+class ModelRegistry:
+    """
+    Versiones del modelo y escaladores, con la versión activa y su historial.
+    """
+
+    def __init__(self, root=None):
+        """
+        Args:
+            root: Directorio del registro. Por defecto CONFIG['RUTAS']['REGISTRO_MODELOS'].
+        """
+        self.root = root or CONFIG["RUTAS"]["REGISTRO_MODELOS"]
+        os.makedirs(self.root, exist_ok=True)
+
+    def version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def _write_atomic(self, name, text):
+        path = os.path.join(self.root, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def versions(self):
+        """Metadatos de todas las versiones, de la más antigua a la más reciente."""
+        active = self.active_version()
+        result = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name, METADATA_FILE)
+            if os.path.isfile(path):
+                with open(path, encoding="utf-8") as f:
+                    metadata = json.load(f)
+                metadata["active"] = name == active
+                result.append(metadata)
+        return sorted(result, key=lambda m: (m["created_at"], m["version"]))
+
+    def exists(self, version):
+        return os.path.isfile(os.path.join(self.version_dir(version), METADATA_FILE))
+
+    def next_version(self):
+        numbers = [int(m.group(1)) for name in os.listdir(self.root)
+                   if (m := re.fullmatch(r"v(\d+)", name))]
+        return f"v{max(numbers, default=0) + 1}"
+
+    def register(self, model_path, scaler_pkl=None, scaler_npz=None, metadata=None, version=None):
+        """
+        Copia un modelo y sus escaladores como una versión nueva (no la activa).
+
+        Args:
+            model_path: Archivo .keras.
+            scaler_pkl: scalers.pkl de entrenamiento (opcional si hay scaler_npz).
+            scaler_npz: Escaladores compilados; si falta se generan desde scaler_pkl.
+            metadata: Datos adicionales (métricas, origen, etc.).
+            version: Nombre de la versión. Por defecto el siguiente vN.
+
+        Returns:
+            str: Versión registrada.
+        """
+        if scaler_pkl is None and scaler_npz is None:
+            raise ValueError("Se requieren los escaladores (scalers.pkl o scalers.npz).")
+        version = version or self.next_version()
+        if self.exists(version):
+            raise ValueError(f"La versión {version} ya existe en el registro.")
+
+        tmp_dir = os.path.join(self.root, f".{version}.{os.getpid()}.tmp")
+        os.makedirs(tmp_dir)
+        try:
+            shutil.copy2(model_path, os.path.join(tmp_dir, MODEL_FILE))
+            if scaler_pkl is not None:
+                shutil.copy2(scaler_pkl, os.path.join(tmp_dir, SCALER_PKL))
+            if scaler_npz is not None:
+                shutil.copy2(scaler_npz, os.path.join(tmp_dir, SCALER_NPZ))
+            else:
+                load_compiled_scaler(os.path.join(tmp_dir, SCALER_NPZ), os.path.join(tmp_dir, SCALER_PKL))
+
+            info = dict(metadata or {})
+            info.update({"version": version, "created_at": time.time()})
+            with open(os.path.join(tmp_dir, METADATA_FILE), "w", encoding="utf-8") as f:
+                json.dump(info, f, indent=2, default=str)
+            os.rename(tmp_dir, self.version_dir(version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        print(f"[INFO] Modelo registrado como {version}")
+        return version
+
+    def metadata(self, version):
+        with open(os.path.join(self.version_dir(version), METADATA_FILE), encoding="utf-8") as f:
+            return json.load(f)
+
+    def update_metadata(self, version, values):
+        """Agrega o reemplaza claves en los metadatos de una versión."""
+        metadata = self.metadata(version)
+        metadata.update(values)
+        self._write_atomic(
+            os.path.join(version, METADATA_FILE), json.dumps(metadata, indent=2, default=str)
+        )
+
+    def active_version(self):
+        """Versión activa, o None si el registro está vacío."""
+        path = os.path.join(self.root, ACTIVE_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip() or None
+
+    def history(self):
+        path = os.path.join(self.root, HISTORY_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def set_active(self, version, rollback=False):
+        """
+        Marca una versión como activa.
+
+        Args:
+            version: Versión a activar.
+            rollback: La versión es la anterior del historial (se quita la actual
+                      en lugar de apilar una nueva entrada).
+        """
+        if not self.exists(version):
+            raise KeyError(f"La versión {version} no existe en el registro.")
+        history = self.history()
+        if rollback and len(history) >= 2 and history[-2] == version:
+            history.pop()
+        elif not history or history[-1] != version:
+            history.append(version)
+        self._write_atomic(HISTORY_FILE, json.dumps(history))
+        self._write_atomic(ACTIVE_FILE, version)
+
+    def previous_version(self):
+        """Versión activa antes de la actual, o None."""
+        history = self.history()
+        return history[-2] if len(history) >= 2 else None
+
+    def bootstrap(self):
+        """
+        Si el registro está vacío, importa el modelo de CONFIG['RUTAS'] como
+        primera versión y la activa.
+
+        Returns:
+            str | None: Versión activa.
+        """
+        if self.active_version() is not None:
+            return self.active_version()
+        rutas = CONFIG["RUTAS"]
+        if not os.path.exists(rutas["MODELO"]):
+            return None
+        version = self.register(
+            rutas["MODELO"],
+            scaler_pkl=rutas["SCALER"] if os.path.exists(rutas["SCALER"]) else None,
+            scaler_npz=rutas["SCALER_NPZ"] if os.path.exists(rutas["SCALER_NPZ"]) else None,
+            metadata={"source": "legacy"},
+        )
+        self.set_active(version)
+        return version
+
+
+def load_model(registry, version, variant=None):
+    """
+    Carga el modelo de una versión y lo calienta (bloqueante).
+
+    Args:
+        variant: 'float32', 'int8' o 'float16'. Por defecto
+                 CONFIG['INFERENCIA']['VARIANTE']; una variante cuantizada
+                 que no pasó la compuerta cae a float32.
+
+    Returns:
+        Tuple[modelo, str]: (TimeSeriesModel o TFLiteModel, variante cargada)
+    """
+    # TensorFlow solo se importa donde se carga el modelo (no en los workers de serve.py)
+    from Controllers.model_build import TimeSeriesModel
+    from Controllers.quantization import load_variant
+
+    variant = variant or CONFIG["INFERENCIA"]["VARIANTE"]
+    model = load_variant(registry, version, variant) if variant != "float32" else None
+    if model is None:
+        variant = "float32"
+        model = TimeSeriesModel().load(os.path.join(registry.version_dir(version), MODEL_FILE))
+    # Una pasada completa para que la primera solicitud no pague la inicialización
+    model.predict(np.zeros(
+        (1, CONFIG["SECUENCIA"]["INPUT_LENGTH"], len(FEATURE_COLUMNS)), dtype=np.float32
+    ))
+    return model, variant
+
+
+class ModelBundle:
+    """
+    Una versión cargada y lista para servir: modelo, escaladores, micro-lotes
+    y motor de horizonte. Las solicitudes toman una referencia al inicio, así
+    que un intercambio no afecta a las que ya están en curso.
+    """
+
+    def __init__(self, version, model, scaler, preprocessor, metadata=None, variant="float32"):
+        self.version = version
+        self.variant = variant
+        self.model = model
+        self.scaler = scaler
+        self.metadata = metadata or {}
+        self.batcher = InferenceBatcher(model.predict)
+        self.horizon = HorizonEngine(self.batcher.predict, scaler, preprocessor)
+
+    @classmethod
+    def load(cls, registry, version, preprocessor, variant=None):
+        """
+        Carga una versión del registro y la calienta (bloqueante).
+
+        Con CONFIG['SERVIDOR_MODELO']['SOCKET'] definido (workers de serve.py)
+        el modelo es un RemoteModel y la inferencia ocurre en el servidor del modelo.
+
+        Args:
+            variant: Ver load_model.
+        """
+        metadata = registry.metadata(version)
+        check_sequence(metadata)
+        path = registry.version_dir(version)
+        address = CONFIG["SERVIDOR_MODELO"]["SOCKET"]
+        if address:
+            from Controllers.model_server import RemoteModel
+
+            model = RemoteModel(address, version, variant or CONFIG["INFERENCIA"]["VARIANTE"])
+            model.predict(np.zeros(
+                (1, CONFIG["SECUENCIA"]["INPUT_LENGTH"], len(FEATURE_COLUMNS)), dtype=np.float32
+            ))
+            variant = model.variant
+        else:
+            model, variant = load_model(registry, version, variant)
+        scaler = load_compiled_scaler(os.path.join(path, SCALER_NPZ), os.path.join(path, SCALER_PKL))
+        print(f"✅ Modelo {version} ({variant}) cargado y calentado")
+        return cls(version, model, scaler, preprocessor, metadata, variant)
+
+
+_model_registry = None
+
+
+def get_model_registry():
+    """Instancia compartida del registro."""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
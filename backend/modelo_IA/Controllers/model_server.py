@@ -0,0 +1,200 @@
+# model_server.py - Proceso servidor del modelo para varios workers
+"""
+Un solo proceso con TensorFlow y el modelo cargado atiende la inferencia de
+todos los workers web de serve.py.
+
+TensorFlow no sobrevive a un fork (la inferencia en el hijo se bloquea), así
+que el modelo no puede compartirse copy-on-write desde el proceso maestro: vive
+en este proceso, iniciado con spawn, y los workers no importan TensorFlow.
+
+Cada cliente abre una conexión por Unix socket (control) y un bloque de memoria
+compartida para los tensores; por el socket solo viajan mensajes pequeños:
+
+    cliente  -> ("hello", nombre_shm, max_rows)
+    servidor -> ("ok", input_shape)
+    cliente  -> ("predict", versión, variante, n)       entrada en el bloque
+    servidor -> ("ok", variante, forma_salida)           salida en el bloque
+              | ("error", mensaje)
+"""
+
+import os
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from Etl.preprocessor import FEATURE_COLUMNS
+from Utils.config import CONFIG
+
+
+def _layout(max_rows):
+    """Formas de entrada y salida y el tamaño del bloque compartido."""
+    input_shape = (max_rows, CONFIG["SECUENCIA"]["INPUT_LENGTH"], len(FEATURE_COLUMNS))
+    output_shape = (max_rows, CONFIG["SECUENCIA"]["OUTPUT_LENGTH"], len(CONFIG["TARGET_COL"]))
+    size = 4 * (int(np.prod(input_shape)) + int(np.prod(output_shape)))
+    return input_shape, output_shape, size
+
+
+def _views(shm, max_rows):
+    input_shape, output_shape, _ = _layout(max_rows)
+    x = np.ndarray(input_shape, dtype=np.float32, buffer=shm.buf)
+    y = np.ndarray(output_shape, dtype=np.float32, buffer=shm.buf, offset=x.nbytes)
+    return x, y
+
+
+class ModelServer:
+    """
+    Modelos cargados por (versión, variante) y atención de clientes, un hilo por conexión.
+    """
+
+    def __init__(self, address, registry=None):
+        """
+        Args:
+            address: Ruta del Unix socket.
+            registry: ModelRegistry. Por defecto el compartido.
+        """
+        from Controllers.model_registry import get_model_registry
+
+        self.address = address
+        self.registry = registry or get_model_registry()
+        self._models = {}  # (versión, variante pedida) -> (modelo, variante servida)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def model(self, version, variant):
+        """Modelo de la versión; se carga y calienta la primera vez que se pide."""
+        key = (version, variant)
+        with self._lock:
+            if key not in self._models:
+                from Controllers.model_registry import load_model
+
+                self._models[key] = load_model(self.registry, version, variant)
+                # Se conservan la versión nueva y la anterior (reversión inmediata)
+                while len(self._models) > CONFIG["SERVIDOR_MODELO"]["MAX_VERSIONES"]:
+                    self._models.pop(next(iter(self._models)))
+            return self._models[key]
+
+    def _handle(self, conn):
+        shm = None
+        try:
+            _, name, max_rows = conn.recv()
+            shm = SharedMemory(name=name)
+            # El bloque es del cliente: este proceso no debe liberarlo al salir
+            resource_tracker.unregister(shm._name, "shared_memory")
+            x, y = _views(shm, max_rows)
+            conn.send(("ok", x.shape[1:]))
+            while True:
+                _, version, variant, n = conn.recv()
+                try:
+                    model, served = self.model(version, variant)
+                    out = np.asarray(model.predict(x[:n]), dtype=np.float32)
+                    y[:n] = out
+                    self.requests += 1
+                    conn.send(("ok", served, out.shape))
+                except Exception as e:
+                    conn.send(("error", str(e)))
+        except EOFError:
+            pass  # El cliente cerró la conexión
+        finally:
+            if shm is not None:
+                shm.close()
+            conn.close()
+
+    def serve_forever(self, ready=None):
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        with Listener(self.address, family="AF_UNIX") as listener:
+            print(f"🧠 Servidor del modelo escuchando en {self.address}")
+            if ready is not None:
+                ready.set()
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+
+def run(address, ready=None):
+    """Punto de entrada del proceso (spawn): carga la versión activa y atiende clientes."""
+    import set_tf_env  # noqa: F401
+    import tensorflow as tf
+
+    tf.random.set_seed(123)
+    np.random.seed(123)
+    tf.config.experimental.enable_op_determinism()
+
+    server = ModelServer(address)
+    # El registro se inicializa aquí y no en los workers (evita que varios registren v1 a la vez)
+    active = server.registry.bootstrap()
+    if active is not None:
+        server.model(active, CONFIG["INFERENCIA"]["VARIANTE"])
+    server.serve_forever(ready)
+
+
+class RemoteModel:
+    """
+    Cliente del servidor del modelo con la interfaz de TimeSeriesModel
+    (predict e input_shape). Cada proceso abre su propia conexión y su bloque
+    de memoria compartida (se reconectan solos después de un fork).
+    """
+
+    def __init__(self, address, version, variant, max_rows=None):
+        self.address = address
+        self.version = version
+        self.requested_variant = variant
+        self.variant = None  # La que el servidor sirve (tras la primera llamada)
+        self.max_rows = max_rows or CONFIG["SERVIDOR_MODELO"]["MAX_FILAS"]
+        self.input_shape = (None,) + _layout(1)[0][1:]
+        self._lock = threading.Lock()
+        self._pid = None
+        self._conn = None
+        self._shm = None
+
+    def _connect(self):
+        self._shm = SharedMemory(create=True, size=_layout(self.max_rows)[2])
+        self._x, self._y = _views(self._shm, self.max_rows)
+        self._conn = Client(self.address, family="AF_UNIX")
+        self._conn.send(("hello", self._shm.name, self.max_rows))
+        self._conn.recv()
+        self._pid = os.getpid()
+
+    def _disconnect(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+            self._shm.close()
+            self._shm.unlink()
+        self._conn = self._shm = None
+        self._pid = None
+
+    def _call(self, chunk):
+        if self._pid != os.getpid():
+            # Conexión heredada por fork (o ninguna): se abre una propia
+            self._conn = self._shm = None
+            self._connect()
+        self._x[: len(chunk)] = chunk
+        self._conn.send(("predict", self.version, self.requested_variant, len(chunk)))
+        reply = self._conn.recv()
+        if reply[0] == "error":
+            raise RuntimeError(f"Servidor del modelo: {reply[1]}")
+        _, self.variant, shape = reply
+        return self._y[: shape[0], : shape[1], : shape[2]].copy()
+
+    def predict(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        if len(x) == 0:
+            return np.zeros((0, CONFIG["SECUENCIA"]["OUTPUT_LENGTH"], len(CONFIG["TARGET_COL"])), dtype=np.float32)
+        outputs = []
+        with self._lock:
+            for start in range(0, len(x), self.max_rows):
+                chunk = x[start:start + self.max_rows]
+                try:
+                    outputs.append(self._call(chunk))
+                except (EOFError, OSError):
+                    # El servidor se reinició: un reintento con una conexión nueva
+                    self._disconnect()
+                    outputs.append(self._call(chunk))
+        return np.concatenate(outputs)
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
@@ -7,37 +7,174 @@ import asyncio
 import pandas as pd
 from Controllers.save_predictions import SavePredictions
 from Controllers.weather_api import (
-    extract_additional_info,
-    extract_hourly_data,
-    get_data,
+    extract_additional_info_async,
+    extract_hourly_arrays,
+    get_client,
+    get_dates_async,
+    history_dates,
 )
 from fastapi import HTTPException
 import numpy as np
-import tensorflow as tf
 import os
-from Utils.config import CONFIG
+import time
+from Utils.config import CONFIG, HORA_S
+from Utils.forecast_cache import ForecastCache, current_issue_hour
+from Utils.history_cache import get_history_cache
+from Utils.prediction_audit import get_prediction_audit
+from Utils.rate_limiter import get_scheduler
+from Utils.resilience import get_breaker, get_forecast_latency
+from Utils.single_flight import SingleFlight
+from Utils.stage_executors import get_stages, run_stage
+from Controllers.chatbot.text_normalizer import TextNormalizer
+from Etl.observation_store import OBS_COLUMNS, get_observation_store
 from Etl.preprocessor import TimeSeriesPreprocessor
-from Etl.dataset import TimeSeriesDataset
-from Controllers.train_or_load_model import TrainOrLoadModel
+from Controllers.horizon_engine import history_days_needed
+from Controllers.model_registry import ModelBundle, get_model_registry
 
 
 class PredictionController:
     """Clase para manejar la predicción del clima utilizando un modelo de series temporales."""
 
     def __init__(self):
+        self.single_flight = SingleFlight()
+        self.forecast_cache = ForecastCache()
+        self.observations = get_observation_store()
+        self.audit = get_prediction_audit()
         self.set_seeds()
-        self.model, self.preprocessor = (
-            TrainOrLoadModel().train_or_load_model()
-        )  # Entrenar o cargar el modelo al iniciar la clase
+        self.preprocessor = TimeSeriesPreprocessor()
+
+        # Registro de versiones: la primera vez se entrena (si hace falta) y se
+        # importa el modelo de CONFIG['RUTAS'] como v1
+        self.registry = get_model_registry()
+        if self.registry.active_version() is None:
+            if not os.path.exists(CONFIG["RUTAS"]["MODELO"]):
+                from Controllers.train_or_load_model import TrainOrLoadModel
+
+                TrainOrLoadModel().train_or_load_model()
+            self.registry.bootstrap()
+        self.bundle = ModelBundle.load(self.registry, self.registry.active_version(), self.preprocessor)
+        self.previous_bundle = None  # Versión anterior residente (reversión inmediata)
+        self._swap_lock = asyncio.Lock()
+        self._next_registry_check = 0.0
 
     # Configurar semillas para reproducibilidad
     def set_seeds(self, seed=123):
-        tf.random.set_seed(seed)
         np.random.seed(seed)
+        if CONFIG["SERVIDOR_MODELO"]["SOCKET"]:
+            return  # Worker de serve.py: TensorFlow vive en el servidor del modelo
+        import tensorflow as tf
+
+        tf.random.set_seed(seed)
         tf.config.experimental.enable_op_determinism()
         os.environ["TF_DETERMINISTIC_OPS"] = "1"
 
+    async def warmup(self, days=7):
+        """
+        Pronóstico completo sobre una ventana sintética (características,
+        escalado, micro-lotes y modelo) para que la primera solicitud real no
+        pague la inicialización.
+        """
+        input_length = CONFIG["SECUENCIA"]["INPUT_LENGTH"]
+        epochs = HORA_S * (current_issue_hour() - input_length + np.arange(1, input_length + 1))
+        valores = np.zeros((1, input_length, len(OBS_COLUMNS)))
+        await self.bundle.horizon.rollout(epochs[None], valores, days * 24)
+        # El cliente HTTP (contexto SSL) tampoco se crea en la primera solicitud
+        get_client()
+
+    def metrics(self):
+        """Métricas internas del pipeline de predicción."""
+        return {
+            "single_flight": self.single_flight.stats(),
+            "forecast_cache": self.forecast_cache.stats(),
+            "model": {
+                "version": self.bundle.version,
+                "variant": self.bundle.variant,
+                "previous_resident": self.previous_bundle.version if self.previous_bundle else None,
+            },
+            "inference_batcher": self.bundle.batcher.stats(),
+            "executors": get_stages().stats(),
+            "horizon_steps": self.bundle.horizon.steps,
+            "prediction_audit": self.audit.stats(),
+            "history_cache": get_history_cache().stats(),
+            "weather_api_scheduler": get_scheduler().stats(),
+            "weather_api_breaker": get_breaker().stats(),
+            "forecast_latency": get_forecast_latency().stats(),
+        }
+
+    def list_models(self):
+        """Versiones del registro, con la activa y la residente marcadas."""
+        resident = self.previous_bundle.version if self.previous_bundle else None
+        return [
+            {**metadata, "serving": metadata["version"] == self.bundle.version,
+             "resident": metadata["version"] == resident}
+            for metadata in self.registry.versions()
+        ]
+
+    def _swap(self, bundle, rollback=False):
+        """Intercambio atómico: las solicitudes nuevas usan `bundle` desde aquí."""
+        self.registry.set_active(bundle.version, rollback=rollback)
+        old, self.bundle = self.bundle, bundle
+        self.previous_bundle = old if CONFIG["REGISTRO"]["MANTENER_ANTERIOR"] else None
+        # Los pronósticos en caché son del modelo anterior
+        self.forecast_cache.clear()
+        print(f"🔁 Modelo activo: {old.version} -> {bundle.version}")
+
+    async def activate_model(self, version):
+        """
+        Carga y calienta `version` en segundo plano y la pone en servicio.
+        Las solicitudes en curso terminan con la versión con la que empezaron.
+        """
+        if not self.registry.exists(version):
+            raise KeyError(f"La versión {version} no existe en el registro.")
+        async with self._swap_lock:
+            if version == self.bundle.version:
+                return self.bundle.version
+            if self.previous_bundle is not None and self.previous_bundle.version == version:
+                bundle = self.previous_bundle
+            else:
+                loop = asyncio.get_running_loop()
+                bundle = await loop.run_in_executor(
+                    None, ModelBundle.load, self.registry, version, self.preprocessor
+                )
+            self._swap(bundle)
+            return bundle.version
+
+    async def rollback_model(self):
+        """Vuelve a la versión activa anterior (inmediato si sigue residente)."""
+        async with self._swap_lock:
+            version = self.registry.previous_version()
+            if version is None:
+                raise KeyError("No hay una versión anterior a la que volver.")
+            if self.previous_bundle is not None and self.previous_bundle.version == version:
+                bundle = self.previous_bundle
+            else:
+                loop = asyncio.get_running_loop()
+                bundle = await loop.run_in_executor(
+                    None, ModelBundle.load, self.registry, version, self.preprocessor
+                )
+            self._swap(bundle, rollback=True)
+            return bundle.version
+
+    def _follow_registry(self):
+        """
+        Con varios workers (serve.py) una activación o reversión llega a uno
+        solo; los demás siguen el archivo ACTIVE del registro y cambian de
+        versión en segundo plano.
+        """
+        now = time.monotonic()
+        if now < self._next_registry_check:
+            return
+        self._next_registry_check = now + CONFIG["REGISTRO"]["SINCRONIZAR_S"]
+        active = self.registry.active_version()
+        if active is not None and active != self.bundle.version and not self._swap_lock.locked():
+            task = asyncio.ensure_future(self.activate_model(active))
+            task.add_done_callback(
+                lambda t: t.cancelled() or t.exception() is None
+                or print(f"⚠️ No se pudo seguir la versión activa {active}: {t.exception()}")
+            )
+
     async def predict_from_api(self, city, days, db, user_id=None):
+        self._follow_registry()
 
         if user_id is None and days > 2:
             raise HTTPException(
@@ -45,56 +182,68 @@ class PredictionController:
                     detail="Debe estar autenticado para generar la predicción. Por favor, inicie sesión o regístrese. 🔐"
                 )
 
-        total_hours = days * 24
-        if 1 <= days <= 6:
-            days += 2
-        print(f"🌦️ Obteniendo datos de clima desde la API para {city}...")
-
-        # 1. Obtener datos de la API
-        datos_api = get_data(city, days)
-        df_clima = extract_hourly_data(datos_api)
-        df_clima = df_clima.sort_index()
-        df_clima = df_clima[~df_clima.index.duplicated(keep="last")]
-        info_adicional = extract_additional_info(city, days)
+        # Un pronóstico emitido en esta hora con horizonte igual o mayor se recorta
+        canonical = TextNormalizer.normalize_city(city)
+        issue_hour = current_issue_hour()
+        cached = self.forecast_cache.get(canonical, days, issue_hour)
+        if cached is not None:
+            pred_df, info_adicional = cached
+        else:
+            # Solicitudes idénticas concurrentes comparten descarga, preprocesamiento
+            # e inferencia; la auditoría atribuye las filas a quien la ejecutó
+            pred_df, info_adicional = await self.single_flight.do(
+                (canonical, days), self._forecast, city, days, issue_hour, user_id
+            )
 
-        # 2. Preprocesamiento
-        tiempo_s = df_clima.index.map(pd.Timestamp.timestamp)
-        self.preprocessor = TimeSeriesPreprocessor()
-        self.preprocessor.load_scalers(CONFIG["RUTAS"]["SCALER"])
-        df_clima_proc = self.preprocessor.add_cyclical_features(
-            df_clima.copy(), tiempo_s
+        # 5. Agrupar por días para la respuesta tipo API (cada solicitud guarda sus registros)
+        inserted_forecasts, info_adicional = await SavePredictions().save_predictions(
+            pred_df, info_adicional, city, db, user_id=user_id
         )
-        df_clima_proc = self.preprocessor.process_wind_data(df_clima_proc)
 
-        # 3. Crear secuencias y escalar
-        dataset_handler = TimeSeriesDataset()
-        x_seq, _ = dataset_handler.create_sequences(
-            df_clima_proc, target_col=CONFIG["TARGET_COL"]
-        )
-        if x_seq is None or len(x_seq) == 0:
-            raise ValueError(
-                f"❌ No se pudieron generar secuencias de entrada. Se requieren al menos {CONFIG['SECUENCIA']['INPUT_LENGTH'] + CONFIG['SECUENCIA']['OUTPUT_LENGTH'] - 1} registros, pero se recibieron {len(df_clima_proc)}."
-            )
-        x_seq_scaled = self.preprocessor.scale_features(x_seq)
+        return inserted_forecasts, info_adicional
 
-        pred_scaled = self.model.predict(x_seq_scaled)
-        pred_original = self.preprocessor.inverse_scale_target(
-            pred_scaled, target_names=["temp_c", "humidity"]
-        )
+    async def _fetch_window(self, city, days):
+        """
+        Descarga lo que falta y arma la última ventana de entrada de una ciudad.
 
-        # 4. Construir dataframe con predicciones
+        Returns:
+            Tuple[np.ndarray, np.ndarray, list]: (epochs (INPUT_LENGTH,),
+            observaciones (INPUT_LENGTH, n_obs), información adicional)
+        """
+        input_length = CONFIG["SECUENCIA"]["INPUT_LENGTH"]
+        print(f"🌦️ Obteniendo datos de clima desde la API para {city}...")
 
-        pred_original = pred_original.reshape(-1, pred_original.shape[-1])
-        pred_original = pred_original[:total_hours]
+        # Solo la historia de la ventana de entrada y solo los días que faltan en el almacén
+        fechas = history_dates(history_days_needed())
+        faltantes = await run_stage("io", self.observations.missing_dates, city, fechas)
+        datos_api, info_adicional = await asyncio.gather(
+            get_dates_async(city, faltantes),
+            extract_additional_info_async(city, days),
+        )
+        if datos_api:
+            arrays = await run_stage("cpu", extract_hourly_arrays, datos_api)
+            await run_stage("io", self.observations.write, city, *arrays)
+        epochs, valores = await run_stage("io", self.observations.read_dates, city, fechas)
 
-        last_datetime = df_clima.index[-1]
+        # Última ventana de horas consecutivas
+        epochs, valores = epochs[-input_length:], valores[-input_length:]
+        if len(epochs) < input_length or np.any(np.diff(epochs) != HORA_S):
+            raise ValueError(
+                f"❌ No se pudo armar la ventana de entrada. Se requieren {input_length} horas consecutivas, pero se recibieron {len(epochs)}."
+            )
+        return epochs, valores, info_adicional
+
+    @staticmethod
+    def _prediction_frame(last_epoch, pred_original):
+        """DataFrame horario con las predicciones que siguen a `last_epoch`."""
+        last_datetime = pd.Timestamp(last_epoch, unit="s")
         future_dates = pd.date_range(
             start=last_datetime + pd.Timedelta(hours=1),
             periods=len(pred_original),
             freq="H",
         )
 
-        pred_df = pd.DataFrame(
+        return pd.DataFrame(
             {
                 "datetime": future_dates,
                 "temp_pred": pred_original[:, 0],
@@ -102,12 +251,144 @@ class PredictionController:
             }
         )
 
+    @classmethod
+    def _prediction_frames(cls, last_epochs, pred_original, hours):
+        """Un DataFrame por serie del lote, recortado a sus horas."""
+        return [
+            cls._prediction_frame(last_epoch, pred_original[i, :n])
+            for i, (last_epoch, n) in enumerate(zip(last_epochs, hours))
+        ]
+
+    async def _forecast(self, city, days, issue_hour=None, user_id=None):
+        """
+        Descarga los datos, preprocesa y ejecuta el modelo para una ciudad, y
+        guarda el resultado en la caché de pronósticos de `issue_hour` y en la
+        auditoría (con `user_id`, None si es anónimo).
+
+        Returns:
+            Tuple[pd.DataFrame, list]: (predicciones horarias, información adicional)
+        """
+        bundle = self.bundle  # La versión con la que empieza la solicitud la termina
+
+        # 1-2. Datos y última ventana de horas consecutivas
+        epochs, valores, info_adicional = await self._fetch_window(city, days)
+
+        # 3. Despliegue autorregresivo: ceil(horas / OUTPUT_LENGTH) pasadas del modelo
+        pred_original = await bundle.horizon.rollout(epochs[None], valores[None], days * 24)
+
+        # 4. Construir dataframe con predicciones
+        pred_df = await run_stage("cpu", self._prediction_frame, epochs[-1], pred_original[0])
+
         print("✅ Predicciones generadas correctamente.\n")
-        pred_df.to_csv("data_train/predicciones.csv", index=False)
+        canonical = TextNormalizer.normalize_city(city)
+        # Si la versión cambió durante la solicitud la caché ya se vació: la
+        # salida del modelo anterior no se guarda
+        if issue_hour is not None and self.bundle is bundle:
+            self.forecast_cache.put(canonical, days, pred_df, info_adicional, issue_hour)
+        # Solo se encola: el hilo de auditoría escribe los segmentos Parquet
+        await self.audit.log(pred_df, canonical, days, bundle.version, bundle.variant, user_id)
 
-        # 5. Agrupar por días para la respuesta tipo API
-        inserted_forecasts, info_adicional = await SavePredictions().save_predictions(
-            pred_df, info_adicional, city, db, user_id=user_id
-        )
+        return pred_df, info_adicional
 
-        return inserted_forecasts, info_adicional
+    async def predict_batch(self, items, db, user_id=None):
+        """
+        Pronósticos de varias ciudades a la vez.
+
+        Las descargas de todas las ciudades corren en paralelo, sus ventanas se
+        apilan en un solo tensor (una pasada del modelo por paso del horizonte
+        para todas) y los resultados se guardan en una sola transacción. Un
+        error en una ciudad se reporta en su resultado sin afectar a las demás.
+
+        Args:
+            items: Lista de (ciudad, días).
+            db: Sesión de base de datos.
+            user_id: Usuario que realiza la solicitud.
+
+        Returns:
+            list[dict]: Por cada item, {"city", "days", "forecasts", "error"}.
+        """
+        self._follow_registry()
+        bundle = self.bundle
+        issue_hour = current_issue_hour()
+        results = [{"city": city, "days": days, "forecasts": None, "error": None} for city, days in items]
+        canonicals = [TextNormalizer.normalize_city(city) for city, _ in items]
+
+        # 1. Días por ciudad (la solicitud más larga) y pronósticos ya en caché
+        max_days = {}
+        for result, canonical in zip(results, canonicals):
+            if user_id is None and result["days"] > 2:
+                result["error"] = "Debe estar autenticado para predicciones de más de 2 días. 🔐"
+                continue
+            max_days[canonical] = max(max_days.get(canonical, 0), result["days"])
+
+        frames, errors, pending = {}, {}, {}
+        for result, canonical in zip(results, canonicals):
+            if canonical not in max_days or canonical in frames or canonical in pending:
+                continue
+            cached = self.forecast_cache.get(canonical, max_days[canonical], issue_hour)
+            if cached is not None:
+                frames[canonical] = cached
+            else:
+                pending[canonical] = result["city"]
+
+        # 2. Descargas concurrentes; una falla solo afecta a su ciudad
+        if pending:
+            windows = await asyncio.gather(
+                *(self._fetch_window(city, max_days[canonical]) for canonical, city in pending.items()),
+                return_exceptions=True,
+            )
+            ready = []
+            for canonical, window in zip(pending, windows):
+                if isinstance(window, Exception):
+                    errors[canonical] = str(window)
+                else:
+                    ready.append((canonical, window))
+
+            # 3. Un solo despliegue con todas las ventanas apiladas (eje 0)
+            if ready:
+                epochs = np.stack([window[0] for _, window in ready])
+                valores = np.stack([window[1] for _, window in ready])
+                hours = 24 * max(max_days[canonical] for canonical, _ in ready)
+                try:
+                    pred_original = await bundle.horizon.rollout(epochs, valores, hours)
+                except Exception as e:
+                    for canonical, _ in ready:
+                        errors[canonical] = str(e)
+                else:
+                    last_epochs = [window[0][-1] for _, window in ready]
+                    hours_by_city = [max_days[canonical] * 24 for canonical, _ in ready]
+                    pred_dfs = await run_stage("cpu", self._prediction_frames, last_epochs, pred_original, hours_by_city)
+                    for (canonical, (_, _, info_adicional)), pred_df in zip(ready, pred_dfs):
+                        days = max_days[canonical]
+                        if self.bundle is bundle:  # ver _forecast
+                            self.forecast_cache.put(canonical, days, pred_df, info_adicional, issue_hour)
+                        frames[canonical] = (pred_df, info_adicional)
+                        await self.audit.log(pred_df, canonical, days, bundle.version, bundle.variant, user_id)
+
+        # 4. Guardar todo en una transacción (etapa de persistencia)
+        for result, canonical in zip(results, canonicals):
+            if result["error"] is None and canonical in errors:
+                result["error"] = errors[canonical]
+        await run_stage("persistencia", self._save_batch, results, canonicals, frames, db, user_id)
+
+        fallidas = sum(1 for result in results if result["error"] is not None)
+        print(f"✅ Pronóstico por lote: {len(results) - fallidas}/{len(results)} ciudades correctas.\n")
+        return results
+
+    @staticmethod
+    def _save_batch(results, canonicals, frames, db, user_id):
+        """Guarda los pronósticos del lote; cada ciudad en su propio savepoint y un solo commit."""
+        save = SavePredictions()
+        for result, canonical in zip(results, canonicals):
+            if result["error"] is not None:
+                continue
+            pred_df, info_adicional = frames[canonical]
+            try:
+                with db.begin_nested():
+                    result["forecasts"], _ = save.save(
+                        pred_df.iloc[: result["days"] * 24], info_adicional, result["city"], db,
+                        user_id=user_id, commit=False,
+                    )
+            except Exception as e:
+                result["error"] = f"Error al guardar el pronóstico: {e}"
+        db.commit()
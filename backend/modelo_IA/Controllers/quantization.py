@@ -0,0 +1,282 @@
+# quantization.py - Variantes cuantizadas del modelo (TFLite int8 / float16)
+"""
+Exportación del modelo entrenado a TFLite con cuantización posterior al
+entrenamiento y compuerta de precisión.
+
+- int8: cuantización dinámica de rango (pesos en int8, activaciones en float).
+- float16: pesos en float16.
+
+El LSTM solo se convierte a la operación fusionada de TFLite con forma
+estática, así que se exporta un archivo por tamaño de lote (potencias de dos,
+como la ruta compilada de TimeSeriesModel) y cada lote se rellena a su bucket.
+
+La compuerta compara MAE/RMSE sobre el conjunto de prueba de
+TimeSeriesDataset contra el modelo float32 y rechaza las variantes que
+empeoran más que CONFIG['CUANTIZACION']['TOLERANCIA_RELATIVA'].
+
+Uso:
+    python -m Controllers.quantization [versión]
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+try:
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:  # pragma: no cover - depende del entorno
+    Interpreter = tf.lite.Interpreter
+
+from Etl.dataset import TimeSeriesDataset
+from Etl.preprocessor import TimeSeriesPreprocessor
+from Utils.config import CONFIG
+
+VARIANTES = ("int8", "float16")
+
+
+def _tflite_name(variant, batch):
+    return f"model_{variant}_b{batch}.tflite"
+
+
+def convert_tflite(keras_model, variant, batch):
+    """
+    Convierte el modelo Keras a TFLite con un tamaño de lote fijo.
+
+    Args:
+        keras_model: Modelo Keras entrenado.
+        variant: 'int8', 'float16' o 'float32' (sin cuantizar).
+        batch: Tamaño de lote estático.
+
+    Returns:
+        bytes: Modelo TFLite serializado.
+    """
+    inputs = tf.keras.Input(shape=keras_model.input_shape[1:], batch_size=batch)
+    wrapper = tf.keras.Model(inputs, keras_model(inputs, training=False))
+    converter = tf.lite.TFLiteConverter.from_keras_model(wrapper)
+    if variant != "float32":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+
+class TFLiteModel:
+    """
+    Modelo TFLite con un intérprete por bucket de lote. Expone la misma
+    interfaz de inferencia que TimeSeriesModel (predict e input_shape).
+    """
+
+    def __init__(self, variant, interpreters):
+        """
+        Args:
+            variant: Nombre de la variante.
+            interpreters: Diccionario {tamaño de lote: Interpreter con tensores asignados}.
+        """
+        self.variant = variant
+        self.buckets = sorted(interpreters)
+        self._interpreters = interpreters
+        self._lock = threading.Lock()
+        details = interpreters[self.buckets[0]].get_input_details()[0]
+        self.input_shape = (None,) + tuple(int(d) for d in details["shape"][1:])
+
+    @classmethod
+    def load(cls, directory, variant, buckets):
+        interpreters = {}
+        for batch in buckets:
+            interpreter = Interpreter(
+                model_path=os.path.join(directory, _tflite_name(variant, batch)), num_threads=1
+            )
+            interpreter.allocate_tensors()
+            interpreters[batch] = interpreter
+        return cls(variant, interpreters)
+
+    def _invoke(self, batch, x):
+        interpreter = self._interpreters[batch]
+        interpreter.set_tensor(interpreter.get_input_details()[0]["index"], x)
+        interpreter.invoke()
+        return interpreter.get_tensor(interpreter.get_output_details()[0]["index"]).copy()
+
+    def predict(self, x):
+        """Inferencia rellenando cada lote al bucket siguiente (como TimeSeriesModel)."""
+        x = np.asarray(x, dtype=np.float32)
+        if len(x) == 0:
+            shape = self._interpreters[self.buckets[0]].get_output_details()[0]["shape"][1:]
+            return np.zeros((0,) + tuple(int(d) for d in shape), dtype=np.float32)
+        largest = self.buckets[-1]
+        outputs = []
+        with self._lock:
+            for start in range(0, len(x), largest):
+                chunk = x[start:start + largest]
+                size = next(b for b in self.buckets if b >= len(chunk))
+                if size != len(chunk):
+                    padding = np.zeros((size - len(chunk),) + chunk.shape[1:], dtype=np.float32)
+                    chunk = np.concatenate([chunk, padding])
+                outputs.append(self._invoke(size, chunk)[:min(largest, len(x) - start)])
+        return np.concatenate(outputs)
+
+
+def export_variant(keras_model, directory, variant, buckets):
+    """Escribe un .tflite por bucket. Retorna el tamaño total en bytes."""
+    total = 0
+    for batch in buckets:
+        content = convert_tflite(keras_model, variant, batch)
+        path = os.path.join(directory, _tflite_name(variant, batch))
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(content)
+        os.replace(f"{path}.tmp", path)
+        total += len(content)
+    return total
+
+
+def load_test_split(scaler, frame=None):
+    """
+    Conjunto de prueba de TimeSeriesDataset, escalado.
+
+    Args:
+        scaler: CompiledScaler de la versión evaluada.
+        frame: DataFrame de observaciones (índice datetime). Por defecto
+               CONFIG['RUTAS']['DATOS'] o, si no existe, el almacén de observaciones.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (x_test escalado, y_test en escala original)
+    """
+    if frame is None:
+        if os.path.exists(CONFIG["RUTAS"]["DATOS"]):
+            frame = pd.read_csv(CONFIG["RUTAS"]["DATOS"], index_col="datetime", parse_dates=["datetime"])
+        else:
+            from Etl.observation_store import get_observation_store
+
+            frame = get_observation_store().export_training_frame()
+            if "city" in frame.columns:
+                # Una sola serie continua: la ciudad con más observaciones
+                frame = frame[frame["city"] == frame["city"].value_counts().idxmax()].drop(columns=["city"])
+
+    preprocessor = TimeSeriesPreprocessor()
+    tiempo_s = frame.index.map(pd.Timestamp.timestamp)
+    df = preprocessor.process_wind_data(preprocessor.add_cyclical_features(frame, tiempo_s))
+    df = df.reset_index(drop=True)
+
+    data = TimeSeriesDataset().prepare_dataset(df, target_col=CONFIG["TARGET_COL"])
+    if len(data["x_test"]) == 0:
+        raise ValueError("❌ No hay datos suficientes para el conjunto de prueba.")
+    return scaler.scale_features(data["x_test"]), data["y_test"]
+
+
+def evaluate(predict_fn, scaler, x_test, y_test):
+    """MAE y RMSE en la escala original de los objetivos."""
+    pred = scaler.inverse_scale_target(
+        np.asarray(predict_fn(x_test), dtype=np.float32), CONFIG["TARGET_COL"]
+    )
+    error = pred - y_test
+    return {
+        "mae": float(np.mean(np.abs(error))),
+        "rmse": float(np.sqrt(np.mean(np.square(error)))),
+    }
+
+
+def measure_latency_ms(predict_fn, x, batches=(1, 8, 64), repeats=30):
+    """Mediana de latencia por llamada para cada tamaño de lote."""
+    result = {}
+    for batch in batches:
+        sample = np.resize(x, (batch,) + x.shape[1:]).astype(np.float32)
+        predict_fn(sample)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predict_fn(sample)
+            times.append(time.perf_counter() - start)
+        result[str(batch)] = 1000 * float(np.median(times))
+    return result
+
+
+def _rss_bytes():
+    """Memoria residente del proceso (Linux); None si no está disponible."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def quantize_version(registry, version, variants=VARIANTES, frame=None, tolerance=None):
+    """
+    Exporta las variantes cuantizadas de una versión del registro, las
+    evalúa contra float32 y guarda el reporte en sus metadatos.
+
+    Returns:
+        dict: Reporte por variante (mae, rmse, latencia, tamaño, accepted).
+    """
+    from Controllers.model_build import TimeSeriesModel
+    from Controllers.model_registry import MODEL_FILE, SCALER_NPZ, SCALER_PKL
+    from Etl.scaling import load_compiled_scaler
+
+    tolerance = CONFIG["CUANTIZACION"]["TOLERANCIA_RELATIVA"] if tolerance is None else tolerance
+    directory = registry.version_dir(version)
+    base = TimeSeriesModel().load(os.path.join(directory, MODEL_FILE))
+    scaler = load_compiled_scaler(os.path.join(directory, SCALER_NPZ), os.path.join(directory, SCALER_PKL))
+    x_test, y_test = load_test_split(scaler, frame)
+    buckets = base.buckets or [2 ** i for i in range(int(np.log2(CONFIG["INFERENCIA"]["BUCKET_MAX"])) + 1)]
+
+    report = {
+        "float32": {
+            **evaluate(base.predict, scaler, x_test, y_test),
+            "latency_ms": measure_latency_ms(base.predict, x_test),
+            "size_bytes": os.path.getsize(os.path.join(directory, MODEL_FILE)),
+            "accepted": True,
+        }
+    }
+    for variant in variants:
+        size = export_variant(base.model, directory, variant, buckets)
+        rss_before = _rss_bytes()
+        model = TFLiteModel.load(directory, variant, buckets)
+        rss_after = _rss_bytes()
+        metrics = evaluate(model.predict, scaler, x_test, y_test)
+        accepted = (
+            metrics["mae"] <= report["float32"]["mae"] * (1 + tolerance)
+            and metrics["rmse"] <= report["float32"]["rmse"] * (1 + tolerance)
+        )
+        report[variant] = {
+            **metrics,
+            "latency_ms": measure_latency_ms(model.predict, x_test),
+            "size_bytes": size,
+            "rss_delta_bytes": rss_after - rss_before if rss_before is not None else None,
+            "accepted": accepted,
+        }
+        estado = "✅ aceptada" if accepted else "❌ rechazada"
+        print(f"{variant}: MAE {metrics['mae']:.4f} RMSE {metrics['rmse']:.4f} -> {estado}")
+
+    # Se conservan los reportes de variantes evaluadas en ejecuciones anteriores
+    previous = registry.metadata(version).get("quantization", {}).get("variants", {})
+    registry.update_metadata(version, {
+        "quantization": {"tolerance": tolerance, "buckets": buckets, "variants": {**previous, **report}}
+    })
+    return report
+
+
+def load_variant(registry, version, variant):
+    """
+    Carga una variante cuantizada de la versión si existe y pasó la compuerta.
+
+    Returns:
+        TFLiteModel | None
+    """
+    quantization = registry.metadata(version).get("quantization", {})
+    info = quantization.get("variants", {}).get(variant)
+    if not info or not info.get("accepted"):
+        print(f"⚠️ La variante {variant} de {version} no está disponible o no pasó la compuerta; se usa float32")
+        return None
+    return TFLiteModel.load(registry.version_dir(version), variant, quantization["buckets"])
+
+
+if __name__ == "__main__":
+    from Controllers.model_registry import get_model_registry
+
+    _registry = get_model_registry()
+    _version = sys.argv[1] if len(sys.argv) > 1 else _registry.bootstrap()
+    for _variant, _info in quantize_version(_registry, _version).items():
+        print(_variant, _info)
@@ -1,11 +1,18 @@
 from datetime import datetime
 from models.tables import Forecast, Hour, PredictionsUser
-import asyncio
+from Utils.stage_executors import run_stage
 
 
 class SavePredictions:
 
-    async def save_predictions(self, pred_df, info_adicional, city, db, user_id=None):
+    async def save_predictions(self, pred_df, info_adicional, city, db, user_id=None, commit=True):
+        # La sesión de SQLAlchemy es síncrona: corre en la etapa de persistencia
+        return await run_stage(
+            "persistencia", self.save, pred_df, info_adicional, city, db, user_id=user_id, commit=commit
+        )
+
+    def save(self, pred_df, info_adicional, city, db, user_id=None, commit=True):
+        # commit=False: no se confirma nada, la transacción la cierra quien llama
         forecast_day_list = []
         unique_dates = sorted(pred_df['datetime'].dt.date.unique())
 
@@ -70,14 +77,15 @@ class SavePredictions:
                 location=output_api_structure["location"]
             )
             db.add(forecast_obj)
-            db.commit()
-            db.refresh(forecast_obj)
+            if commit:
+                db.commit()
+                db.refresh(forecast_obj)
             inserted_forecasts.append(forecast_obj)
 
             for hr in block["hour"]:
                 # Crear un diccionario con todos los campos disponibles
                 hour_data = {
-                    "forecast_id": forecast_obj.id,
+                    "forecast": forecast_obj,
                     "date_time": datetime.strptime(hr["date_time"], "%Y-%m-%d %H:%M:%S"),
                     "temp_pred": hr.get("temp_c"),
                     "humidity_pred": hr.get("humidity")
@@ -95,12 +103,13 @@ class SavePredictions:
                 # Crear objeto Hour con los campos relevantes
                 hour_obj = Hour(**hour_data)
                 db.add(hour_obj)
-                db.flush() # Para obtener el ID generado automáticamente
                 if user_id is not None:
-                    prediction_user = PredictionsUser(user_id=user_id, hour_id=hour_obj.id)
+                    # Enlazado por la relación: los INSERT se agrupan al hacer flush
+                    prediction_user = PredictionsUser(user_id=user_id, hour=hour_obj)
                     db.add(prediction_user)
 
             
-            db.commit()
+            if commit:
+                db.commit()
 
         return inserted_forecasts, output_api_structure
\ No newline at end of file
@@ -2,11 +2,10 @@
 
 import os
 
-import pandas as pd
-
 from Controllers.model_build import TimeSeriesModel
-from Etl.dataset import TimeSeriesDataset
-from Etl.preprocessor import TimeSeriesPreprocessor
+from Etl.dataset import TimeSeriesDataset, column_view
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Etl.training_store import TrainingDataStore
 from Utils.config import CONFIG
 
 
@@ -25,61 +24,46 @@ class TrainOrLoadModel:
             return model, preprocessor
         else:
             print("No se encontró modelo entrenado. Entrenando uno nuevo...")
-            # 1. Cargar datos
+            # 1. Cargar datos (el CSV se convierte a Parquet solo si cambió)
             print("1. Cargando datos...")
+            store = TrainingDataStore()
+            series = store.sync_csv(CONFIG['RUTAS']['DATOS'])
             
-            # Para este ejemplo, simulamos datos
-            df = pd.read_csv(CONFIG['RUTAS']['DATOS'], index_col='datetime', parse_dates=['datetime'])
-        
-            # Calcular tiempo en segundos desde el inicio
-            tiempo_s = df.index.map(pd.Timestamp.timestamp)
-            
-            # 2. Preprocesamiento
+            # 2. Preprocesamiento, por bloques hacia un memmap por serie
             print("2. Preprocesando datos...")
             preprocessor = TimeSeriesPreprocessor()
+            target_idxs = [FEATURE_COLUMNS.index(col) for col in CONFIG['TARGET_COL']]
+            features = [store.features(serie, preprocessor) for serie in series]
             
-            # Añadir características cíclicas
-            df = preprocessor.add_cyclical_features(df, tiempo_s)
-            
-            # Procesar datos de viento
-            df = preprocessor.process_wind_data(df)
-            
-            # Resetear índice y eliminar columna datetime
-            df = df.reset_index()
-            df = df.drop(columns=['datetime'])
-            
-            # 3. Preparar conjuntos de datos
+            # 3. Preparar conjuntos de datos (vistas sobre los memmaps)
             print("3. Preparando conjuntos de datos...")
             dataset_handler = TimeSeriesDataset()
-            data_dict = dataset_handler.prepare_dataset(df, target_col=CONFIG['TARGET_COL'])
+            windows = dataset_handler.prepare_series_windows(
+                [(array, column_view(array, target_idxs)) for array in features]
+            )
             
             # 4. Escalar datos
             print("4. Escalando datos...")
-            # Ajustar escaladores con datos de entrenamiento
-            preprocessor.fit_scalers(data_dict['x_train'])
-            preprocessor.fit_target_scaler(data_dict['y_train'], target_names=['temp_c', 'humidity'])
-            
-            # Escalar conjuntos de datos
-            x_train_scaled = preprocessor.scale_features(data_dict['x_train'])
-            x_val_scaled = preprocessor.scale_features(data_dict['x_val'])
-            x_test_scaled = preprocessor.scale_features(data_dict['x_test'])
-            
-            y_train_scaled = preprocessor.scale_target(data_dict['y_train'], target_names=['temp_c', 'humidity'])
-            y_val_scaled = preprocessor.scale_target(data_dict['y_val'], target_names=['temp_c', 'humidity'])
-            y_test_scaled = preprocessor.scale_target(data_dict['y_test'], target_names=['temp_c', 'humidity'])
+            # Ajustar escaladores por bloques con las filas de entrenamiento que cubren
+            # las ventanas (mismos parámetros que ajustar sobre las ventanas copiadas)
+            rows = CONFIG['DATOS_COLUMNARES']['FILAS_POR_LOTE']
+            for chunk in windows['train'].input_chunks(rows):
+                preprocessor.partial_fit_scalers(chunk)
+            for chunk in windows['train'].target_chunks(rows):
+                preprocessor.partial_fit_target_scaler(chunk, target_names=['temp_c', 'humidity'])
             
-            # Guardar escaladores para uso posterior
+            # Guardar escaladores para uso posterior (las ventanas se escalan
+            # dentro del grafo de tf.data al entrenar, ver window_dataset)
             preprocessor.save_scalers(CONFIG['RUTAS']['SCALER'])
             
             # 5. Crear y entrenar modelo
-            # 5. Crear o cargar modelo
             print("5. Entrenando modelo...")
             model = TimeSeriesModel()
-            model.build_model(input_shape=(x_train_scaled.shape[1], x_train_scaled.shape[2]))
-            model.train(x_train_scaled, y_train_scaled, x_val_scaled, y_val_scaled)
+            model.build_model(input_shape=(windows['train'].input_length, windows['train'].n_features))
+            model.train_windows(windows['train'], windows['val'], scaler=preprocessor)
             # 6. Evaluar modelo
             print("6. Evaluando modelo...")
-            metrics, y_pred = model.evaluate(x_test_scaled, y_test_scaled, scaler=preprocessor)
+            metrics, y_pred = model.evaluate_windows(windows['test'], scaler=preprocessor)
             
             # 7. Visualizar resultados
             print("7. Visualizando resultados...")
@@ -1,44 +1,280 @@
-import requests
+import asyncio
+import time
+from operator import itemgetter
+import httpx
+import numpy as np
 import pandas as pd
+import math
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 import pytz
 from dotenv import load_dotenv
 import os
+from Etl.observation_store import OBS_COLUMNS
+from Utils.config import CONFIG
+from Utils.fast_json import loads
+from Utils.history_cache import get_history_cache
+from Utils.rate_limiter import PRIORIDAD_INTERACTIVA, get_scheduler
+from Utils.resilience import get_breaker, get_forecast_latency
+from Utils.stage_executors import run_stage
 
 load_dotenv(".env")
 
 API_KEY = os.getenv("API_KEY")
 
+# Cliente HTTP compartido (pool con keep-alive) para el event loop del servidor
+_client = None
 
-def get_data(city: str, days: int):
+
+def _build_client():
+    """Crea un cliente asíncrono con pool de conexiones y timeouts por llamada."""
+    cfg = CONFIG["WEATHER_API"]
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(cfg["TIMEOUT_S"], connect=cfg["CONNECT_TIMEOUT_S"]),
+        limits=httpx.Limits(
+            max_connections=cfg["MAX_CONNECTIONS"],
+            max_keepalive_connections=cfg["MAX_KEEPALIVE"],
+        ),
+    )
+
+
+def get_client():
+    """Retorna el cliente compartido, creándolo la primera vez que se necesita."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def close_client():
+    """Cierra el cliente compartido (se invoca al apagar la aplicación)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def _current_date():
     tz = pytz.timezone("America/Bogota")
-    date_current = datetime.now(tz).strftime("%Y-%m-%d")
+    return datetime.now(tz).strftime("%Y-%m-%d")
 
-    all_data = []
 
+def _history_dates(days: int, date_current: str):
+    """Fechas (YYYY-MM-DD) a consultar en history.json, de la más reciente a la más antigua."""
     if days == 0:
         # Obtener solo la fecha actual
-        url = f"http://api.weatherapi.com/v1/history.json?key={API_KEY}&q={city}&dt={date_current}&aqi=yes"
-        response = requests.get(url)
-        if response.status_code == 200:
-            all_data.append(response.json())
-        else:
-            print(f"Error en la solicitud para la fecha actual: {response.status_code}")
-    else:
-        for i in range(1, days + 1):
-            date = (pd.to_datetime(date_current) - pd.DateOffset(days=i)).strftime(
-                "%Y-%m-%d"
-            )
-            url = f"http://api.weatherapi.com/v1/history.json?key={API_KEY}&q={city}&dt={date}&aqi=yes"
-            response = requests.get(url)
-            if response.status_code == 200:
-                all_data.append(response.json())
+        return [date_current]
+    return [
+        (pd.to_datetime(date_current) - pd.DateOffset(days=i)).strftime("%Y-%m-%d")
+        for i in range(1, days + 1)
+    ]
+
+
+def _retry_after_s(value, default: float) -> float:
+    """
+    Segundos de espera de una cabecera Retry-After, en segundos o como fecha
+    HTTP (RFC 9110). Una fecha ya pasada es 0; un valor ilegible usa `default`.
+    """
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return default
+        return max(seconds, 0.0)
+    return seconds if math.isfinite(seconds) and seconds >= 0 else default
+
+
+async def _send(client, url: str, params: dict):
+    """GET con plazo total (el timeout de httpx es por fase, no por llamada)."""
+    return await asyncio.wait_for(
+        client.get(url, params=params), CONFIG["WEATHER_API"]["DEADLINE_S"]
+    )
+
+
+async def _send_hedged(client, url: str, params: dict, priority):
+    """
+    Envía la solicitud y, si no responde antes del p95 observado, lanza un
+    duplicado; se usa la primera respuesta que llegue y se cancela la otra.
+    """
+    latency = get_forecast_latency()
+    started = time.monotonic()
+    primary = asyncio.ensure_future(_send(client, url, params))
+    done, _ = await asyncio.wait({primary}, timeout=latency.hedge_delay())
+    if done:
+        response = primary.result()
+        latency.record(time.monotonic() - started)
+        return response
+
+    await get_scheduler().acquire(priority)
+    hedge = asyncio.ensure_future(_send(client, url, params))
+    latency.hedges_sent += 1
+    pending = {primary, hedge}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        latency.hedges_won += 1
+                    latency.record(time.monotonic() - started)
+                    return task.result()
+        # Ambas fallaron: se propaga el error de la solicitud original
+        return primary.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _fetch_json(client, endpoint: str, params: dict, label: str, priority=PRIORIDAD_INTERACTIVA, hedge=False):
+    """
+    Realiza un GET contra WeatherAPI y retorna el JSON, o None si la solicitud falla.
+
+    Cada intento espera turno en el planificador de cuota; ante un 429 se
+    detiene el envío durante Retry-After y se reintenta. Los errores de red,
+    plazos vencidos y respuestas 5xx alimentan el cortocircuito; mientras está
+    abierto no se envía nada y se retorna None de inmediato.
+    """
+    cfg = CONFIG["WEATHER_API"]
+    url = f"{cfg['BASE_URL']}/{endpoint}"
+    scheduler = get_scheduler()
+    breaker = get_breaker()
+
+    for intento in range(cfg["MAX_REINTENTOS_429"] + 1):
+        if not breaker.allow_request():
+            print(f"Circuito abierto hacia WeatherAPI, se omite la solicitud para {label}")
+            return None
+        await scheduler.acquire(priority)
+        try:
+            if hedge:
+                response = await _send_hedged(client, url, {"key": API_KEY, **params}, priority)
             else:
-                print(
-                    f"Error en la solicitud para la fecha {date}: {response.status_code}"
-                )
+                response = await _send(client, url, {"key": API_KEY, **params})
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            breaker.record_failure()
+            print(f"Error en la solicitud para {label}: {e!r}")
+            return None
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if response.status_code == 429 and intento < cfg["MAX_REINTENTOS_429"]:
+            scheduler.throttle(_retry_after_s(response.headers.get("Retry-After"), cfg["RETRY_AFTER_S"]))
+            continue
+        if response.status_code != 200:
+            print(f"Error en la solicitud para {label}: {response.status_code}")
+            return None
+        return loads(response.content)
+
+
+async def _fetch_history_day(client, city: str, date: str, today: str, priority):
+    """Obtiene un día de history.json, primero desde el caché persistente."""
+    # El caché es SQLite (lectura, gzip y commit): etapa de E/S
+    cache = get_history_cache()
+    data = await run_stage("io", cache.get, city, date, today=today)
+    if data is not None:
+        return data
+
+    data = await _fetch_json(
+        client,
+        "history.json",
+        {"q": city, "dt": date, "aqi": "yes"},
+        f"la fecha {date}",
+        priority,
+    )
+    if data is not None:
+        await run_stage("io", cache.put, city, date, data)
+        return data
+    # Proveedor caído o con error: usar la última copia aunque haya vencido
+    return await run_stage("io", cache.get, city, date, today=today, allow_stale=True)
+
+
+def history_dates(days: int):
+    """Fechas que get_data consultaría para `days` días de histórico."""
+    return _history_dates(days, _current_date())
+
+
+async def get_dates_async(city: str, dates, client=None, priority=PRIORIDAD_INTERACTIVA):
+    """
+    Descarga en paralelo el histórico horario de las fechas indicadas.
+
+    Los días ya presentes en el caché persistente no se vuelven a pedir; el
+    resto de llamadas a history.json se lanzan a la vez sobre el mismo
+    cliente. El resultado conserva el orden de `dates`.
+    """
+    client = client or get_client()
+    today = _current_date()
+    results = await asyncio.gather(
+        *(_fetch_history_day(client, city, date, today, priority) for date in dates)
+    )
+    return [data for data in results if data is not None]
+
 
-    return all_data
+async def get_data_async(city: str, days: int, client=None, priority=PRIORIDAD_INTERACTIVA):
+    """
+    Descarga en paralelo el histórico horario de los últimos `days` días
+    (más reciente primero).
+    """
+    return await get_dates_async(city, history_dates(days), client=client, priority=priority)
+
+
+def _run_sync(coro_fn, *args):
+    """Ejecuta una corrutina de este módulo con un cliente propio (API síncrona)."""
+
+    async def runner():
+        async with _build_client() as client:
+            return await coro_fn(*args, client=client)
+
+    return asyncio.run(runner())
+
+
+def get_data(city: str, days: int):
+    """Versión síncrona de get_data_async."""
+    return _run_sync(get_data_async, city, days)
+
+
+def extract_hourly_arrays(json_data_list):
+    """
+    Extrae las observaciones horarias directamente a arreglos de numpy.
+
+    La hora local de pared sale de `time` de cada hora, convertido en bloque
+    con numpy (no de `time_epoch` más una diferencia horaria fija: en los días
+    con cambio de horario la diferencia cambia a mitad del día), y se ordena y
+    eliminan horas duplicadas con numpy.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (epochs (n,) en segundos locales,
+        valores (n, len(OBS_COLUMNS)) con el viento en m/s, igual que extract_hourly_data)
+    """
+    horas_por_dia = [dia["forecast"]["forecastday"][0]["hour"] for dia in json_data_list]
+    total = sum(len(horas) for horas in horas_por_dia)
+    epochs = np.empty(total, dtype=np.int64)
+    values = np.empty((total, len(OBS_COLUMNS)), dtype=np.float64)
+    campos = itemgetter(*OBS_COLUMNS)
+
+    i = 0
+    for horas in horas_por_dia:
+        if not horas:
+            continue
+        j = i + len(horas)
+        epochs[i:j] = np.array([h["time"] for h in horas], dtype="datetime64[s]").astype(np.int64)
+        values[i:j] = [campos(h) for h in horas]
+        i = j
+
+    wind = OBS_COLUMNS.index("wind_kph")
+    values[:, wind] = (values[:, wind] * 1000) / 3600
+
+    order = np.argsort(epochs, kind="stable")
+    epochs, values = epochs[order], values[order]
+    # Conservar la última aparición de cada hora
+    keep = np.ones(total, dtype=bool)
+    keep[:-1] = epochs[1:] != epochs[:-1]
+    return epochs[keep], values[keep]
 
 
 def extract_hourly_data(json_data_list):
@@ -63,22 +299,8 @@ def extract_hourly_data(json_data_list):
     return df
 
 
-def extract_additional_info(city: str, days: int):
-    """
-    Extrae la información adicional desde el endpoint forecast.json,
-    incluyendo datos horarios con campos adicionales
-    """
-    # Hacer la solicitud al endpoint forecast.json
-    url = f"http://api.weatherapi.com/v1/forecast.json?key={API_KEY}&q={city}&days={days}&aqi=yes"
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        print(f"Error en la solicitud forecast: {response.status_code}")
-        return []
-
-    forecast_data = response.json()
-
-    # Extraer información relevante
+def _parse_additional_info(forecast_data):
+    """Extrae la información relevante de una respuesta de forecast.json."""
     additional_info = []
 
     # Obtener información de cada día en el pronóstico
@@ -115,3 +337,49 @@ def extract_additional_info(city: str, days: int):
         additional_info.append(info)
 
     return additional_info
+
+
+async def extract_additional_info_async(city: str, days: int, client=None, priority=PRIORIDAD_INTERACTIVA):
+    """
+    Extrae la información adicional desde el endpoint forecast.json,
+    incluyendo datos horarios con campos adicionales
+    """
+    client = client or get_client()
+    cache = get_history_cache()
+    forecast_data = await _fetch_json(
+        client,
+        "forecast.json",
+        {"q": city, "days": days, "aqi": "yes"},
+        "forecast",
+        priority,
+        hedge=CONFIG["WEATHER_API"]["HEDGE_FORECAST"],
+    )
+    if forecast_data is not None:
+        await run_stage("io", cache.put_forecast, city, forecast_data)
+    else:
+        # Proveedor caído o con error: servir el último pronóstico conocido
+        forecast_data = await run_stage("io", cache.get_forecast, city)
+        if forecast_data is None:
+            return []
+    return await run_stage("cpu", _parse_additional_info, forecast_data)
+
+
+def extract_additional_info(city: str, days: int):
+    """Versión síncrona de extract_additional_info_async."""
+    return _run_sync(extract_additional_info_async, city, days)
+
+
+async def fetch_weather_async(
+    city: str, history_days: int, forecast_days: int, client=None, priority=PRIORIDAD_INTERACTIVA
+):
+    """
+    Lanza a la vez el histórico (history.json) y el pronóstico (forecast.json).
+
+    Returns:
+        Tuple[list, list]: (datos históricos crudos, información adicional)
+    """
+    client = client or get_client()
+    return await asyncio.gather(
+        get_data_async(city, history_days, client=client, priority=priority),
+        extract_additional_info_async(city, forecast_days, client=client, priority=priority),
+    )
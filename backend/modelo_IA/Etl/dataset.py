@@ -2,14 +2,192 @@
 """
 Módulo para la gestión de datos de series temporales,
 incluyendo división en conjuntos y creación de secuencias.
+
+Las ventanas se construyen como vistas sobre la serie base
+(sliding_window_view): una ventana de INPUT_LENGTH horas no copia datos, así
+que el conjunto completo ocupa lo mismo que la serie y no INPUT_LENGTH veces
+más. Los lotes se materializan uno a uno al entrenar (WindowedSeries.batch).
 """
 
+import math
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.model_selection import train_test_split
 from Utils.config import CONFIG
 
+
+def _windows(array, length):
+    """Vista (n_ventanas, length, n_columnas) de las ventanas consecutivas de `array`."""
+    if len(array) < length:
+        return np.empty((0, length, array.shape[1]), dtype=array.dtype)
+    return sliding_window_view(array, length, axis=0).transpose(0, 2, 1)
+
+
+def column_view(array, indices):
+    """
+    Columnas `indices` de un arreglo 2D; si están a distancia constante
+    (p. ej. temp_c y humidity, columnas 1 y 3) es una vista sin copia.
+    """
+    indices = list(indices)
+    step = indices[1] - indices[0] if len(indices) > 1 else 1
+    if step > 0 and indices == list(range(indices[0], indices[-1] + 1, step)):
+        return array[:, indices[0]:indices[-1] + 1:step]
+    return array[:, indices]
+
+
+class WindowedSeries:
+    """
+    Ventanas de entrada y salida de una serie, como vistas sin copia.
+
+    La ventana i toma features[i:i + input_length] como entrada y
+    targets[i + input_length:i + input_length + output_length] como salida.
+    """
+
+    def __init__(self, features, targets, input_length=None, output_length=None):
+        """
+        Args:
+            features: Arreglo (n, n_features) con la serie base.
+            targets: Arreglo (n, n_targets) con las columnas objetivo.
+            input_length: Horas de entrada. Por defecto CONFIG.
+            output_length: Horas de salida. Por defecto CONFIG.
+        """
+        self.features = features
+        self.targets = targets
+        self.input_length = input_length or CONFIG['SECUENCIA']['INPUT_LENGTH']
+        self.output_length = output_length or CONFIG['SECUENCIA']['OUTPUT_LENGTH']
+
+    def __len__(self):
+        return max(0, len(self.features) - self.input_length - self.output_length + 1)
+
+    @property
+    def n_features(self):
+        return self.features.shape[1]
+
+    @property
+    def n_targets(self):
+        return self.targets.shape[1]
+
+    @property
+    def x(self):
+        """Vista (n_ventanas, input_length, n_features) de las entradas."""
+        return _windows(self.features[:len(self) + self.input_length - 1], self.input_length)
+
+    @property
+    def y(self):
+        """Vista (n_ventanas, output_length, n_targets) de las salidas."""
+        return _windows(self.targets[self.input_length:], self.output_length)[:len(self)]
+
+    def input_rows(self):
+        """Filas de la serie que aparecen en alguna ventana de entrada."""
+        return self.features[:len(self) + self.input_length - 1]
+
+    def target_rows(self):
+        """Filas de los objetivos que aparecen en alguna ventana de salida."""
+        return self.targets[self.input_length:self.input_length + len(self) + self.output_length - 1]
+
+    def input_chunks(self, rows):
+        """input_rows() en bloques de `rows` filas (vistas)."""
+        data = self.input_rows()
+        for start in range(0, len(data), rows):
+            yield data[start:start + rows]
+
+    def target_chunks(self, rows):
+        """target_rows() en bloques de `rows` filas (vistas)."""
+        data = self.target_rows()
+        for start in range(0, len(data), rows):
+            yield data[start:start + rows]
+
+    def batch(self, indices):
+        """
+        Materializa las ventanas `indices` (arreglos contiguos).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (x, y) del lote
+        """
+        indices = np.asarray(indices)[:, None]
+        x = self.features[indices + np.arange(self.input_length)]
+        y = self.targets[indices + self.input_length + np.arange(self.output_length)]
+        return x, y
+
+    def scaled(self, preprocessor, target_names):
+        """
+        Serie escalada una sola vez sobre las filas base (el escalado es por
+        columna, así que coincide con escalar cada ventana).
+        """
+        return WindowedSeries(
+            preprocessor.scale_features(self.features),
+            preprocessor.scale_target(self.targets, target_names),
+            self.input_length,
+            self.output_length,
+        )
+
+
+class ConcatenatedWindows:
+    """
+    Ventanas de varias series (p. ej. una por ciudad) como un solo conjunto.
+    Ninguna ventana cruza de una serie a otra.
+    """
+
+    def __init__(self, parts):
+        """
+        Args:
+            parts: Lista de WindowedSeries con las mismas longitudes y columnas.
+        """
+        self.parts = list(parts)
+        self.input_length = self.parts[0].input_length
+        self.output_length = self.parts[0].output_length
+        self.offsets = np.cumsum([0] + [len(part) for part in self.parts])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    @property
+    def n_features(self):
+        return self.parts[0].n_features
+
+    @property
+    def n_targets(self):
+        return self.parts[0].n_targets
+
+    @property
+    def x(self):
+        return np.concatenate([part.x for part in self.parts])
+
+    @property
+    def y(self):
+        return np.concatenate([part.y for part in self.parts])
+
+    def input_rows(self):
+        return np.concatenate([part.input_rows() for part in self.parts])
+
+    def target_rows(self):
+        return np.concatenate([part.target_rows() for part in self.parts])
+
+    def input_chunks(self, rows):
+        for part in self.parts:
+            yield from part.input_chunks(rows)
+
+    def target_chunks(self, rows):
+        for part in self.parts:
+            yield from part.target_chunks(rows)
+
+    def batch(self, indices):
+        """Materializa las ventanas `indices` (numeradas a través de todas las series)."""
+        indices = np.asarray(indices)
+        owner = np.searchsorted(self.offsets, indices, side='right') - 1
+        x = np.empty((len(indices), self.input_length, self.n_features), dtype=self.parts[0].features.dtype)
+        y = np.empty((len(indices), self.output_length, self.n_targets), dtype=self.parts[0].targets.dtype)
+        for i in np.unique(owner):
+            mask = owner == i
+            x[mask], y[mask] = self.parts[i].batch(indices[mask] - self.offsets[i])
+        return x, y
+
+    def scaled(self, preprocessor, target_names):
+        return ConcatenatedWindows(part.scaled(preprocessor, target_names) for part in self.parts)
+
+
 class TimeSeriesDataset:
     """
     Clase para gestionar conjuntos de datos de series temporales para modelos de aprendizaje supervisado.
@@ -64,6 +242,24 @@ class TimeSeriesDataset:
 
         return train, val, test
 
+    def split_bounds(self, n_rows, train_size=None, val_size=None, test_size=None):
+        """
+        Límites de la división secuencial de split_data sin copiar los datos.
+
+        Returns:
+            Tuple[int, int]: (fin de entrenamiento, fin de validación)
+        """
+        val_size = val_size or CONFIG['DATOS']['VAL_SIZE']
+        test_size = test_size or CONFIG['DATOS']['TEST_SIZE']
+        train_size = train_size or CONFIG['DATOS']['TRAIN_SIZE']
+        if not np.isclose(train_size + val_size + test_size, 1.0):
+            raise ValueError("Las proporciones de división deben sumar 1.0")
+
+        # Mismo redondeo que train_test_split (la parte de prueba redondea hacia arriba)
+        n_test = math.ceil(test_size * n_rows)
+        n_val = math.ceil(val_size / (1.0 - test_size) * (n_rows - n_test))
+        return n_rows - n_test - n_val, n_rows - n_test
+
     def _get_target_indices(self, df, target_col):
         """
         Obtiene los índices de las columnas objetivo.
@@ -94,29 +290,26 @@ class TimeSeriesDataset:
 
         return target_idxs
 
-    def create_sequences(self, df, target_col=None):
+    def create_sequences(self, df, target_col=None, copy=True):
         """
         Genera secuencias de entrada y salida para entrenamiento supervisado.
 
         Args:
-            df (pd.DataFrame): Datos de entrada.
+            df (pd.DataFrame | np.ndarray): Datos de entrada. Con un arreglo,
+                                            target_col debe indicar índices.
             target_col (str | int | list, optional): Columnas objetivo.
+            copy (bool): False retorna vistas de solo lectura sobre `df` (sin
+                         copiar cada ventana).
 
         Returns:
             Tuple[np.ndarray, np.ndarray]: X (input), y (target output)
         """
-        array = df.values
-        X, y = [], []
-
+        array = np.asarray(df)
         target_idxs = self._get_target_indices(df, target_col)
-        total_len = len(df)
-
-        for i in range(total_len - self.input_length - self.output_length + 1):
-            X.append(array[i:i + self.input_length, :])
-            y_seq = array[i + self.input_length: i + self.input_length + self.output_length, target_idxs]
-            y.append(y_seq)
-
-        return np.array(X), np.array(y)
+        series = WindowedSeries(array, column_view(array, target_idxs), self.input_length, self.output_length)
+        if not copy:
+            return series.x, series.y
+        return np.ascontiguousarray(series.x), np.ascontiguousarray(series.y)
 
     def prepare_dataset(self, df, target_col=None):
         """
@@ -147,3 +340,49 @@ class TimeSeriesDataset:
             'x_val': x_val, 'y_val': y_val,
             'x_test': x_test, 'y_test': y_test
         }
+
+    def prepare_windows(self, df, target_col=None):
+        """
+        Como prepare_dataset, pero cada conjunto es un WindowedSeries sobre
+        una sola copia numérica de `df` (las ventanas no se materializan).
+
+        Args:
+            df (pd.DataFrame): Conjunto de datos completo.
+            target_col (str | int | list, optional): Columnas objetivo.
+
+        Returns:
+            dict: {'train', 'val', 'test'} -> WindowedSeries
+        """
+        array = np.asarray(df, dtype=np.float64)
+        targets = column_view(array, self._get_target_indices(df, target_col))
+        windows = self._split_windows(array, targets)
+        for name, series in windows.items():
+            print(f'[INFO] {name}: {len(series.features)} filas, {len(series)} ventanas')
+        return windows
+
+    def prepare_series_windows(self, series):
+        """
+        prepare_windows para varias series (una por ciudad): cada una se
+        divide en el tiempo con las mismas proporciones y los conjuntos
+        reúnen las partes de todas.
+
+        Args:
+            series: Lista de pares (features, targets) de arreglos 2D; pueden
+                    ser memmaps (Etl.training_store), no se copian.
+
+        Returns:
+            dict: {'train', 'val', 'test'} -> ConcatenatedWindows
+        """
+        splits = [self._split_windows(features, targets) for features, targets in series]
+        windows = {name: ConcatenatedWindows(split[name] for split in splits) for name in ('train', 'val', 'test')}
+        for name, group in windows.items():
+            print(f'[INFO] {name}: {len(group.parts)} series, {len(group)} ventanas')
+        return windows
+
+    def _split_windows(self, features, targets):
+        train_end, val_end = self.split_bounds(len(features))
+        bounds = {'train': (0, train_end), 'val': (train_end, val_end), 'test': (val_end, len(features))}
+        return {
+            name: WindowedSeries(features[start:end], targets[start:end], self.input_length, self.output_length)
+            for name, (start, end) in bounds.items()
+        }
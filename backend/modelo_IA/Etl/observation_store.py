@@ -0,0 +1,259 @@
+# observation_store.py - Almacén columnar de observaciones horarias por ciudad
+"""
+Módulo para persistir las observaciones horarias descargadas de WeatherAPI.
+
+Cada ciudad tiene un directorio con un archivo .npy por mes (memmap de numpy).
+El archivo es columnar, de forma (n_columnas, horas_del_mes): cada columna
+ocupa un bloque contiguo y cada hora tiene una posición fija, con NaN en las
+horas aún no observadas. Así se sabe qué horas faltan sin leer JSON, solo se
+descargan los días incompletos y la ventana pedida se lee como un arreglo.
+
+Los tiempos son segundos "locales": la hora de pared de la ciudad tratada
+como UTC, igual que hace el preprocesamiento al calcular las
+características cíclicas.
+"""
+
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from Controllers.chatbot.text_normalizer import TextNormalizer
+from Utils.config import CONFIG, HORA_S
+
+# Columnas en el mismo orden que extract_hourly_data y los datos de entrenamiento
+OBS_COLUMNS = ["pressure_mb", "temp_c", "dewpoint_c", "humidity", "wind_kph", "wind_degree"]
+
+
+class HourlyObservationStore:
+    """
+    Almacén de observaciones horarias particionado por ciudad y mes.
+    """
+
+    def __init__(self, root=None):
+        """
+        Args:
+            root: Directorio raíz. Por defecto CONFIG['RUTAS']['OBSERVACIONES'].
+        """
+        self.root = root or CONFIG["RUTAS"]["OBSERVACIONES"]
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def city_slug(city):
+        """Nombre de directorio de una ciudad."""
+        return re.sub(r"[^a-z0-9]+", "_", TextNormalizer.normalize_city(city)).strip("_")
+
+    def _month_path(self, city, month):
+        return os.path.join(self.root, self.city_slug(city), f"{month}.npy")
+
+    @staticmethod
+    def _month_layout(month):
+        """Inicio (segundos locales) y número de horas de un mes 'YYYY-MM'."""
+        start = np.datetime64(month, "M")
+        start_s = int(start.astype("datetime64[s]").astype(np.int64))
+        end_s = int((start + 1).astype("datetime64[s]").astype(np.int64))
+        return start_s, (end_s - start_s) // HORA_S
+
+    @staticmethod
+    def _months_of(epochs):
+        return np.asarray(epochs, dtype=np.int64).astype("datetime64[s]").astype("datetime64[M]")
+
+    def _open_month(self, city, month, create=False):
+        """Abre el memmap de un mes; si no existe y create=True lo crea lleno de NaN."""
+        path = self._month_path(city, month)
+        if os.path.exists(path):
+            return np.load(path, mmap_mode="r+" if create else "r")
+        if not create:
+            return None
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _, n_hours = self._month_layout(month)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        data = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float64, shape=(len(OBS_COLUMNS), n_hours)
+        )
+        data[:] = np.nan
+        data.flush()
+        del data
+        # link() falla si otro proceso ya creó el mes: se conserva el suyo
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+        return np.load(path, mmap_mode="r+")
+
+    def write(self, city, epochs, values):
+        """
+        Agrega observaciones. Solo se escriben las horas que estaban vacías
+        (el almacén es de solo-anexar: una hora observada no se reescribe).
+
+        Args:
+            city: Ciudad.
+            epochs: Arreglo (n,) de segundos locales, alineados a la hora.
+            values: Arreglo (n, len(OBS_COLUMNS)).
+
+        Returns:
+            int: Número de horas nuevas escritas.
+        """
+        epochs = np.asarray(epochs, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        months = self._months_of(epochs)
+        written = 0
+
+        with self._lock:
+            for month in np.unique(months):
+                mask = months == month
+                month_key = str(month)
+                start_s, _ = self._month_layout(month_key)
+                slots = (epochs[mask] - start_s) // HORA_S
+
+                data = self._open_month(city, month_key, create=True)
+                empty = np.isnan(data[1, slots])
+                if empty.any():
+                    data[:, slots[empty]] = values[mask][empty].T
+                    data.flush()
+                    written += int(empty.sum())
+                del data
+        return written
+
+    def write_frame(self, city, df):
+        """Agrega un DataFrame con índice datetime (formato de extract_hourly_data)."""
+        epochs = df.index.values.astype("datetime64[s]").astype(np.int64)
+        return self.write(city, epochs, df[OBS_COLUMNS].to_numpy(dtype=np.float64))
+
+    def read_window(self, city, start_epoch, hours):
+        """
+        Lee `hours` horas consecutivas a partir de `start_epoch`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (epochs (hours,), valores (hours, n_columnas)),
+            con NaN en las horas no observadas.
+        """
+        epochs = int(start_epoch) + np.arange(hours, dtype=np.int64) * HORA_S
+        values = np.full((hours, len(OBS_COLUMNS)), np.nan)
+        months = self._months_of(epochs)
+
+        for month in np.unique(months):
+            month_key = str(month)
+            data = self._open_month(city, month_key)
+            if data is None:
+                continue
+            mask = months == month
+            start_s, _ = self._month_layout(month_key)
+            slots = (epochs[mask] - start_s) // HORA_S
+            values[mask] = data[:, slots].T
+        return epochs, values
+
+    @staticmethod
+    def _date_epoch(date):
+        return int(np.datetime64(date, "D").astype("datetime64[s]").astype(np.int64))
+
+    def missing_dates(self, city, dates):
+        """Fechas 'YYYY-MM-DD' que no tienen sus 24 horas en el almacén."""
+        missing = []
+        for date in dates:
+            _, values = self.read_window(city, self._date_epoch(date), 24)
+            if np.isnan(values).any():
+                missing.append(date)
+        return missing
+
+    def read_dates(self, city, dates):
+        """
+        Lee las horas observadas de un conjunto de fechas, en orden cronológico.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (epochs, valores) sin las horas faltantes.
+        """
+        if not dates:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(OBS_COLUMNS)))
+        first, last = min(dates), max(dates)
+        start = self._date_epoch(first)
+        hours = (self._date_epoch(last) - start) // HORA_S + 24
+        epochs, values = self.read_window(city, start, hours)
+
+        wanted = np.isin(epochs // 86400, [self._date_epoch(d) // 86400 for d in dates])
+        keep = wanted & ~np.isnan(values).any(axis=1)
+        return epochs[keep], values[keep]
+
+    def cities(self):
+        """Ciudades (slugs) con datos en el almacén."""
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def export_training_frame(self, cities=None, since_epoch=None):
+        """
+        Exporta las observaciones completas como DataFrame de entrenamiento
+        (mismas columnas que CONFIG['RUTAS']['DATOS'], índice 'datetime').
+
+        Args:
+            cities: Ciudades a exportar. Por defecto todas.
+            since_epoch: Solo horas posteriores a este instante (segundos locales).
+
+        Returns:
+            pd.DataFrame: Con columna 'city' cuando se exporta más de una ciudad.
+        """
+        slugs = [self.city_slug(c) for c in cities] if cities else self.cities()
+        frames = []
+        for slug in slugs:
+            city_dir = os.path.join(self.root, slug)
+            if not os.path.isdir(city_dir):
+                continue
+            for name in sorted(os.listdir(city_dir)):
+                if not name.endswith(".npy"):
+                    continue
+                month = name[:-4]
+                start_s, n_hours = self._month_layout(month)
+                # Los meses anteriores a since_epoch no se abren: el costo depende
+                # de las horas nuevas y no de todo el historial
+                if since_epoch is not None and start_s + n_hours * HORA_S <= since_epoch:
+                    continue
+                data = np.load(os.path.join(city_dir, name), mmap_mode="r")
+                epochs = start_s + np.arange(n_hours, dtype=np.int64) * HORA_S
+                keep = ~np.isnan(data).any(axis=0)
+                if since_epoch is not None:
+                    keep &= epochs > since_epoch
+                if not keep.any():
+                    continue
+                frame = pd.DataFrame(
+                    np.asarray(data[:, keep]).T,
+                    columns=OBS_COLUMNS,
+                    index=pd.DatetimeIndex(epochs[keep].astype("datetime64[s]"), name="datetime"),
+                )
+                frame["city"] = slug
+                frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=OBS_COLUMNS, index=pd.DatetimeIndex([], name="datetime"))
+        df = pd.concat(frames)
+        if len(slugs) == 1:
+            df = df.drop(columns=["city"])
+        return df
+
+    def export_csv(self, path, cities=None):
+        """
+        Escribe el DataFrame de entrenamiento en CSV. La ruta es obligatoria:
+        escribir sobre CONFIG['RUTAS']['DATOS'] reemplaza el CSV de
+        entrenamiento y fuerza su reingesta (TrainingDataStore.sync_csv).
+        """
+        df = self.export_training_frame(cities)
+        df.to_csv(path)
+        print(f"[INFO] {len(df)} observaciones exportadas a {path}")
+        return path
+
+
+_observation_store = None
+
+
+def get_observation_store():
+    """Instancia compartida del almacén."""
+    global _observation_store
+    if _observation_store is None:
+        _observation_store = HourlyObservationStore()
+    return _observation_store
@@ -8,8 +8,59 @@ import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
 import pickle
+from Etl.scaling import CompiledScaler
 from Utils.config import CONFIG
 
+# Columnas del modelo tras add_cyclical_features y process_wind_data
+FEATURE_COLUMNS = [
+    'pressure_mb', 'temp_c', 'dewpoint_c', 'humidity',
+    'dia_sin', 'dia_cos', 'year_sin', 'year_cos', 'wx', 'Wy'
+]
+
+def _column_range(data, block=128):
+    """
+    Mínimo y máximo por columna (último eje) ignorando NaN, como MinMaxScaler,
+    y el número de filas vistas.
+
+    Las reducciones de numpy son lentas con un último eje corto (2 a 10
+    columnas): las filas se agrupan de `block` en `block` para que cada
+    pasada recorra block * n_columnas valores contiguos.
+    """
+    n_columns = data.shape[-1]
+    n_rows = int(np.prod(data.shape[:-1]))
+    if data.ndim > 2 and not data.flags.c_contiguous:
+        # Ventanas como vistas: reformarlas copiaría todo
+        axes = tuple(range(data.ndim - 1))
+        return np.fmin.reduce(data, axis=axes), np.fmax.reduce(data, axis=axes), n_rows
+
+    # Un bloque de filas con columnas intercaladas (p. ej. los objetivos) se copia: está acotado
+    rows = np.ascontiguousarray(data.reshape(-1, n_columns))
+    cut = n_rows - n_rows % block
+    result = []
+    for reduce in (np.fmin.reduce, np.fmax.reduce):
+        candidates = rows[cut:]
+        if cut:
+            wide = reduce(rows[:cut].reshape(-1, block * n_columns), axis=0).reshape(block, n_columns)
+            candidates = np.concatenate([wide, candidates])
+        result.append(reduce(candidates, axis=0))
+    return result[0], result[1], n_rows
+
+
+def _merge_range(scaler, data_min, data_max, n_rows):
+    """
+    MinMaxScaler con el rango de `scaler` (si ya estaba ajustado) ampliado
+    con el de un bloque nuevo. Se ajusta sobre [mínimo, máximo], así que
+    scale_, min_ y data_range_ se calculan igual que con todos los datos.
+    """
+    if hasattr(scaler, 'data_min_'):
+        data_min = np.minimum(scaler.data_min_[0], data_min)
+        data_max = np.maximum(scaler.data_max_[0], data_max)
+        n_rows += scaler.n_samples_seen_
+    merged = MinMaxScaler(feature_range=scaler.feature_range).fit([[data_min], [data_max]])
+    merged.n_samples_seen_ = n_rows
+    return merged
+
+
 class TimeSeriesPreprocessor:
     """
     Clase para el preprocesamiento de series temporales meteorológicas.
@@ -21,6 +72,7 @@ class TimeSeriesPreprocessor:
         self.year_segundos = CONFIG['TIEMPO']['DIA_SEGUNDOS'] * CONFIG['TIEMPO']['YEAR_FACTOR']
         self.feature_scalers = None
         self.target_scalers = {}  # Ahora es un diccionario para múltiples variables objetivo
+        self._compiled = None  # Escaladores compilados a vectores (ver compiled_scaler)
         
     def add_cyclical_features(self, df, tiempo_s_col):
         """
@@ -66,6 +118,35 @@ class TimeSeriesPreprocessor:
         
         return df_copy
     
+    def build_features(self, epochs, values):
+        """
+        Equivalente en arreglos de add_cyclical_features + process_wind_data.
+
+        Args:
+            epochs: Arreglo (n,) con el tiempo en segundos
+            values: Arreglo (n, 6) con pressure_mb, temp_c, dewpoint_c, humidity,
+                    wind_kph y wind_degree (orden de OBS_COLUMNS)
+
+        Returns:
+            Arreglo (n, 10) con las columnas de FEATURE_COLUMNS
+        """
+        tiempo_s = np.asarray(epochs, dtype=np.float64)
+        features = np.empty((len(tiempo_s), len(FEATURE_COLUMNS)), dtype=np.float64)
+        features[:, :4] = values[:, :4]
+
+        # Características cíclicas diarias y anuales
+        features[:, 4] = np.sin(tiempo_s * (2 * np.pi / self.dia_segundos))
+        features[:, 5] = np.cos(tiempo_s * (2 * np.pi / self.dia_segundos))
+        features[:, 6] = np.sin(tiempo_s * (2 * np.pi / self.year_segundos))
+        features[:, 7] = np.cos(tiempo_s * (2 * np.pi / self.year_segundos))
+
+        # Viento a componentes cartesianas
+        w_dir_rad = values[:, 5] * np.pi/180
+        features[:, 8] = values[:, 4] * np.cos(w_dir_rad)
+        features[:, 9] = values[:, 4] * np.sin(w_dir_rad)
+
+        return features
+
     def fit_scalers(self, data, features_to_scale=None, temporal_features=None):
         """
         Ajusta los escaladores para las características.
@@ -78,26 +159,40 @@ class TimeSeriesPreprocessor:
         Returns:
             self para encadenamiento de métodos
         """
-        n_features = data.shape[2]
-        
-        # Si no se especifican, determinar automáticamente
-        if temporal_features is None:
-            temporal_features = list(range(4, 8))  # Características cíclicas por defecto
-            
-        if features_to_scale is None:
-            features_to_scale = list(range(4)) + list(range(8, n_features))
-        
-        # Crear escaladores
-        self.feature_scalers = [MinMaxScaler(feature_range=(-1, 1)) for _ in range(n_features)]
-        self.temporal_features = temporal_features
-        self.features_to_scale = features_to_scale
-        
-        # Ajustar escaladores para cada característica
-        for i in features_to_scale:
-            # Reshape para el escalador
-            flat_feature = data[:, :, i].reshape(-1, 1)
-            self.feature_scalers[i].fit(flat_feature)
-        
+        self.feature_scalers = None
+        return self.partial_fit_scalers(data, features_to_scale, temporal_features)
+
+    def partial_fit_scalers(self, data, features_to_scale=None, temporal_features=None):
+        """
+        Actualiza los escaladores de las características con un bloque más de
+        datos (como MinMaxScaler.partial_fit). El mínimo y el máximo salen de
+        una sola pasada vectorizada sobre todas las columnas, sin copias.
+
+        Args:
+            data: Bloque (filas, n_features) de la serie base, o ventanas
+                  (n, longitud, n_features).
+            features_to_scale: Índices de las características a escalar (primer bloque)
+            temporal_features: Índices de las características temporales (primer bloque)
+
+        Returns:
+            self para encadenamiento de métodos
+        """
+        n_features = data.shape[-1]
+        data_min, data_max, n_rows = _column_range(data)
+
+        if self.feature_scalers is None:
+            # Si no se especifican, determinar automáticamente
+            if temporal_features is None:
+                temporal_features = list(range(4, 8))  # Características cíclicas por defecto
+            if features_to_scale is None:
+                features_to_scale = list(range(4)) + list(range(8, n_features))
+            self.feature_scalers = [MinMaxScaler(feature_range=(-1, 1)) for _ in range(n_features)]
+            self.temporal_features = temporal_features
+            self.features_to_scale = features_to_scale
+
+        for i in self.features_to_scale:
+            self.feature_scalers[i] = _merge_range(self.feature_scalers[i], data_min[i], data_max[i], n_rows)
+        self._compiled = None
         return self
         
     def scale_features(self, data):
@@ -112,20 +207,9 @@ class TimeSeriesPreprocessor:
         """
         if self.feature_scalers is None:
             raise ValueError("Los escaladores no han sido ajustados. Llame a fit_scalers primero.")
-            
-        scaled_data = np.zeros_like(data)
-        
-        # Escalar características
-        for i in self.features_to_scale:
-            flat_feature = data[:, :, i].reshape(-1, 1)
-            scaled_flat = self.feature_scalers[i].transform(flat_feature)
-            scaled_data[:, :, i] = scaled_flat.reshape(data.shape[0], -1)
-        
-        # Mantener características temporales sin cambios
-        for i in self.temporal_features:
-            scaled_data[:, :, i] = data[:, :, i]
-            
-        return scaled_data
+
+        # Un solo multiplicar-sumar sobre todas las columnas (cíclicas: identidad exacta)
+        return self.compiled_scaler().scale_features(data)
     
     def fit_target_scaler(self, target_data, target_names):
         """
@@ -136,12 +220,21 @@ class TimeSeriesPreprocessor:
             target_names: Lista de nombres de las variables objetivo (ej. ['temp_c', 'humidity'])
         """
         self.target_scalers = {}
-        n_targets = target_data.shape[2]
+        return self.partial_fit_target_scaler(target_data, target_names)
+
+    def partial_fit_target_scaler(self, target_data, target_names):
+        """
+        Actualiza los escaladores de los objetivos con un bloque más de datos.
+
+        Args:
+            target_data: Bloque (filas, n_targets) o (n, output_length, n_targets)
+            target_names: Nombres de los objetivos, en el orden de las columnas
+        """
+        data_min, data_max, n_rows = _column_range(target_data)
         for i, name in enumerate(target_names):
-            scaler = MinMaxScaler(feature_range=(-1, 1))
-            flat_target = target_data[:, :, i].reshape(-1, 1)
-            scaler.fit(flat_target)
-            self.target_scalers[name] = scaler
+            previous = self.target_scalers.get(name, MinMaxScaler(feature_range=(-1, 1)))
+            self.target_scalers[name] = _merge_range(previous, data_min[i], data_max[i], n_rows)
+        self._compiled = None
         return self
     
     def scale_target(self, target_data, target_names):
@@ -157,12 +250,7 @@ class TimeSeriesPreprocessor:
         if not self.target_scalers:
             raise ValueError("Los escaladores de la variable objetivo no han sido ajustados. Llame a fit_target_scaler primero.")
 
-        scaled_data = np.zeros_like(target_data)
-        for i, name in enumerate(target_names):
-            flat_target = target_data[:, :, i].reshape(-1, 1)
-            scaled_flat = self.target_scalers[name].transform(flat_target)
-            scaled_data[:, :, i] = scaled_flat.reshape(target_data.shape[0], -1)
-        return scaled_data
+        return self.compiled_scaler().scale_target(target_data, target_names)
     
     def inverse_scale_target(self, scaled_target, target_names):
         """
@@ -177,12 +265,18 @@ class TimeSeriesPreprocessor:
         if not self.target_scalers:
             raise ValueError("Los escaladores de la variable objetivo no han sido ajustados.")
 
-        original_data = np.zeros_like(scaled_target)
-        for i, name in enumerate(target_names):
-            flat_scaled = scaled_target[:, :, i].reshape(-1, 1)
-            original_flat = self.target_scalers[name].inverse_transform(flat_scaled)
-            original_data[:, :, i] = original_flat.reshape(scaled_target.shape[0], -1)
-        return original_data
+        return self.compiled_scaler().inverse_scale_target(scaled_target, target_names)
+
+    def compiled_scaler(self):
+        """
+        Escaladores ajustados compilados a vectores scale/offset (se calcula una vez).
+
+        Returns:
+            CompiledScaler
+        """
+        if self._compiled is None:
+            self._compiled = CompiledScaler.from_preprocessor(self)
+        return self._compiled
     
     def save_scalers(self, filepath):
         """
@@ -218,5 +312,6 @@ class TimeSeriesPreprocessor:
         self.target_scalers = scalers_dict['target_scalers']
         self.temporal_features = scalers_dict['temporal_features']
         self.features_to_scale = scalers_dict['features_to_scale']
+        self._compiled = None
         
         return self
\ No newline at end of file
@@ -0,0 +1,154 @@
+# scaling.py - Escalado compilado para inferencia
+"""
+Escalado de características y objetivos como vectores `scale`/`offset`.
+
+Los MinMaxScaler ajustados (uno por columna) se compilan en dos vectores que
+se aplican con una sola multiplicación y suma por difusión (broadcast) sobre
+el último eje. Las columnas cíclicas usan scale=1.0 y offset=-0.0, que es una
+identidad exacta (x * 1.0 + -0.0 == x para todo x, incluido -0.0).
+
+Se guarda en un .npz pequeño que se carga sin importar sklearn. Las
+operaciones son las mismas que MinMaxScaler.transform (X *= scale_;
+X += min_) y inverse_transform (X -= min_; X /= scale_), en el mismo orden y
+tipo de dato, por lo que los resultados coinciden bit a bit con los pickles.
+"""
+
+import os
+
+import numpy as np
+
+from Utils.config import CONFIG
+
+
+class CompiledScaler:
+    """
+    Escaladores de características y objetivos compilados a vectores numpy.
+    """
+
+    def __init__(self, feature_scale, feature_offset, target_scale, target_offset, target_names):
+        """
+        Args:
+            feature_scale: Vector (n_features,) con scale_ de cada columna (1.0 si no se escala).
+            feature_offset: Vector (n_features,) con min_ de cada columna (-0.0 si no se escala).
+            target_scale: Vector (n_targets,) con scale_ de cada objetivo.
+            target_offset: Vector (n_targets,) con min_ de cada objetivo.
+            target_names: Nombres de los objetivos, en el orden de los vectores.
+        """
+        self.feature_scale = np.asarray(feature_scale, dtype=np.float64)
+        self.feature_offset = np.asarray(feature_offset, dtype=np.float64)
+        self.target_scale = np.asarray(target_scale, dtype=np.float64)
+        self.target_offset = np.asarray(target_offset, dtype=np.float64)
+        self.target_names = [str(name) for name in target_names]
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor):
+        """
+        Compila los MinMaxScaler ajustados de un TimeSeriesPreprocessor
+        (los que aún no estén ajustados quedan como vectores vacíos).
+
+        Returns:
+            CompiledScaler
+        """
+        feature_scalers = preprocessor.feature_scalers or []
+        n_features = len(feature_scalers)
+        feature_scale = np.ones(n_features)
+        feature_offset = np.full(n_features, -0.0)
+        for i in (preprocessor.features_to_scale if feature_scalers else []):
+            scaler = feature_scalers[i]
+            if getattr(scaler, "clip", False):
+                raise ValueError("No se soportan escaladores con clip=True.")
+            feature_scale[i] = scaler.scale_[0]
+            feature_offset[i] = scaler.min_[0]
+
+        names = list(preprocessor.target_scalers)
+        target_scale = np.array([preprocessor.target_scalers[n].scale_[0] for n in names])
+        target_offset = np.array([preprocessor.target_scalers[n].min_[0] for n in names])
+        return cls(feature_scale, feature_offset, target_scale, target_offset, names)
+
+    def _target_index(self, target_names):
+        if target_names is None:
+            return slice(None)
+        return [self.target_names.index(name) for name in target_names]
+
+    def scale_features(self, data, inplace=False):
+        """
+        Escala características de forma (..., n_features).
+
+        Args:
+            data: Arreglo a escalar.
+            inplace: Escribe el resultado sobre `data` (debe ser float y escribible).
+        """
+        out = data if inplace else np.array(data, dtype=np.result_type(data, np.float32))
+        out *= self.feature_scale
+        out += self.feature_offset
+        return out
+
+    def scale_target(self, target_data, target_names=None, inplace=False):
+        """Escala objetivos de forma (..., n_targets)."""
+        idx = self._target_index(target_names)
+        out = target_data if inplace else np.array(
+            target_data, dtype=np.result_type(target_data, np.float32))
+        out *= self.target_scale[idx]
+        out += self.target_offset[idx]
+        return out
+
+    def inverse_scale_target(self, scaled_target, target_names=None, inplace=False):
+        """Devuelve objetivos de forma (..., n_targets) a su escala original."""
+        idx = self._target_index(target_names)
+        out = scaled_target if inplace else np.array(
+            scaled_target, dtype=np.result_type(scaled_target, np.float32))
+        out -= self.target_offset[idx]
+        out /= self.target_scale[idx]
+        return out
+
+    def save(self, filepath):
+        """Guarda los vectores en un .npz."""
+        np.savez(
+            filepath,
+            feature_scale=self.feature_scale,
+            feature_offset=self.feature_offset,
+            target_scale=self.target_scale,
+            target_offset=self.target_offset,
+            target_names=np.array(self.target_names),
+        )
+
+    @classmethod
+    def load(cls, filepath):
+        """Carga los vectores desde un .npz."""
+        with np.load(filepath, allow_pickle=False) as data:
+            return cls(
+                data["feature_scale"],
+                data["feature_offset"],
+                data["target_scale"],
+                data["target_offset"],
+                data["target_names"].tolist(),
+            )
+
+
+def load_compiled_scaler(npz_path=None, pkl_path=None):
+    """
+    Carga el escalado compilado. Si el .npz no existe o es más antiguo que
+    el pickle, lo genera a partir del pickle (única vez que se importa sklearn).
+
+    Args:
+        npz_path: Por defecto CONFIG['RUTAS']['SCALER_NPZ'].
+        pkl_path: Por defecto CONFIG['RUTAS']['SCALER'].
+
+    Returns:
+        CompiledScaler
+    """
+    npz_path = npz_path or CONFIG["RUTAS"]["SCALER_NPZ"]
+    pkl_path = pkl_path or CONFIG["RUTAS"]["SCALER"]
+
+    stale = (
+        not os.path.exists(npz_path)
+        or (os.path.exists(pkl_path) and os.path.getmtime(pkl_path) > os.path.getmtime(npz_path))
+    )
+    if stale:
+        from Etl.preprocessor import TimeSeriesPreprocessor
+
+        print(f"[INFO] Compilando escaladores {pkl_path} -> {npz_path}")
+        compiled = TimeSeriesPreprocessor().load_scalers(pkl_path).compiled_scaler()
+        compiled.save(npz_path)
+        return compiled
+    return CompiledScaler.load(npz_path)
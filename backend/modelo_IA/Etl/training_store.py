@@ -0,0 +1,205 @@
+# training_store.py - Almacén columnar de los datos de entrenamiento
+"""
+Módulo para leer los datos de entrenamiento sin cargarlos completos en memoria.
+
+El CSV se convierte a Parquet (tipado, por grupos de filas) con un archivo
+por serie: cada ciudad es una serie horaria independiente. Se vuelve a
+convertir solo si el CSV es más reciente que sus Parquet. Después todo se
+procesa por bloques:
+
+    datos_columnares/
+        <serie>.parquet        datetime + OBS_COLUMNS
+        <serie>.features.npy   FEATURE_COLUMNS (memmap), derivado del Parquet
+
+El Parquet se lee con memoria mapeada y solo las columnas pedidas; las
+características se calculan bloque a bloque (build_features) directamente en
+un memmap, así que ninguna etapa necesita la serie entera en RAM. Las
+ventanas de entrenamiento son vistas sobre esos memmaps (Etl.dataset) y se
+escalan por lotes al entrenar, sin otra copia de la serie en disco.
+"""
+
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional fuera del entrenamiento
+    pa = None
+
+from Etl.observation_store import OBS_COLUMNS, HourlyObservationStore
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Utils.config import CONFIG
+
+TIEMPO_COL = "datetime"
+# Columna opcional del CSV con la ciudad de cada fila (una serie por ciudad)
+SERIE_COL = "city"
+
+
+class TrainingDataStore:
+    """
+    Series de entrenamiento en Parquet y sus características en memmaps.
+    """
+
+    def __init__(self, root=None, rows_per_group=None, batch_rows=None):
+        """
+        Args:
+            root: Directorio del almacén. Por defecto CONFIG['RUTAS']['DATOS_COLUMNARES'].
+            rows_per_group: Filas por grupo de filas del Parquet.
+            batch_rows: Filas por bloque al leer y preprocesar.
+        """
+        if pa is None:
+            raise RuntimeError("❌ pyarrow es necesario para el almacén de entrenamiento.")
+        cfg = CONFIG["DATOS_COLUMNARES"]
+        self.root = root or CONFIG["RUTAS"]["DATOS_COLUMNARES"]
+        self.rows_per_group = rows_per_group or cfg["FILAS_POR_GRUPO"]
+        self.batch_rows = batch_rows or cfg["FILAS_POR_LOTE"]
+        self.block_bytes = cfg["BLOQUE_CSV_BYTES"]
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, serie, suffix):
+        return os.path.join(self.root, f"{serie}.{suffix}")
+
+    def series(self):
+        """Nombres de las series ingeridas."""
+        return sorted(name[:-len(".parquet")] for name in os.listdir(self.root) if name.endswith(".parquet"))
+
+    def n_rows(self, serie):
+        """Filas de una serie (de los metadatos del Parquet, sin leer datos)."""
+        return pq.ParquetFile(self._path(serie, "parquet")).metadata.num_rows
+
+    def ingest_csv(self, csv_path, serie=None):
+        """
+        Convierte un CSV en un Parquet por serie, leyéndolo por bloques.
+
+        Solo se leen `datetime`, OBS_COLUMNS y, si existe, `city`: con esa
+        columna cada ciudad es una serie; sin ella la serie se llama `serie`
+        (por defecto, como el archivo). Las filas de cada serie deben estar
+        en orden cronológico, como las espera el entrenamiento.
+
+        Returns:
+            list: Series escritas
+        """
+        with open(csv_path, encoding="utf-8") as f:
+            header = f.readline().strip().split(",")
+        por_ciudad = SERIE_COL in header
+        default = HourlyObservationStore.city_slug(serie or os.path.splitext(os.path.basename(csv_path))[0])
+
+        writers, last = {}, {}
+        try:
+            for table in self._read_csv_blocks(csv_path, header, por_ciudad):
+                if por_ciudad:
+                    partes = [
+                        (HourlyObservationStore.city_slug(city), table.filter(pc.equal(table[SERIE_COL], city)))
+                        for city in pc.unique(table[SERIE_COL]).to_pylist()
+                    ]
+                else:
+                    partes = [(default, table)]
+
+                for name, part in partes:
+                    if len(part) == 0:
+                        continue
+                    part = part.select([TIEMPO_COL] + OBS_COLUMNS)
+                    tiempos = part[TIEMPO_COL].cast(pa.int64()).to_numpy()
+                    if np.any(np.diff(tiempos) <= 0) or tiempos[0] <= last.get(name, tiempos[0] - 1):
+                        raise ValueError(f"Las filas de '{name}' en {csv_path} no están en orden cronológico.")
+                    last[name] = tiempos[-1]
+                    if name not in writers:
+                        tmp_path = f"{self._path(name, 'parquet')}.{os.getpid()}.tmp"
+                        writers[name] = (pq.ParquetWriter(tmp_path, part.schema), tmp_path)
+                    writers[name][0].write_table(part, row_group_size=self.rows_per_group)
+        except BaseException:
+            for writer, tmp_path in writers.values():
+                writer.close()
+                os.remove(tmp_path)
+            raise
+
+        for name, (writer, tmp_path) in writers.items():
+            writer.close()
+            os.replace(tmp_path, self._path(name, "parquet"))
+            print(f"[INFO] Serie {name}: {self.n_rows(name)} filas en Parquet")
+        return sorted(writers)
+
+    def sync_csv(self, csv_path):
+        """
+        Series del almacén, ingiriendo el CSV si está vacío o si el CSV es más
+        reciente que alguno de sus Parquet (como features() con el Parquet).
+        Al reingerir se borran las series que el CSV ya no trae.
+
+        Returns:
+            list: Series del almacén
+        """
+        series = self.series()
+        csv_mtime = os.path.getmtime(csv_path)
+        if series and all(os.path.getmtime(self._path(serie, "parquet")) >= csv_mtime for serie in series):
+            return series
+
+        print(f"[INFO] {csv_path} cambió desde la última ingesta; se convierte de nuevo a Parquet")
+        nuevas = self.ingest_csv(csv_path)
+        for serie in set(series) - set(nuevas):
+            for name in os.listdir(self.root):
+                if name.startswith(f"{serie}."):
+                    os.remove(os.path.join(self.root, name))
+        return nuevas
+
+    def _read_csv_blocks(self, csv_path, header, por_ciudad):
+        """
+        Tablas tipadas de bloques de ~block_bytes del CSV, cortados en fin de línea.
+
+        El lector en streaming de pyarrow (open_csv) lee por adelantado casi
+        todo el archivo; así la memoria queda acotada por el tamaño del bloque.
+        """
+        column_types = {TIEMPO_COL: pa.timestamp("s"), **{col: pa.float64() for col in OBS_COLUMNS}}
+        if por_ciudad:
+            column_types[SERIE_COL] = pa.string()
+        read_options = pacsv.ReadOptions(column_names=header)
+        convert_options = pacsv.ConvertOptions(column_types=column_types, include_columns=list(column_types))
+
+        with open(csv_path, "rb") as f:
+            f.readline()  # Encabezado
+            while True:
+                block = f.read(self.block_bytes)
+                if not block:
+                    break
+                block += f.readline()
+                yield pacsv.read_csv(pa.py_buffer(block), read_options=read_options, convert_options=convert_options)
+
+    def read_batches(self, serie, columns=None):
+        """Bloques (RecordBatch) de una serie con memoria mapeada, solo con `columns`."""
+        parquet = pq.ParquetFile(self._path(serie, "parquet"), memory_map=True)
+        try:
+            yield from parquet.iter_batches(batch_size=self.batch_rows, columns=columns)
+        finally:
+            parquet.close()
+
+    def features(self, serie, preprocessor=None):
+        """
+        Memmap (n, len(FEATURE_COLUMNS)) de una serie, de solo lectura. Se
+        recalcula bloque a bloque si falta o si el Parquet es más reciente.
+        """
+        path = self._path(serie, "features.npy")
+        source = self._path(serie, "parquet")
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source):
+            preprocessor = preprocessor or TimeSeriesPreprocessor()
+            out, tmp_path = self._open_output(path, (self.n_rows(serie), len(FEATURE_COLUMNS)))
+            start = 0
+            for batch in self.read_batches(serie, [TIEMPO_COL] + OBS_COLUMNS):
+                # Parquet guarda las marcas de tiempo en ms: se vuelven a segundos
+                epochs = batch.column(0).cast(pa.timestamp("s")).cast(pa.int64()).to_numpy()
+                values = np.column_stack([batch.column(col).to_numpy(zero_copy_only=False) for col in OBS_COLUMNS])
+                out[start:start + len(epochs)] = preprocessor.build_features(epochs, values)
+                start += len(epochs)
+            self._publish(out, tmp_path, path)
+        return np.load(path, mmap_mode="r")
+
+    def _open_output(self, path, shape):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        return np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=shape), tmp_path
+
+    @staticmethod
+    def _publish(out, tmp_path, path):
+        out.flush()
+        os.replace(tmp_path, path)
@@ -3,6 +3,9 @@
 Configuración global para el sistema de predicción de series temporales.
 """
 
+# Segundos de una hora: paso de las series horarias y de la hora de emisión
+HORA_S = 3600
+
 CONFIG = {
     # Parámetros temporales
     "TIEMPO": {
@@ -20,6 +23,8 @@ CONFIG = {
         "BATCH_SIZE": 256,
         "LEARNING_RATE": 5e-5,
         "LSTM_UNITS": 128,
+        # Ventanas (o índices, sin caché) en el búfer de barajado de tf.data
+        "BUFFER_SHUFFLE": 16 * 1024,
     },
     # Parámetros de división de datos
     "DATOS": {
@@ -27,14 +32,148 @@ CONFIG = {
         "VAL_SIZE": 0.1,
         "TEST_SIZE": 0.1,
     },
+    # Cliente HTTP hacia WeatherAPI
+    "WEATHER_API": {
+        "BASE_URL": "http://api.weatherapi.com/v1",
+        "TIMEOUT_S": 10.0,
+        "CONNECT_TIMEOUT_S": 3.0,
+        "MAX_CONNECTIONS": 32,
+        "MAX_KEEPALIVE": 16,
+        # Cuota del plan: llamadas por segundo sostenidas y ráfaga máxima
+        # (serve.py la reparte entre sus workers, ver split_quota)
+        "RATE_PER_S": 10.0,
+        "BURST": 20,
+        "MAX_REINTENTOS_429": 2,
+        "RETRY_AFTER_S": 1.0,
+        # Plazo total por llamada y cortocircuito ante fallos seguidos
+        "DEADLINE_S": 15.0,
+        "BREAKER_FALLOS": 5,
+        "BREAKER_RESET_S": 30.0,
+        # Duplicar forecast.json si tarda más que el p95 observado
+        "HEDGE_FORECAST": False,
+        "HEDGE_DELAY_S": 1.0,
+        "HEDGE_MIN_MUESTRAS": 20,
+    },
+    # Caché persistente de días históricos (history.json)
+    "CACHE_HISTORIA": {
+        "MAX_BYTES": 256 * 1024 * 1024,
+        "TTL_HOY_S": 15 * 60,
+    },
+    # Caché en memoria de pronósticos por (ciudad, hora de emisión)
+    "CACHE_PRONOSTICO": {
+        "MAX_BYTES": 32 * 1024 * 1024,
+    },
+    # Pronóstico por lote (varias ciudades en una solicitud)
+    "LOTE_CIUDADES": {
+        "MAX_CIUDADES": 64,
+    },
+    # Auditoría de predicciones (Parquet en segundo plano)
+    "AUDITORIA": {
+        "MAX_FILAS_COLA": 200_000,
+        "FILAS_POR_SEGMENTO": 20_000,
+        "INTERVALO_S": 30.0,
+        # Espera máxima de una solicitud con la cola llena antes de descartar
+        "ESPERA_MAX_S": 0.05,
+    },
+    # Micro-lotes de inferencia: filas máximas por lote y espera máxima
+    "INFERENCIA": {
+        "MAX_BATCH": 64,
+        "MAX_WAIT_MS": 5,
+        # tf.function con firma fija y lotes rellenados a potencias de dos
+        "SERVING_COMPILADO": True,
+        "XLA": False,
+        "BUCKET_MAX": 64,
+        # Variante servida: float32 (Keras) o una cuantizada que pasó la compuerta
+        "VARIANTE": "float32",
+    },
+    # Hilos por etapa del pipeline de solicitudes (ver Utils/stage_executors.py)
+    "ETAPAS": {
+        "IO": 8,
+        "CPU": 2,
+        # Un lote a la vez: el InferenceBatcher ya agrupa las solicitudes
+        "INFERENCIA": 1,
+        "PERSISTENCIA": 4,
+        "LLM": 8,
+        "INTERVALO_LAG_S": 0.05,
+    },
+    # Servidor del modelo compartido por los workers de serve.py (SOCKET lo fija serve.py)
+    "SERVIDOR_MODELO": {
+        "SOCKET": None,
+        "MAX_FILAS": 256,
+        "MAX_VERSIONES": 2,
+        "WORKERS": 2,
+    },
+    # Compuerta de las variantes cuantizadas: pérdida relativa máxima de MAE/RMSE
+    "CUANTIZACION": {
+        "TOLERANCIA_RELATIVA": 0.05,
+    },
+    # Registro de modelos: conservar cargada la versión anterior para revertir al instante
+    "REGISTRO": {
+        "MANTENER_ANTERIOR": True,
+        # Cada cuánto un worker revisa la versión activa del registro
+        "SINCRONIZAR_S": 5.0,
+    },
+    # Datos de entrenamiento en Parquet y memmaps (ver Etl/training_store.py)
+    "DATOS_COLUMNARES": {
+        "BLOQUE_CSV_BYTES": 16 * 1024 * 1024,
+        "FILAS_POR_GRUPO": 64 * 1024,
+        "FILAS_POR_LOTE": 64 * 1024,
+    },
+    # Búsqueda de hiperparámetros (ver Controllers/hyperparameter_search.py)
+    "BUSQUEDA": {
+        "ENSAYOS": 9,
+        # Halving sucesivo: épocas del primer peldaño, factor de reducción y tope
+        "EPOCAS_MIN": 2,
+        "ETA": 3,
+        "EPOCAS_MAX": 18,
+        "PACIENCIA": 3,
+        # Procesos en paralelo e hilos de TensorFlow por proceso
+        # (HILOS_INTRA None: núcleos disponibles / WORKERS)
+        "WORKERS": 2,
+        "HILOS_INTRA": None,
+        "HILOS_INTER": 1,
+        "SEMILLA": 123,
+        "ESPACIO": {
+            "LSTM_UNITS": [32, 64, 128, 256],
+            "LEARNING_RATE": [1e-5, 5e-5, 1e-4, 5e-4, 1e-3],
+            "BATCH_SIZE": [64, 128, 256, 512],
+            # El despliegue del horizonte y el servidor del modelo usan
+            # CONFIG['SECUENCIA']: se exporta al registro el mejor ensayo con
+            # esas longitudes; los demás solo sirven de comparación
+            "INPUT_LENGTH": [24, 48, 72],
+            "OUTPUT_LENGTH": [24],
+        },
+    },
+    # Ajuste fino incremental con las observaciones nuevas (ver Controllers/fine_tuning.py)
+    "AJUSTE_FINO": {
+        "EPOCAS": 3,
+        "LEARNING_RATE": 1e-5,
+        "BATCH_SIZE": 64,
+        "PACIENCIA": 1,
+        # Fracción más reciente de las horas nuevas de cada ciudad para validar
+        "VAL_SIZE": 0.2,
+        # Tope de horas por ciudad en una corrida (las más recientes)
+        "MAX_HORAS": 30 * 24,
+        # Mejora relativa mínima del RMSE de validación para registrar la versión
+        "MEJORA_MIN": 0.0,
+    },
     # Columna objetivo
     "TARGET_COL": ["temp_c", "humidity"],
     # Rutas para guardar modelos y resultados
     "RUTAS": {
         "MODELO": "data_train/modelo_lstm_mejorado.keras",
         "SCALER": "data_train/scalers.pkl",
+        "SCALER_NPZ": "data_train/scalers.npz",
+        "REGISTRO_MODELOS": "data_train/registry",
+        "CACHE_HISTORIA": "data_train/cache/history_cache.sqlite",
+        "OBSERVACIONES": "data_train/observaciones",
+        "AUDITORIA": "data_train/auditoria",
         "RESULTADOS": "data_train/resultados_modelo.csv",
         "DATOS": "Data/datos_entrenamiento.csv",
+        "DATOS_COLUMNARES": "data_train/datos_columnares",
+        # Caché de ventanas de tf.data entre épocas (None: se leen de la serie cada época)
+        "CACHE_TF_DATA": None,
+        "BUSQUEDA": "data_train/busqueda",
         "INTENT_PATTERNS": "Data/intent_patterns.json",
         "RESPONSES": "Data/responses.json",
     },
@@ -0,0 +1,15 @@
+# fast_json.py - Serialización JSON rápida
+"""
+Usa orjson cuando está instalado y, si no, el módulo json de la librería estándar.
+`dumps` siempre retorna bytes.
+"""
+
+try:
+    from orjson import dumps, loads
+except ImportError:  # orjson es opcional
+    import json
+
+    loads = json.loads
+
+    def dumps(data):
+        return json.dumps(data).encode("utf-8")
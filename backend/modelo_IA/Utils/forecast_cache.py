@@ -0,0 +1,121 @@
+# forecast_cache.py - Caché en memoria de pronósticos por ciudad y hora de emisión
+"""
+Caché de pronósticos ya calculados.
+
+Un pronóstico de 7 días contiene todos los horizontes más cortos, así que por
+(ciudad normalizada, hora de emisión) se guarda solo el horizonte más largo
+calculado hasta el momento y las solicitudes de menos días se sirven
+recortándolo. Las entradas vencen al cambiar la hora y se desalojan en orden
+LRU cuando se supera el presupuesto de memoria.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from Utils.config import CONFIG, HORA_S
+from Utils.fast_json import dumps
+
+
+def current_issue_hour():
+    """Hora de emisión actual (horas desde epoch)."""
+    return int(time.time() // HORA_S)
+
+
+class ForecastCache:
+    """
+    Pronósticos por (ciudad, hora de emisión) con límite de memoria y desalojo LRU.
+    """
+
+    def __init__(self, max_bytes=None):
+        """
+        Args:
+            max_bytes: Presupuesto de memoria estimado. Por defecto
+                       CONFIG['CACHE_PRONOSTICO']['MAX_BYTES'].
+        """
+        self.max_bytes = max_bytes or CONFIG["CACHE_PRONOSTICO"]["MAX_BYTES"]
+        self._entries = OrderedDict()  # ciudad -> (hora, días, pred_df, info, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _size(pred_df, info_adicional):
+        return int(pred_df.memory_usage(deep=True).sum()) + len(dumps(info_adicional))
+
+    def _drop(self, city):
+        entry = self._entries.pop(city)
+        self._bytes -= entry[4]
+
+    def get(self, city, days, issue_hour=None):
+        """
+        Pronóstico de `days` días para la ciudad, si hay uno igual o más largo
+        emitido en la misma hora.
+
+        Args:
+            city: Ciudad normalizada.
+            days: Días pedidos.
+            issue_hour: Hora de emisión. Por defecto la actual.
+
+        Returns:
+            Tuple[pd.DataFrame, list] | None: (predicciones recortadas a days*24
+            horas, información adicional), o None si no hay entrada válida.
+        """
+        issue_hour = current_issue_hour() if issue_hour is None else issue_hour
+        with self._lock:
+            entry = self._entries.get(city)
+            if entry is not None and entry[0] != issue_hour:
+                # Emitido en una hora anterior: vence en el cambio de hora
+                self._drop(city)
+                self.expirations += 1
+                entry = None
+            if entry is None or entry[1] < days:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(city)
+            self.hits += 1
+        _, _, pred_df, info_adicional, _ = entry
+        return pred_df.iloc[: days * 24].copy(), info_adicional
+
+    def put(self, city, days, pred_df, info_adicional, issue_hour=None):
+        """Guarda el pronóstico si su horizonte supera al que ya hay para esa hora."""
+        issue_hour = current_issue_hour() if issue_hour is None else issue_hour
+        size = self._size(pred_df, info_adicional)
+        with self._lock:
+            entry = self._entries.get(city)
+            if entry is not None and (
+                entry[0] > issue_hour or (entry[0] == issue_hour and entry[1] >= days)
+            ):
+                return
+            if entry is not None:
+                self._drop(city)
+            if size > self.max_bytes:
+                return
+            self._entries[city] = (issue_hour, days, pred_df, info_adicional, size)
+            self._bytes += size
+            # Desalojo LRU hasta cumplir el presupuesto
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """Vacía el caché (p. ej. al cambiar de modelo)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Contadores de aciertos/fallos y ocupación actual."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
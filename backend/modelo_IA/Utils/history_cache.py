@@ -0,0 +1,200 @@
+# history_cache.py - Caché persistente de días históricos de WeatherAPI
+"""
+Caché en disco (SQLite) para las respuestas de history.json.
+
+Los días pasados no cambian, así que se guardan una sola vez por
+(ciudad normalizada, fecha) comprimidos con gzip y se reutilizan entre
+solicitudes y usuarios. El día actual es parcial y tiene un TTL corto.
+También conserva el último forecast.json de cada ciudad como respaldo.
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from Controllers.chatbot.text_normalizer import TextNormalizer
+from Utils.config import CONFIG
+from Utils.fast_json import dumps, loads
+
+
+class HistoryCache:
+    """
+    Almacén clave-valor de días históricos con límite de tamaño y desalojo LRU.
+    """
+
+    def __init__(self, path=None, max_bytes=None, today_ttl_s=None):
+        """
+        Args:
+            path: Ruta del archivo SQLite. Por defecto CONFIG['RUTAS']['CACHE_HISTORIA'].
+            max_bytes: Tamaño máximo (comprimido) antes de desalojar entradas.
+            today_ttl_s: Vigencia en segundos de la entrada del día actual.
+        """
+        self.path = path or CONFIG["RUTAS"]["CACHE_HISTORIA"]
+        self.max_bytes = max_bytes or CONFIG["CACHE_HISTORIA"]["MAX_BYTES"]
+        self.today_ttl_s = today_ttl_s or CONFIG["CACHE_HISTORIA"]["TTL_HOY_S"]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS history (
+                key TEXT PRIMARY KEY,
+                city TEXT NOT NULL,
+                date TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_accessed ON history (accessed_at)"
+        )
+        # Último forecast.json válido por ciudad, para servirlo si el proveedor cae
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS last_forecast (
+                city TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(city, date):
+        """Dirección de contenido de un día: hash de (ciudad normalizada, fecha)."""
+        raw = f"{TextNormalizer.normalize_city(city)}|{date}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, city, date, today=None, allow_stale=False):
+        """
+        Obtiene la respuesta cacheada de un día.
+
+        Args:
+            city: Ciudad consultada.
+            date: Fecha YYYY-MM-DD.
+            today: Fecha actual; si coincide con `date` se aplica el TTL corto.
+            allow_stale: Retorna la entrada aunque haya vencido su TTL.
+
+        Returns:
+            dict con el JSON original, o None si no está en caché.
+        """
+        key = self.make_key(city, date)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, stored_at FROM history WHERE key = ?", (key,)
+            ).fetchone()
+            expired = (
+                row is not None
+                and date == today
+                and now - row[1] > self.today_ttl_s
+            )
+            if row is None or (expired and not allow_stale):
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE history SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return loads(gzip.decompress(row[0]))
+
+    def put(self, city, date, data):
+        """Guarda (o reemplaza) la respuesta de un día y aplica el límite de tamaño."""
+        payload = gzip.compress(dumps(data), compresslevel=6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.make_key(city, date),
+                    TextNormalizer.normalize_city(city),
+                    date,
+                    payload,
+                    len(payload),
+                    now,
+                    now,
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def put_forecast(self, city, data):
+        """Guarda la última respuesta de forecast.json de una ciudad."""
+        payload = gzip.compress(dumps(data), compresslevel=6)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO last_forecast VALUES (?, ?, ?)",
+                (TextNormalizer.normalize_city(city), payload, time.time()),
+            )
+            self._conn.commit()
+
+    def get_forecast(self, city):
+        """Última respuesta de forecast.json guardada para la ciudad, o None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM last_forecast WHERE city = ?",
+                (TextNormalizer.normalize_city(city),),
+            ).fetchone()
+        return loads(gzip.decompress(row[0])) if row else None
+
+    def _evict(self):
+        """Desaloja las entradas menos usadas recientemente hasta cumplir max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM history").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM history ORDER BY accessed_at ASC"
+        ).fetchall()
+        to_delete = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM history WHERE key = ?", to_delete)
+        self.evictions += len(to_delete)
+
+    def stats(self):
+        """Contadores de aciertos/fallos y ocupación actual."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM history"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_history_cache = None
+
+
+def get_history_cache():
+    """Instancia compartida del caché (se crea en el primer uso)."""
+    global _history_cache
+    if _history_cache is None:
+        _history_cache = HistoryCache()
+    return _history_cache
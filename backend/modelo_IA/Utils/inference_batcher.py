@@ -0,0 +1,140 @@
+# inference_batcher.py - Micro-lotes dinámicos para la inferencia del modelo
+"""
+Cola de inferencia delante del modelo.
+
+Las ventanas de solicitudes concurrentes se acumulan durante unos
+milisegundos (o hasta llenar un lote máximo), se ejecutan en una sola
+pasada del modelo y cada solicitud recibe su porción del resultado. La
+sobrecarga por llamada de Keras se paga una vez por lote y no por solicitud.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+from Utils.config import CONFIG
+from Utils.stage_executors import run_stage
+
+
+def _bucket(n):
+    """Etiqueta de histograma en potencias de dos: 1, 2, 4, 8, ..."""
+    edge = 1
+    while edge < n:
+        edge *= 2
+    return edge
+
+
+class InferenceBatcher:
+    """
+    Agrupa llamadas concurrentes a `predict_fn` en lotes.
+
+    Una solicitud nunca se divide entre lotes: si por sí sola supera
+    `max_batch` se ejecuta en un lote propio.
+    """
+
+    def __init__(self, predict_fn, max_batch=None, max_wait_ms=None):
+        """
+        Args:
+            predict_fn: Función síncrona que recibe un arreglo (n, ...) y retorna (n, ...).
+            max_batch: Máximo de filas (ventanas) por lote.
+            max_wait_ms: Espera máxima desde que llega la primera solicitud del lote.
+        """
+        cfg = CONFIG["INFERENCIA"]
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch or cfg["MAX_BATCH"]
+        self.max_wait_s = (max_wait_ms if max_wait_ms is not None else cfg["MAX_WAIT_MS"]) / 1000
+        self._pending = []  # (arreglo, futuro, instante de llegada)
+        self._pending_rows = 0
+        self._full = None
+        self._worker = None
+        self.batches = 0
+        self.requests = 0
+        self.rows_histogram = {}
+        self.requests_histogram = {}
+
+    async def predict(self, x):
+        """
+        Encola `x` y espera su predicción.
+
+        Returns:
+            np.ndarray: Las filas de la salida del modelo que corresponden a `x`.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((x, future, time.monotonic()))
+        self._pending_rows += len(x)
+
+        if self._worker is None:
+            self._full = asyncio.Event()
+            self._worker = asyncio.ensure_future(self._run())
+        if self._pending_rows >= self.max_batch:
+            self._full.set()
+        return await future
+
+    def _take_batch(self):
+        """Saca de la cola las solicitudes del siguiente lote (sin partir ninguna)."""
+        taken, rows = [], 0
+        while self._pending:
+            n = len(self._pending[0][0])
+            if taken and rows + n > self.max_batch:
+                break
+            taken.append(self._pending.pop(0))
+            rows += n
+        self._pending_rows -= rows
+        if self._pending_rows < self.max_batch:
+            self._full.clear()
+        return taken, rows
+
+    async def _run(self):
+        try:
+            while self._pending:
+                # Se espera a llenar el lote o a que venza la espera de la primera solicitud
+                remaining = self._pending[0][2] + self.max_wait_s - time.monotonic()
+                if remaining > 0 and self._pending_rows < self.max_batch:
+                    try:
+                        await asyncio.wait_for(self._full.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+
+                taken, _ = self._take_batch()
+                # Las solicitudes canceladas mientras esperaban no se procesan
+                taken = [item for item in taken if not item[1].done()]
+                if not taken:
+                    continue
+                batch = np.concatenate([item[0] for item in taken])
+                self._record(len(taken), len(batch))
+
+                try:
+                    # El modelo corre en la etapa de inferencia para no bloquear el bucle de eventos
+                    output = await run_stage("inferencia", self.predict_fn, batch)
+                except Exception as e:
+                    for _, future, _ in taken:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                start = 0
+                for x, future, _ in taken:
+                    if not future.done():
+                        future.set_result(output[start:start + len(x)])
+                    start += len(x)
+        finally:
+            self._worker = None
+
+    def _record(self, n_requests, n_rows):
+        self.batches += 1
+        self.requests += n_requests
+        rows_key, requests_key = _bucket(n_rows), _bucket(n_requests)
+        self.rows_histogram[rows_key] = self.rows_histogram.get(rows_key, 0) + 1
+        self.requests_histogram[requests_key] = self.requests_histogram.get(requests_key, 0) + 1
+
+    def stats(self):
+        """Lotes ejecutados e histogramas de filas y solicitudes por lote."""
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_requests_per_batch": self.requests / self.batches if self.batches else 0.0,
+            "rows_per_batch": {str(k): v for k, v in sorted(self.rows_histogram.items())},
+            "requests_per_batch": {str(k): v for k, v in sorted(self.requests_histogram.items())},
+            "queued": len(self._pending),
+        }
@@ -0,0 +1,266 @@
+# prediction_audit.py - Registro de auditoría de predicciones en Parquet
+"""
+Registro de solo-anexado de las predicciones generadas.
+
+La ruta de la solicitud solo encola las filas; un hilo de fondo las acumula y
+las escribe en segmentos Parquet particionados por fecha de emisión:
+
+    auditoria/
+        fecha=2025-05-01/part-1714521600123-4242-000001.parquet
+        fecha=2025-05-02/...
+
+Cada vaciado produce un segmento nuevo que se publica con os.replace, así
+que un lector (read_audit) nunca ve un archivo a medio escribir. El nombre
+lleva el pid: los workers de serve.py heredan el contador del maestro con el
+fork y escriben en el mismo directorio. La cola
+tiene un límite de filas: si está llena la solicitud espera como máximo
+CONFIG['AUDITORIA']['ESPERA_MAX_S'] y después las filas se descartan (y se
+cuentan) para no frenar el servicio.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional: sin él la auditoría se desactiva
+    pa = None
+
+from Utils.config import CONFIG
+
+PARTICION = "fecha"
+
+
+class PredictionAuditLog:
+    """
+    Cola acotada de predicciones con un escritor Parquet en segundo plano.
+    """
+
+    def __init__(self, directory=None, max_rows=None, flush_rows=None, flush_interval_s=None):
+        """
+        Args:
+            directory: Directorio raíz. Por defecto CONFIG['RUTAS']['AUDITORIA'].
+            max_rows: Filas máximas en cola (memoria acotada).
+            flush_rows: Filas que disparan la escritura de un segmento.
+            flush_interval_s: Espera máxima antes de escribir lo acumulado.
+        """
+        cfg = CONFIG["AUDITORIA"]
+        self.directory = directory or CONFIG["RUTAS"]["AUDITORIA"]
+        self.max_rows = max_rows or cfg["MAX_FILAS_COLA"]
+        self.flush_rows = flush_rows or cfg["FILAS_POR_SEGMENTO"]
+        self.flush_interval_s = flush_interval_s or cfg["INTERVALO_S"]
+        self.enabled = pa is not None
+        if not self.enabled:
+            print("⚠️ pyarrow no está instalado: la auditoría de predicciones está desactivada")
+
+        self._pending = deque()
+        self._pending_rows = 0
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self._seq = 0
+        self.enqueued_rows = 0
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.segments = 0
+        self.errors = 0
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="prediction-audit", daemon=True)
+            self._thread.start()
+
+    def try_put(self, record):
+        """
+        Encola un registro sin bloquear.
+
+        Args:
+            record: Diccionario columna -> arreglo (todas del mismo largo).
+
+        Returns:
+            bool: False si la cola está llena o el registro está cerrado.
+        """
+        rows = len(next(iter(record.values())))
+        with self._cond:
+            if self._closed or self._pending_rows + rows > self.max_rows:
+                return False
+            self._ensure_thread()
+            self._pending.append(record)
+            self._pending_rows += rows
+            self.enqueued_rows += rows
+            if self._pending_rows >= self.flush_rows:
+                self._cond.notify_all()
+        return True
+
+    async def log(self, pred_df, city, days, model_version=None, variant=None, user_id=None):
+        """
+        Encola las predicciones horarias de un pronóstico.
+
+        Si la cola está llena espera hasta ESPERA_MAX_S y luego descarta las filas.
+
+        Args:
+            pred_df: DataFrame con datetime, temp_pred y humidity_pred.
+            city: Ciudad normalizada.
+            days: Días pronosticados.
+            model_version: Versión del modelo que generó las predicciones.
+            variant: Variante servida (float32, int8, ...).
+            user_id: Usuario que hizo la solicitud.
+
+        Returns:
+            bool: True si las filas quedaron en cola.
+        """
+        if not self.enabled:
+            return False
+        rows = len(pred_df)
+        issued_at = np.datetime64(datetime.now().replace(microsecond=0))
+        record = {
+            "issued_at": np.full(rows, issued_at),
+            "city": np.full(rows, city, dtype=object),
+            "days": np.full(rows, days, dtype=np.int16),
+            "model_version": np.full(rows, model_version, dtype=object),
+            "variant": np.full(rows, variant, dtype=object),
+            "user_id": np.full(rows, np.nan if user_id is None else user_id, dtype=np.float64),
+            "lead_hour": np.arange(1, rows + 1, dtype=np.int16),
+            "datetime": pred_df["datetime"].to_numpy(),
+            "temp_pred": pred_df["temp_pred"].to_numpy(dtype=np.float32),
+            "humidity_pred": pred_df["humidity_pred"].to_numpy(dtype=np.float32),
+        }
+
+        deadline = time.monotonic() + CONFIG["AUDITORIA"]["ESPERA_MAX_S"]
+        while not self.try_put(record):
+            if self._closed or time.monotonic() >= deadline:
+                self.dropped_rows += rows
+                return False
+            await asyncio.sleep(0.005)
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or self._flush_requested or self._pending_rows >= self.flush_rows,
+                    timeout=self.flush_interval_s,
+                )
+                if not self._pending:
+                    self._flush_requested = False
+                    self._cond.notify_all()
+                    if self._closed:
+                        return
+                    continue
+                records = list(self._pending)
+                self._pending.clear()
+                self._pending_rows = 0
+                self._writing = True
+
+            try:
+                self._write(records)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ No se pudo escribir el segmento de auditoría: {e}")
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write(self, records):
+        """Escribe un segmento por partición de fecha."""
+        columns = {
+            name: np.concatenate([np.asarray(r[name]) for r in records]) for name in records[0]
+        }
+        frame = pd.DataFrame(columns)
+        # En la cola es float (NaN sin usuario); en el segmento, entero con nulos
+        frame["user_id"] = frame["user_id"].astype("Int64")
+        fechas = frame["issued_at"].dt.strftime("%Y-%m-%d")
+        for fecha, part in frame.groupby(fechas, sort=False):
+            directory = os.path.join(self.directory, f"{PARTICION}={fecha}")
+            os.makedirs(directory, exist_ok=True)
+            self._seq += 1
+            name = f"part-{int(time.time() * 1000)}-{os.getpid()}-{self._seq:06d}.parquet"
+            # El temporal empieza con '.', así los lectores de pyarrow lo ignoran
+            tmp_path = os.path.join(directory, f".{name}.tmp")
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            pq.write_table(table, tmp_path, compression="zstd")
+            os.replace(tmp_path, os.path.join(directory, name))
+            self.segments += 1
+            self.written_rows += len(part)
+
+    def flush(self, timeout=None):
+        """Escribe lo que haya en cola y espera a que termine (bloqueante)."""
+        with self._cond:
+            if self._thread is None:
+                return
+            self._flush_requested = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not self._pending and not self._writing, timeout=timeout)
+
+    def close(self, timeout=10.0):
+        """Vacía la cola y detiene el escritor."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "enqueued_rows": self.enqueued_rows,
+            "written_rows": self.written_rows,
+            "dropped_rows": self.dropped_rows,
+            "queued_rows": self._pending_rows,
+            "segments": self.segments,
+            "errors": self.errors,
+        }
+
+
+def read_audit(directory=None, start=None, end=None, columns=None):
+    """
+    Lee el registro de auditoría para análisis o verificación del modelo.
+
+    Args:
+        directory: Directorio raíz. Por defecto CONFIG['RUTAS']['AUDITORIA'].
+        start, end: Fechas de emisión 'YYYY-MM-DD' (inclusive); solo se leen
+                    las particiones del rango.
+        columns: Columnas a leer (todas por defecto).
+
+    Returns:
+        pd.DataFrame
+    """
+    directory = directory or CONFIG["RUTAS"]["AUDITORIA"]
+    if pa is None:
+        raise ImportError("Se requiere pyarrow para leer la auditoría de predicciones.")
+    if not os.path.isdir(directory):
+        return pd.DataFrame()
+    dataset = ds.dataset(
+        directory,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([(PARTICION, pa.string())]), flavor="hive"),
+    )
+    filtro = None
+    if start is not None:
+        filtro = ds.field(PARTICION) >= start
+    if end is not None:
+        filtro = (ds.field(PARTICION) <= end) if filtro is None else filtro & (ds.field(PARTICION) <= end)
+    return dataset.to_table(columns=columns, filter=filtro).to_pandas()
+
+
+_prediction_audit = None
+
+
+def get_prediction_audit():
+    """Instancia compartida del registro de auditoría."""
+    global _prediction_audit
+    if _prediction_audit is None:
+        _prediction_audit = PredictionAuditLog()
+    return _prediction_audit
@@ -0,0 +1,178 @@
+# rate_limiter.py - Control de cuota para llamadas salientes
+"""
+Planificador de llamadas salientes con cubeta de tokens y clases de prioridad.
+
+Todas las llamadas a WeatherAPI piden un token antes de salir. Cuando no hay
+tokens disponibles las solicitudes esperan en una cola ordenada por prioridad
+(las interactivas salen antes que las de precarga o reentrenamiento).
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+
+from Utils.config import CONFIG
+
+# Clases de prioridad (menor valor = sale antes)
+PRIORIDAD_INTERACTIVA = 0
+PRIORIDAD_FONDO = 1
+
+NOMBRES_PRIORIDAD = {
+    PRIORIDAD_INTERACTIVA: "interactiva",
+    PRIORIDAD_FONDO: "fondo",
+}
+
+
+class TokenBucket:
+    """
+    Cubeta de tokens clásica: se rellena a `rate` tokens/segundo hasta `capacity`.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - max(self.updated_at, self.paused_until))
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = max(now, self.updated_at)
+
+    def try_take(self):
+        """Consume un token si hay disponible."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return False
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def time_until_token(self):
+        """Segundos estimados hasta que haya un token disponible."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Vacía la cubeta y detiene el rellenado (p. ej. tras un 429)."""
+        self.tokens = 0.0
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class OutboundScheduler:
+    """
+    Cola de prioridad delante de la cubeta de tokens, con estadísticas de espera.
+    """
+
+    def __init__(self, rate=None, burst=None, window=1000):
+        """
+        Args:
+            rate: Llamadas por segundo sostenidas. Por defecto CONFIG['WEATHER_API']['RATE_PER_S'].
+            burst: Ráfaga máxima. Por defecto CONFIG['WEATHER_API']['BURST'].
+            window: Número de esperas recientes que se conservan por prioridad.
+        """
+        cfg = CONFIG["WEATHER_API"]
+        self.bucket = TokenBucket(rate or cfg["RATE_PER_S"], burst or cfg["BURST"])
+        self._heap = []
+        self._seq = itertools.count()
+        self._dispatcher = None
+        self._waits = {p: deque(maxlen=window) for p in NOMBRES_PRIORIDAD}
+        self._granted = {p: 0 for p in NOMBRES_PRIORIDAD}
+        self.throttled = 0
+
+    async def acquire(self, priority=PRIORIDAD_INTERACTIVA):
+        """Espera hasta obtener permiso para realizar una llamada saliente."""
+        started = time.monotonic()
+        if not self._heap and self.bucket.try_take():
+            self._record(priority, started)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await future
+        self._record(priority, started)
+
+    async def _dispatch(self):
+        """Entrega tokens a la cola en orden de prioridad mientras haya solicitudes."""
+        while self._heap:
+            # Descartar solicitudes canceladas sin gastar tokens
+            while self._heap and self._heap[0][2].done():
+                heapq.heappop(self._heap)
+            if not self._heap:
+                break
+            if self.bucket.try_take():
+                _, _, future = heapq.heappop(self._heap)
+                future.set_result(None)
+            else:
+                await asyncio.sleep(self.bucket.time_until_token())
+
+    def throttle(self, retry_after_s):
+        """Detiene el envío tras una respuesta 429 del proveedor."""
+        self.throttled += 1
+        self.bucket.pause(retry_after_s)
+
+    def _record(self, priority, started):
+        self._granted[priority] += 1
+        self._waits[priority].append(time.monotonic() - started)
+
+    def stats(self):
+        """Profundidad de cola y tiempos de espera (ms) por clase de prioridad."""
+        depth = {name: 0 for name in NOMBRES_PRIORIDAD.values()}
+        for priority, _, future in self._heap:
+            if not future.done():
+                depth[NOMBRES_PRIORIDAD[priority]] += 1
+
+        waits = {}
+        for priority, samples in self._waits.items():
+            ordered = sorted(samples)
+            waits[NOMBRES_PRIORIDAD[priority]] = {
+                "granted": self._granted[priority],
+                "mean_ms": 1000 * sum(ordered) / len(ordered) if ordered else 0.0,
+                "p95_ms": 1000 * ordered[int(0.95 * (len(ordered) - 1))] if ordered else 0.0,
+                "max_ms": 1000 * ordered[-1] if ordered else 0.0,
+            }
+        return {
+            "queue_depth": depth,
+            "wait": waits,
+            "throttled": self.throttled,
+            "tokens": round(self.bucket.tokens, 2),
+        }
+
+
+_scheduler = None
+
+
+def split_quota(processes):
+    """
+    Reparte la cuota de WeatherAPI entre procesos que llaman al proveedor por
+    separado (los workers de serve.py): cada uno tiene su propia cubeta, así
+    que con la cuota completa en cada uno se enviaría N veces la del plan.
+    Se llama antes de crear el planificador (en el maestro, antes del fork).
+
+    Args:
+        processes: Número de procesos que comparten la cuota.
+    """
+    global _scheduler
+    cfg = CONFIG["WEATHER_API"]
+    processes = max(1, int(processes))
+    cfg["RATE_PER_S"] = cfg["RATE_PER_S"] / processes
+    cfg["BURST"] = max(1, cfg["BURST"] // processes)
+    _scheduler = None
+
+
+def get_scheduler():
+    """Planificador compartido para las llamadas a WeatherAPI."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = OutboundScheduler()
+    return _scheduler
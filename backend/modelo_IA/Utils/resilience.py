@@ -0,0 +1,134 @@
+# resilience.py - Protección frente a un proveedor lento o caído
+"""
+Cortocircuito (circuit breaker) con sondeo semiabierto y seguimiento de
+latencias para calcular el retardo de las solicitudes duplicadas (hedging).
+"""
+
+import time
+from collections import deque
+
+from Utils.config import CONFIG
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+class CircuitBreaker:
+    """
+    Corta el tráfico hacia un proveedor tras `failure_threshold` fallos seguidos.
+
+    Pasado `reset_timeout_s` deja salir una única solicitud de prueba
+    (estado semiabierto): si funciona se cierra el circuito, si falla se
+    vuelve a abrir.
+    """
+
+    def __init__(self, failure_threshold=None, reset_timeout_s=None):
+        cfg = CONFIG["WEATHER_API"]
+        self.failure_threshold = failure_threshold or cfg["BREAKER_FALLOS"]
+        self.reset_timeout_s = reset_timeout_s or cfg["BREAKER_RESET_S"]
+        self.state = CERRADO
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.probe_started_at = 0.0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow_request(self):
+        """Indica si una solicitud puede salir hacia el proveedor."""
+        if self.state == CERRADO:
+            return True
+        if self.state == ABIERTO and time.monotonic() - self.opened_at >= self.reset_timeout_s:
+            self.state = SEMIABIERTO
+            self.probe_in_flight = False
+        # Una sonda que nunca reportó resultado (p. ej. cancelada) no bloquea para siempre
+        probe_expired = time.monotonic() - self.probe_started_at >= self.reset_timeout_s
+        if self.state == SEMIABIERTO and (not self.probe_in_flight or probe_expired):
+            self.probe_in_flight = True
+            self.probe_started_at = time.monotonic()
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.state = CERRADO
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == SEMIABIERTO or self.failures >= self.failure_threshold:
+            if self.state != ABIERTO:
+                self.times_opened += 1
+            self.state = ABIERTO
+            self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """
+    Ventana de latencias recientes; su percentil 95 decide cuándo duplicar una solicitud.
+    """
+
+    def __init__(self, window=200, default_delay_s=None, min_samples=None):
+        cfg = CONFIG["WEATHER_API"]
+        self.samples = deque(maxlen=window)
+        self.default_delay_s = default_delay_s or cfg["HEDGE_DELAY_S"]
+        self.min_samples = min_samples or cfg["HEDGE_MIN_MUESTRAS"]
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(q * (len(ordered) - 1))]
+
+    def hedge_delay(self):
+        """Retardo antes de enviar el duplicado: p95 observado o el valor por defecto."""
+        if len(self.samples) < self.min_samples:
+            return self.default_delay_s
+        return self.percentile(0.95)
+
+    def stats(self):
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "p50_ms": 1000 * p50 if p50 is not None else None,
+            "p95_ms": 1000 * p95 if p95 is not None else None,
+            "hedge_delay_ms": 1000 * self.hedge_delay(),
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+        }
+
+
+_breaker = None
+_forecast_latency = None
+
+
+def get_breaker():
+    """Cortocircuito compartido para las llamadas a WeatherAPI."""
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker()
+    return _breaker
+
+
+def get_forecast_latency():
+    """Latencias observadas de forecast.json (para el hedging)."""
+    global _forecast_latency
+    if _forecast_latency is None:
+        _forecast_latency = LatencyTracker()
+    return _forecast_latency
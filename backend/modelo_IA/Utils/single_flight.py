@@ -0,0 +1,51 @@
+# single_flight.py - Coalescencia de trabajos idénticos en curso
+"""
+Evita repetir el mismo trabajo asíncrono cuando varias solicitudes
+concurrentes piden exactamente lo mismo: la primera lo ejecuta y las
+demás esperan el mismo resultado (o la misma excepción).
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """
+    Grupo de trabajos en curso indexados por clave.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """
+        Ejecuta `fn(*args, **kwargs)` una sola vez por clave mientras esté en curso.
+
+        El trabajo corre en su propia tarea, de modo que si la solicitud que lo
+        inició se cancela, el resto de solicitudes sigue esperando el resultado.
+
+        Args:
+            key: Clave hashable que identifica el trabajo.
+            fn: Función asíncrona a ejecutar.
+
+        Returns:
+            El resultado de `fn`; si falla, la excepción se propaga a todos.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """Métricas de trabajos ejecutados y solicitudes coalescidas."""
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
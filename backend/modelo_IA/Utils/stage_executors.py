@@ -0,0 +1,187 @@
+# stage_executors.py - Ejecutores por etapa del pipeline de solicitudes
+"""
+El bucle de eventos solo orquesta: todo trabajo que bloquea corre en el
+ejecutor de su etapa, cada uno con su propio tamaño para que una etapa lenta
+no acapare los hilos de las demás.
+
+    io            archivos (almacén de observaciones)
+    cpu           preprocesamiento (JSON -> arreglos, DataFrames, spaCy)
+    inferencia    pasadas del modelo (InferenceBatcher)
+    persistencia  sesión síncrona de SQLAlchemy y reportes Excel
+    llm           Gemini (generate_content)
+
+Cada etapa cuenta tareas enviadas, en cola, en curso y los tiempos de espera
+y ejecución. LoopLagMonitor mide el retraso del bucle de eventos (lo que tarda
+en despertar un sleep respecto a lo pedido).
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from Utils.config import CONFIG
+
+ETAPAS = ("io", "cpu", "inferencia", "persistencia", "llm")
+
+
+class StageExecutor:
+    """
+    Ejecutor de hilos de una etapa con métricas de profundidad de cola.
+    """
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"etapa-{name}")
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.finished = 0
+        self.failed = 0
+        self.running = 0
+        self.max_queued = 0
+        self.wait_s = 0.0
+        self.run_s = 0.0
+
+    @property
+    def queued(self):
+        """Tareas enviadas que todavía esperan un hilo libre."""
+        return self.submitted - self.finished - self.running
+
+    def _call(self, submitted_at, fn, args, kwargs):
+        start = time.perf_counter()
+        with self._lock:
+            self.running += 1
+            self.wait_s += start - submitted_at
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.finished += 1
+                self.failed += not ok
+                self.run_s += time.perf_counter() - start
+
+    async def run(self, fn, *args, **kwargs):
+        """Ejecuta `fn(*args, **kwargs)` en un hilo de la etapa y espera su resultado."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.submitted += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        # Como asyncio.to_thread: el hilo ve las variables de contexto de la solicitud
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, self._call, time.perf_counter(), fn, args, kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "submitted": self.submitted,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "failed": self.failed,
+                "avg_wait_ms": round(1000 * self.wait_s / self.finished, 3) if self.finished else 0.0,
+                "avg_run_ms": round(1000 * self.run_s / self.finished, 3) if self.finished else 0.0,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+class LoopLagMonitor:
+    """
+    Retraso del bucle de eventos: cada `interval_s` se duerme y se mide
+    cuánto de más tardó en despertar (lo que estuvo bloqueado).
+    """
+
+    def __init__(self, interval_s=None, window=1000):
+        self.interval_s = interval_s or CONFIG["ETAPAS"]["INTERVALO_LAG_S"]
+        self.samples = deque(maxlen=window)
+        self.max_lag_s = 0.0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            lag = max(0.0, time.perf_counter() - start - self.interval_s)
+            self.samples.append(lag)
+            self.max_lag_s = max(self.max_lag_s, lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self):
+        lags = np.fromiter(self.samples, dtype=float) * 1000
+        return {
+            "samples": len(lags),
+            "p50_ms": round(float(np.percentile(lags, 50)), 3) if len(lags) else 0.0,
+            "p99_ms": round(float(np.percentile(lags, 99)), 3) if len(lags) else 0.0,
+            "max_ms": round(self.max_lag_s * 1000, 3),
+        }
+
+
+class StagePipeline:
+    """Un StageExecutor por etapa (tamaños en CONFIG['ETAPAS']) y el monitor del bucle."""
+
+    def __init__(self, sizes=None):
+        sizes = sizes or {}
+        cfg = CONFIG["ETAPAS"]
+        self.stages = {
+            name: StageExecutor(name, sizes.get(name, cfg[name.upper()])) for name in ETAPAS
+        }
+        self.lag = LoopLagMonitor()
+
+    async def run(self, stage, fn, *args, **kwargs):
+        return await self.stages[stage].run(fn, *args, **kwargs)
+
+    def stats(self):
+        return {
+            "stages": {name: executor.stats() for name, executor in self.stages.items()},
+            "event_loop_lag": self.lag.stats(),
+        }
+
+    def shutdown(self, wait=True):
+        self.lag.stop()
+        for executor in self.stages.values():
+            executor.shutdown(wait=wait)
+
+
+_stages = None
+
+
+def get_stages():
+    """Instancia compartida de los ejecutores por etapa."""
+    global _stages
+    if _stages is None:
+        _stages = StagePipeline()
+    return _stages
+
+
+async def run_stage(stage, fn, *args, **kwargs):
+    """Ejecuta la función bloqueante `fn` en el ejecutor de `stage`."""
+    return await get_stages().run(stage, fn, *args, **kwargs)
+
+
+def shutdown_stages(wait=True):
+    """Detiene los ejecutores (fin del lifespan); se recrean si se vuelven a pedir."""
+    global _stages
+    if _stages is not None:
+        _stages.shutdown(wait=wait)
+        _stages = None
@@ -0,0 +1,196 @@
+# startup.py - Ciclo de arranque de los componentes pesados
+"""
+Carga de los componentes pesados (modelo, chatbot) fuera del import.
+
+Cada componente se registra con una función de carga síncrona y, opcionalmente,
+un calentamiento asíncrono. En el lifespan de FastAPI se lanzan todos en
+paralelo (cada carga en su propio hilo) y el servidor empieza a aceptar
+conexiones de inmediato: /health/ready responde 503 hasta que los componentes
+críticos terminan, y una solicitud que llega antes espera solo al componente
+que necesita. Un componente que nadie arrancó se carga la primera vez que se
+pide. Una carga que falla se reintenta con espera exponencial: la siguiente
+solicitud la relanza pasada la espera, y los componentes críticos se
+reintentan solos (sin tráfico, /health/ready no volvería a 200).
+
+También se mide el tiempo desde el inicio del proceso hasta la primera
+solicitud exitosa.
+"""
+
+import asyncio
+import gc
+import time
+
+# Importar este módulo lo antes posible: marca el inicio del proceso
+PROCESS_START = time.monotonic()
+
+# Rutas que no cuentan como primera solicitud exitosa
+RUTAS_SALUD = ("/health/", "/docs", "/openapi.json")
+
+
+class StartupLifecycle:
+    """
+    Componentes registrados, su estado de carga y los tiempos de arranque.
+    """
+
+    def __init__(self, retry_s=1.0, max_retry_s=60.0):
+        """
+        Args:
+            retry_s: Espera antes del primer reintento de una carga fallida.
+            max_retry_s: Espera máxima (se duplica en cada fallo seguido).
+        """
+        self.retry_s = retry_s
+        self.max_retry_s = max_retry_s
+        self._loaders = {}  # nombre -> (carga, calentamiento, crítico)
+        self._tasks = {}
+        self._failures = {}  # nombre -> (error, fallos seguidos, reintento desde)
+        self._preloaded = {}
+        self.components = {}
+        self.started_at = None
+        self.ready_at = None
+        self.first_success = None
+
+    def register(self, name, loader, warmup=None, critical=True):
+        """
+        Args:
+            name: Nombre del componente.
+            loader: Función síncrona que construye el componente (corre en un hilo).
+            warmup: Corrutina opcional que recibe el componente ya construido.
+            critical: Si el servicio no está listo hasta que el componente cargue.
+        """
+        self._loaders[name] = (loader, warmup, critical)
+        self.components[name] = {"status": "pending", "critical": critical,
+                                 "load_s": None, "warmup_s": None, "error": None}
+
+    def preload(self, name):
+        """
+        Construye el componente ya, de forma síncrona (proceso maestro de
+        serve.py, antes del fork: los workers lo heredan copy-on-write).
+        """
+        loader = self._loaders[name][0]
+        start = time.perf_counter()
+        self._preloaded[name] = loader()
+        self.components[name]["load_s"] = round(time.perf_counter() - start, 3)
+        self.components[name]["preloaded"] = True
+
+    async def _load(self, name):
+        loader, warmup, _ = self._loaders[name]
+        info = self.components[name]
+        info["status"] = "loading"
+        start = time.perf_counter()
+        try:
+            if name in self._preloaded:
+                component = self._preloaded.pop(name)
+            else:
+                component = await asyncio.to_thread(loader)
+                info["load_s"] = round(time.perf_counter() - start, 3)
+            if warmup is not None:
+                info["status"] = "warming_up"
+                start_warmup = time.perf_counter()
+                await warmup(component)
+                info["warmup_s"] = round(time.perf_counter() - start_warmup, 3)
+        except Exception as e:
+            info["status"] = "error"
+            info["error"] = str(e)
+            self._failed(name, e)
+            raise
+        self._failures.pop(name, None)
+        info["status"] = "ready"
+        info["error"] = None
+        print(f"✅ {name} listo en {time.perf_counter() - start:.2f} s")
+        if self.ready_at is None and self.ready():
+            self.ready_at = time.monotonic()
+            print(f"[INFO] Servicio listo {self.ready_at - PROCESS_START:.2f} s después del inicio del proceso")
+            self.freeze_heap()
+        return component
+
+    @staticmethod
+    def freeze_heap():
+        """
+        Saca del GC lo cargado al arrancar (TensorFlow, pandas, spaCy, ...).
+        Una recolección completa sobre esos cientos de miles de objetos toma
+        más de 100 ms con el GIL tomado, y detiene el bucle de eventos desde
+        cualquier hilo que la dispare. Sin gc.collect() previo: eso mismo sería
+        una pausa de ese tamaño.
+        """
+        gc.freeze()
+
+    def _failed(self, name, error):
+        """
+        Olvida la carga fallida para que se pueda reintentar después de la espera
+        y, si el componente es crítico, programa el reintento.
+        """
+        failures = self._failures.get(name, (None, 0, 0.0))[1] + 1
+        delay = min(self.retry_s * 2 ** (failures - 1), self.max_retry_s)
+        self._failures[name] = (error, failures, time.monotonic() + delay)
+        self._tasks.pop(name, None)
+        print(f"❌ Error al cargar {name} (fallo {failures}, reintento en {delay:.0f} s): {error}")
+        if self._loaders[name][2]:
+            asyncio.get_running_loop().call_later(delay, self._retry, name)
+
+    def _retry(self, name):
+        if name not in self._tasks:
+            self._task(name)
+
+    def _task(self, name):
+        if name not in self._tasks:
+            if name not in self._loaders:
+                raise KeyError(f"Componente no registrado: {name}")
+            error, _, retry_at = self._failures.get(name, (None, 0, 0.0))
+            # Durante la espera se responde con el último error sin volver a cargar
+            if error is not None and time.monotonic() < retry_at:
+                raise error
+            self._tasks[name] = asyncio.ensure_future(self._load(name))
+            # El error queda en el estado; se consume para no dejar la excepción sin recuperar
+            self._tasks[name].add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._tasks[name]
+
+    async def start(self):
+        """Lanza en paralelo la carga de todos los componentes registrados (no espera)."""
+        self.started_at = time.monotonic()
+        for name in self._loaders:
+            self._task(name)
+
+    async def wait(self):
+        """Espera a que terminen todas las cargas lanzadas."""
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def get(self, name):
+        """
+        El componente `name`, esperando su carga (o lanzándola si no empezó).
+        Si la carga falló se relanza el error; pasada la espera de reintento
+        se vuelve a cargar.
+        """
+        return await asyncio.shield(self._task(name))
+
+    def ready(self):
+        """True si todos los componentes críticos están listos."""
+        return all(
+            info["status"] == "ready" for info in self.components.values() if info["critical"]
+        )
+
+    def record_request(self, path, status_code):
+        """Registra la primera respuesta exitosa fuera de las rutas de salud."""
+        if self.first_success is not None or status_code >= 400 or path.startswith(RUTAS_SALUD):
+            return
+        self.first_success = {"path": path, "seconds": round(time.monotonic() - PROCESS_START, 3)}
+        print(f"[INFO] Primera solicitud exitosa ({path}) {self.first_success['seconds']:.2f} s después del inicio")
+
+    def status(self):
+        return {
+            "ready": self.ready(),
+            "uptime_s": round(time.monotonic() - PROCESS_START, 3),
+            "ready_after_s": round(self.ready_at - PROCESS_START, 3) if self.ready_at else None,
+            "components": self.components,
+            "first_success": self.first_success,
+        }
+
+
+_startup = None
+
+
+def get_startup():
+    """Instancia compartida del ciclo de arranque."""
+    global _startup
+    if _startup is None:
+        _startup = StartupLifecycle()
+    return _startup
@@ -0,0 +1,75 @@
+# bench_batch_cities.py - Solicitudes por ciudad en serie vs pronóstico por lote
+"""
+Simula el tablero que consulta varias ciudades: un POST por ciudad en serie
+(como hoy) contra una sola llamada a PredictionController.predict_batch.
+Usa el servidor local de test/weather_stub.py (con latencia simulada) y una
+base SQLite en memoria. La cuota de WeatherAPI (RATE_PER_S) se levanta: ambos
+modos hacen las mismas llamadas y con la cuota real los dos quedan limitados
+por ella; aquí se mide el resto del pipeline.
+
+Uso:
+    python benchmarks/bench_batch_cities.py [ciudades] [latencia_ms]
+"""
+
+import asyncio
+import sys, os
+import tempfile
+import time
+
+os.chdir(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "test"))
+os.environ.setdefault("DB_PORT", "3306")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.tables
+from config.db import Base
+from Etl import observation_store
+from Etl.observation_store import HourlyObservationStore
+from Utils import history_cache
+from Utils.config import CONFIG
+from Utils.history_cache import HistoryCache
+from weather_stub import WeatherStubServer
+
+
+def main(ciudades=50, latencia_ms=20):
+    server = WeatherStubServer(delay=latencia_ms / 1000).start()
+    CONFIG["WEATHER_API"]["BASE_URL"] = server.base_url
+    CONFIG["WEATHER_API"]["RATE_PER_S"] = CONFIG["WEATHER_API"]["BURST"] = 100000
+    history_cache._history_cache = HistoryCache(":memory:")
+    observation_store._observation_store = HourlyObservationStore(tempfile.mkdtemp())
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    from Controllers.prediction_controller import PredictionController
+
+    controller = PredictionController()
+
+    async def en_serie(nombres):
+        for city in nombres:
+            await controller.predict_from_api(city, 3, db, user_id=1)
+
+    # Nombres distintos en cada modo para que ninguno aproveche los cachés del otro
+    start = time.perf_counter()
+    asyncio.run(en_serie([f"serie{i}" for i in range(ciudades)]))
+    t_serie = time.perf_counter() - start
+
+    steps = controller.bundle.horizon.steps
+    start = time.perf_counter()
+    results = asyncio.run(controller.predict_batch([(f"lote{i}", 3) for i in range(ciudades)], db, user_id=1))
+    t_lote = time.perf_counter() - start
+    server.stop()
+
+    errores = sum(1 for r in results if r["error"])
+    print(f"{ciudades} ciudades, 3 días, latencia simulada {latencia_ms} ms, "
+          f"{server.count('.json')} llamadas a la API")
+    print(f"En serie: {t_serie:6.2f} s")
+    print(f"Por lote: {t_lote:6.2f} s -> {t_serie / t_lote:.1f}x "
+          f"({controller.bundle.horizon.steps - steps} pasadas del modelo, {errores} errores)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
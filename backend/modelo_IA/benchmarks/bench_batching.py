@@ -0,0 +1,63 @@
+# bench_batching.py - Inferencia por solicitud vs micro-lotes dinámicos
+"""
+Simula solicitudes concurrentes (cada una con las ventanas de un pronóstico
+de 1 a 7 días) y compara llamar a TimeSeriesModel.predict por solicitud con
+pasar por InferenceBatcher.
+
+Uso:
+    python benchmarks/bench_batching.py [solicitudes]
+"""
+
+import asyncio
+import sys, os
+import time
+
+os.chdir(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+from Controllers.model_build import TimeSeriesModel
+from Etl.preprocessor import FEATURE_COLUMNS
+from Utils.inference_batcher import InferenceBatcher
+
+
+def silent_predict(model):
+    return lambda x: model.model.predict(x, verbose=0)
+
+
+async def por_solicitud(predict, inputs):
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(loop.run_in_executor(None, predict, x) for x in inputs))
+
+
+async def con_batcher(batcher, inputs):
+    return await asyncio.gather(*(batcher.predict(x) for x in inputs))
+
+
+def main(solicitudes=64):
+    model = TimeSeriesModel().load()
+    predict = silent_predict(model)
+    rng = np.random.default_rng(0)
+    # Entre 1 y 8 ventanas de entrada por solicitud
+    inputs = [rng.uniform(-1, 1, size=(int(rng.integers(1, 9)), 24, len(FEATURE_COLUMNS)))
+              for _ in range(solicitudes)]
+    predict(inputs[0])  # calentamiento
+
+    start = time.perf_counter()
+    asyncio.run(por_solicitud(predict, inputs))
+    t_solo = time.perf_counter() - start
+
+    batcher = InferenceBatcher(predict)
+    start = time.perf_counter()
+    asyncio.run(con_batcher(batcher, inputs))
+    t_lote = time.perf_counter() - start
+
+    print(f"{solicitudes} solicitudes concurrentes")
+    print(f"Por solicitud: {t_solo:6.3f} s ({solicitudes / t_solo:7.1f} sol/s)")
+    print(f"Micro-lotes:   {t_lote:6.3f} s ({solicitudes / t_lote:7.1f} sol/s) -> {t_solo / t_lote:.1f}x")
+    print(f"Lotes: {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64)
@@ -0,0 +1,57 @@
+# bench_extraction.py - Extracción de history.json: ruta DataFrame vs arreglos
+"""
+Compara, sobre 7 días de respuestas history.json, la ruta original
+(json + extract_hourly_data + ordenar/deduplicar + Timestamp.timestamp +
+características cíclicas y viento con pandas) con la ruta de arreglos
+(orjson + extract_hourly_arrays + build_features).
+
+Uso:
+    python benchmarks/bench_extraction.py [repeticiones]
+"""
+
+import json
+import sys, os
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../test")))
+
+import pandas as pd
+
+from Controllers.weather_api import extract_hourly_arrays, extract_hourly_data
+from Etl.preprocessor import TimeSeriesPreprocessor
+from Utils.fast_json import loads
+from weather_stub import make_day_payload
+
+
+def ruta_dataframe(raw_days, pre):
+    datos = [json.loads(raw) for raw in raw_days]
+    df = extract_hourly_data(datos).sort_index()
+    df = df[~df.index.duplicated(keep="last")]
+    tiempo_s = df.index.map(pd.Timestamp.timestamp)
+    df = pre.add_cyclical_features(df.copy(), tiempo_s)
+    return pre.process_wind_data(df).to_numpy()
+
+
+def ruta_arreglos(raw_days, pre):
+    datos = [loads(raw) for raw in raw_days]
+    epochs, values = extract_hourly_arrays(datos)
+    return pre.build_features(epochs, values)
+
+
+def main(repeticiones=200):
+    fechas = pd.date_range("2025-03-01", periods=7).strftime("%Y-%m-%d")
+    raw_days = [json.dumps(make_day_payload(f)).encode("utf-8") for f in fechas]
+    pre = TimeSeriesPreprocessor()
+
+    assert ruta_dataframe(raw_days, pre).tobytes() == ruta_arreglos(raw_days, pre).tobytes()
+
+    t_df = min(timeit.repeat(lambda: ruta_dataframe(raw_days, pre), number=repeticiones, repeat=3))
+    t_np = min(timeit.repeat(lambda: ruta_arreglos(raw_days, pre), number=repeticiones, repeat=3))
+    print(f"Ruta DataFrame: {1e3 * t_df / repeticiones:8.3f} ms por solicitud (7 días)")
+    print(f"Ruta arreglos:  {1e3 * t_np / repeticiones:8.3f} ms por solicitud (7 días)")
+    print(f"Aceleración:    {t_df / t_np:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
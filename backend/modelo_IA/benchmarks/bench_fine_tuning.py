@@ -0,0 +1,128 @@
+# bench_fine_tuning.py - Reentrenamiento completo vs ajuste fino con las horas nuevas
+"""
+Llena un almacén de observaciones con varios años horarios de una ciudad y
+dos días nuevos después del cursor de la versión base, y mide tiempo y
+memoria pico (RSS) de:
+
+- completo: exportar todo el historial del almacén, armar las ventanas y
+  entrenar una época sobre ellas (lo que costaría reentrenar desde cero
+  cada día, por época).
+- ajuste fino: FineTuner.run con una época (solo los meses posteriores al
+  cursor, las horas nuevas y su contexto).
+
+Cada modo corre en un proceso nuevo. Uso:
+    python benchmarks/bench_fine_tuning.py [años]
+"""
+
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+
+DIAS_NUEVOS = 2
+
+
+def preparar(tmp, anios):
+    import set_tf_env  # noqa: F401
+    from Controllers.model_build import TimeSeriesModel
+    from Controllers.model_registry import ModelRegistry
+    from Etl.observation_store import HourlyObservationStore
+    from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+    from Utils.config import HORA_S
+
+    n = int(anios * 365.25 * 24)
+    inicio = int(np.datetime64("2015-01-01", "s").astype(np.int64))
+    rng = np.random.default_rng(123)
+    epochs = inicio + np.arange(n + DIAS_NUEVOS * 24, dtype=np.int64) * HORA_S
+    values = np.column_stack([
+        rng.uniform(990, 1030, len(epochs)), rng.uniform(-5, 35, len(epochs)), rng.uniform(-10, 25, len(epochs)),
+        rng.uniform(10, 100, len(epochs)), rng.uniform(0, 40, len(epochs)), rng.uniform(0, 360, len(epochs)),
+    ])
+    HourlyObservationStore(os.path.join(tmp, "observaciones")).write("Bogotá", epochs, values)
+
+    pre = TimeSeriesPreprocessor()
+    features = pre.build_features(epochs, values)
+    pre.partial_fit_scalers(features)
+    pre.partial_fit_target_scaler(features[:, [FEATURE_COLUMNS.index(c) for c in ("temp_c", "humidity")]],
+                                  ["temp_c", "humidity"])
+    pre.save_scalers(os.path.join(tmp, "scalers.pkl"))
+    TimeSeriesModel().build_model((24, len(FEATURE_COLUMNS))).model.save(os.path.join(tmp, "model.keras"))
+    registry = ModelRegistry(os.path.join(tmp, "registry"))
+    registry.set_active(registry.register(
+        os.path.join(tmp, "model.keras"), scaler_pkl=os.path.join(tmp, "scalers.pkl"),
+        metadata={"observaciones_hasta": {"bogota": int(epochs[n - 1])}},
+    ))
+    return n
+
+
+def completo(tmp):
+    from Controllers.model_build import TimeSeriesModel
+    from Controllers.model_registry import ModelRegistry
+    from Etl.dataset import TimeSeriesDataset
+    from Etl.observation_store import HourlyObservationStore
+    from Etl.preprocessor import TimeSeriesPreprocessor
+    from Utils.config import CONFIG
+
+    df = HourlyObservationStore(os.path.join(tmp, "observaciones")).export_training_frame()
+    tiempo_s = df.index.values.astype("datetime64[s]").astype(np.int64)
+    pre = TimeSeriesPreprocessor()
+    df = pre.process_wind_data(pre.add_cyclical_features(df, tiempo_s)).reset_index(drop=True)
+    windows = TimeSeriesDataset().prepare_windows(df, target_col=CONFIG["TARGET_COL"])
+    registry = ModelRegistry(os.path.join(tmp, "registry"))
+    path = registry.version_dir(registry.active_version())
+    pre.load_scalers(os.path.join(path, "scalers.pkl"))
+    model = TimeSeriesModel().resume(os.path.join(path, "model.keras"))
+    model.train_windows(windows["train"], windows["val"], epochs=1, scaler=pre, callbacks=[], verbose=0)
+
+
+def ajuste_fino(tmp):
+    from Controllers.fine_tuning import FineTuner
+    from Controllers.model_registry import ModelRegistry
+    from Etl.observation_store import HourlyObservationStore
+    from Utils.config import CONFIG
+
+    CONFIG["AJUSTE_FINO"]["EPOCAS"] = 1
+    FineTuner(ModelRegistry(os.path.join(tmp, "registry")),
+              HourlyObservationStore(os.path.join(tmp, "observaciones"))).run()
+
+
+def medir(modo, tmp, results):
+    import set_tf_env  # noqa: F401
+    import tensorflow  # noqa: F401  (la importación no cuenta en la medición)
+
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    inicio = time.perf_counter()
+    globals()[modo](tmp)
+    segundos = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((modo, segundos, base, pico))
+
+
+def main(anios=3):
+    tmp = tempfile.mkdtemp()
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(1) as pool:
+            filas = pool.apply(preparar, (tmp, anios))
+        print(f"{anios} años horarios ({filas} horas) y {DIAS_NUEVOS} días nuevos")
+
+        results = ctx.Queue()
+        for modo in ("completo", "ajuste_fino"):
+            p = ctx.Process(target=medir, args=(modo, tmp, results))
+            p.start()
+            nombre, segundos, base, pico = results.get()
+            p.join()
+            print(f"  {nombre:12s} tiempo {segundos:6.2f} s   RSS pico {pico:7.1f} MB (+{pico - base:6.1f} MB)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(*(float(a) for a in sys.argv[1:2]))
@@ -0,0 +1,112 @@
+# bench_ingest.py - Carga de datos de entrenamiento: read_csv completo vs almacén columnar
+"""
+Genera un CSV sintético de varias ciudades y años horarios y mide tiempo y
+memoria pico (RSS) de tres formas de llegar a la matriz de características:
+
+- pandas: la ruta original (read_csv entero con fechas como texto,
+  add_cyclical_features, process_wind_data, reset_index y drop).
+- ingesta: la conversión única CSV -> Parquet por ciudad y las
+  características por bloques en memmaps (Etl/training_store.py).
+  Las páginas de los memmaps son de archivo (el sistema las libera si falta
+  memoria), pero cuentan en el RSS mientras siguen mapeadas.
+- almacén: las entradas siguientes, con el almacén ya creado: se abren los
+  memmaps y se recorren por bloques (lo que hace el entrenamiento).
+
+Cada modo corre en un proceso nuevo. Uso:
+    python benchmarks/bench_ingest.py [ciudades] [años]
+"""
+
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pandas as pd
+
+
+def generar_csv(path, ciudades, anios):
+    n = int(anios * 365.25 * 24)
+    rng = np.random.default_rng(123)
+    for i in range(ciudades):
+        df = pd.DataFrame({
+            "datetime": pd.date_range("2015-01-01", periods=n, freq="h").strftime("%Y-%m-%d %H:%M"),
+            "pressure_mb": rng.uniform(990, 1030, n).round(1),
+            "temp_c": rng.uniform(-5, 35, n).round(1),
+            "dewpoint_c": rng.uniform(-10, 25, n).round(1),
+            "humidity": rng.integers(10, 100, n),
+            "wind_kph": rng.uniform(0, 40, n).round(1),
+            "wind_degree": rng.integers(0, 360, n),
+            "city": f"ciudad {i}",
+        })
+        df.to_csv(path, mode="a", header=i == 0, index=False)
+    return ciudades * n
+
+
+def pandas_completo(csv_path, root):
+    from Etl.preprocessor import TimeSeriesPreprocessor
+
+    df = pd.read_csv(csv_path, index_col="datetime", parse_dates=["datetime"])
+    tiempo_s = df.index.map(pd.Timestamp.timestamp)
+    pre = TimeSeriesPreprocessor()
+    df = pre.add_cyclical_features(df, tiempo_s)
+    df = pre.process_wind_data(df)
+    df = df.reset_index()
+    df = df.drop(columns=["datetime", "city"])
+    return float(df.to_numpy().sum())
+
+
+def ingesta(csv_path, root):
+    from Etl.training_store import TrainingDataStore
+
+    store = TrainingDataStore(root)
+    return sum(len(store.features(serie)) for serie in store.ingest_csv(csv_path))
+
+
+def almacen(csv_path, root):
+    from Etl.training_store import TrainingDataStore
+
+    store = TrainingDataStore(root)
+    total = 0.0
+    for serie in store.series():
+        features = store.features(serie)
+        for start in range(0, len(features), store.batch_rows):
+            total += float(features[start:start + store.batch_rows].sum())
+    return total
+
+
+def medir(modo, csv_path, root, results):
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    inicio = time.perf_counter()
+    globals()[modo](csv_path, root)
+    segundos = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((modo, segundos, base, pico))
+
+
+def main(ciudades=4, anios=10):
+    tmp = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(tmp, "datos.csv")
+        filas = generar_csv(csv_path, ciudades, anios)
+        print(f"{ciudades} ciudades x {anios} años: {filas} filas, CSV de {os.path.getsize(csv_path) / 2**20:.0f} MB")
+
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        for modo in ("pandas_completo", "ingesta", "almacen"):
+            p = ctx.Process(target=medir, args=(modo, csv_path, os.path.join(tmp, "store"), results))
+            p.start()
+            nombre, segundos, base, pico = results.get()
+            p.join()
+            print(f"  {nombre:16s} tiempo {segundos:6.2f} s   RSS pico {pico:7.1f} MB (+{pico - base:6.1f} MB)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,76 @@
+# bench_scaler_fit.py - Ajuste de escaladores: por columna sobre ventanas vs partial_fit por bloques
+"""
+Mide tiempo y memoria asignada de más (pico de tracemalloc) solo del ajuste
+de los escaladores de entrenamiento, sobre una serie horaria sintética:
+
+- original: un MinMaxScaler.fit por columna sobre las ventanas de
+  entrenamiento ya copiadas (cada fila base se recorre unas INPUT_LENGTH
+  veces y las ventanas tienen que existir en memoria).
+- fit vectorizado: fit_scalers sobre las mismas ventanas, con un solo
+  mínimo/máximo por todas las columnas.
+- partial_fit: partial_fit_scalers / partial_fit_target_scaler por bloques
+  de la serie base (lo que hace TrainOrLoadModel); no necesita las ventanas.
+
+Uso:
+    python benchmarks/bench_scaler_fit.py [años]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from Etl.dataset import TimeSeriesDataset
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Utils.config import CONFIG
+
+TARGETS = ["temp_c", "humidity"]
+
+
+def original(x, y, train):
+    columnas = list(range(4)) + list(range(8, x.shape[2]))
+    for i in columnas:
+        MinMaxScaler(feature_range=(-1, 1)).fit(x[:, :, i].reshape(-1, 1))
+    for i in range(y.shape[2]):
+        MinMaxScaler(feature_range=(-1, 1)).fit(y[:, :, i].reshape(-1, 1))
+
+
+def vectorizado(x, y, train):
+    TimeSeriesPreprocessor().fit_scalers(x).fit_target_scaler(y, TARGETS)
+
+
+def partial_fit(x, y, train):
+    pre = TimeSeriesPreprocessor()
+    rows = CONFIG["DATOS_COLUMNARES"]["FILAS_POR_LOTE"]
+    for chunk in train.input_chunks(rows):
+        pre.partial_fit_scalers(chunk)
+    for chunk in train.target_chunks(rows):
+        pre.partial_fit_target_scaler(chunk, TARGETS)
+
+
+def main(anios=10):
+    n = int(anios * 365.25 * 24)
+    rng = np.random.default_rng(123)
+    df = pd.DataFrame(rng.normal(size=(n, len(FEATURE_COLUMNS))) * 10, columns=FEATURE_COLUMNS)
+    train = TimeSeriesDataset().prepare_windows(df, target_col=TARGETS)["train"]
+    x, y = np.ascontiguousarray(train.x), np.ascontiguousarray(train.y)
+    print(f"{anios} años: {len(train)} ventanas de entrenamiento ({x.nbytes / 2**20:.0f} MB copiadas)")
+
+    for modo in (original, vectorizado, partial_fit):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        modo(x, y, train)
+        segundos = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {modo.__name__:12s} tiempo {segundos * 1000:8.1f} ms   memoria asignada pico {pico / 2**20:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main(*(float(a) for a in sys.argv[1:2]))
@@ -0,0 +1,74 @@
+# bench_scaling.py - Escalado: MinMaxScaler por columna vs vectores compilados
+"""
+Compara el escalado original (un MinMaxScaler.transform / inverse_transform
+por columna sobre copias reformadas) con CompiledScaler (una multiplicación
+y suma por difusión), para lotes del tamaño que usa predict_from_api.
+Incluye el costo de cargar scalers.pkl frente a scalers.npz.
+
+Uso:
+    python benchmarks/bench_scaling.py [repeticiones]
+"""
+
+import sys, os
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Etl.scaling import CompiledScaler, load_compiled_scaler
+
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data_train"))
+PKL = os.path.join(BASE, "scalers.pkl")
+NPZ = os.path.join(BASE, "scalers.npz")
+TARGETS = ["temp_c", "humidity"]
+
+
+def escalado_sklearn(pre, x, y):
+    scaled = np.zeros_like(x)
+    for i in pre.features_to_scale:
+        flat = pre.feature_scalers[i].transform(x[:, :, i].reshape(-1, 1))
+        scaled[:, :, i] = flat.reshape(x.shape[0], -1)
+    for i in pre.temporal_features:
+        scaled[:, :, i] = x[:, :, i]
+    original = np.zeros_like(y)
+    for i, name in enumerate(TARGETS):
+        flat = pre.target_scalers[name].inverse_transform(y[:, :, i].reshape(-1, 1))
+        original[:, :, i] = flat.reshape(y.shape[0], -1)
+    return scaled, original
+
+
+def escalado_compilado(scaler, x, y):
+    return (
+        scaler.scale_features(x, inplace=True),
+        scaler.inverse_scale_target(y, TARGETS, inplace=True),
+    )
+
+
+def main(repeticiones=500):
+    pre = TimeSeriesPreprocessor().load_scalers(PKL)
+    scaler = load_compiled_scaler(NPZ, PKL)
+    rng = np.random.default_rng(0)
+
+    for n in (1, 8, 64):
+        x = rng.normal(size=(n, 24, len(FEATURE_COLUMNS)))
+        y = rng.uniform(-1, 1, size=(n, 24, 2)).astype(np.float32)
+        ref = escalado_sklearn(pre, x, y)
+        res = escalado_compilado(scaler, x.copy(), y.copy())
+        assert all(a.tobytes() == b.tobytes() for a, b in zip(ref, res))
+
+        t_sk = min(timeit.repeat(lambda: escalado_sklearn(pre, x, y), number=repeticiones, repeat=3))
+        # Se copia la entrada para medir también la asignación que ahorra el modo in situ
+        t_np = min(timeit.repeat(lambda: escalado_compilado(scaler, x.copy(), y.copy()),
+                                 number=repeticiones, repeat=3))
+        print(f"{n:3d} secuencias: sklearn {1e6 * t_sk / repeticiones:9.1f} µs | "
+              f"compilado {1e6 * t_np / repeticiones:7.1f} µs | {t_sk / t_np:6.1f}x")
+
+    t_pkl = min(timeit.repeat(lambda: TimeSeriesPreprocessor().load_scalers(PKL), number=50, repeat=3))
+    t_npz = min(timeit.repeat(lambda: CompiledScaler.load(NPZ), number=50, repeat=3))
+    print(f"Carga: scalers.pkl {1e3 * t_pkl / 50:.2f} ms | scalers.npz {1e3 * t_npz / 50:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
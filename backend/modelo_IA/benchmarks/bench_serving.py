@@ -0,0 +1,52 @@
+# bench_serving.py - Latencia por llamada: keras predict vs tf.function compilado
+"""
+Compara la latencia por llamada de keras.Model.predict con la ruta
+compilada de TimeSeriesModel (firma fija + buckets en potencias de dos),
+con y sin XLA, para los tamaños de lote habituales del servicio.
+
+Uso:
+    python benchmarks/bench_serving.py [repeticiones]
+"""
+
+import sys, os
+import time
+
+os.chdir(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+from Controllers.model_build import TimeSeriesModel
+from Utils.config import CONFIG
+
+LOTES = (1, 3, 8, 24, 64)
+
+
+def latencia_ms(fn, x, repeticiones):
+    fn(x)
+    tiempos = []
+    for _ in range(repeticiones):
+        start = time.perf_counter()
+        fn(x)
+        tiempos.append(time.perf_counter() - start)
+    return 1000 * float(np.median(tiempos))
+
+
+def main(repeticiones=50):
+    CONFIG["INFERENCIA"]["SERVING_COMPILADO"] = False
+    keras_model = TimeSeriesModel().load()
+    compilado = TimeSeriesModel().load().enable_serving(xla=False)
+    xla = TimeSeriesModel().load().enable_serving(xla=True)
+
+    rng = np.random.default_rng(0)
+    print(f"{'lote':>5} | {'keras predict':>13} | {'tf.function':>11} | {'+ XLA':>8}  (mediana, ms)")
+    for n in LOTES:
+        x = rng.uniform(-1, 1, size=(n, 24, 10))
+        t_keras = latencia_ms(lambda v: keras_model.model.predict(v, verbose=0), x, repeticiones)
+        t_fn = latencia_ms(compilado.predict, x, repeticiones)
+        t_xla = latencia_ms(xla.predict, x, repeticiones)
+        print(f"{n:5d} | {t_keras:13.2f} | {t_fn:11.2f} | {t_xla:8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
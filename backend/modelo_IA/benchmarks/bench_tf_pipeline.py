@@ -0,0 +1,110 @@
+# bench_tf_pipeline.py - Entrenamiento: arreglos materializados vs canalización tf.data
+"""
+Entrena el modelo unas épocas sobre una serie horaria sintética de tres
+formas y mide tiempo por época y memoria pico (RSS):
+
+- arreglos: la ruta original (prepare_dataset, escalado de cada conjunto de
+  ventanas y model.fit con los arreglos completos).
+- tf.data: window_dataset sobre las vistas sin escalar, escalado en el grafo,
+  barajado con búfer acotado y prefetch.
+- tf.data + caché: lo mismo con la caché en archivo (la primera época la
+  escribe; las siguientes la leen).
+
+Cada modo corre en un proceso nuevo. Uso:
+    python benchmarks/bench_tf_pipeline.py [años] [épocas]
+"""
+
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+
+TARGETS = ["temp_c", "humidity"]
+BATCH = 256
+
+
+def serie(anios):
+    import pandas as pd
+
+    from Etl.preprocessor import FEATURE_COLUMNS
+
+    n = int(anios * 365.25 * 24)
+    rng = np.random.default_rng(123)
+    return pd.DataFrame(rng.normal(size=(n, len(FEATURE_COLUMNS))) * 10, columns=FEATURE_COLUMNS)
+
+
+def epoch_times():
+    """Callback de Keras que anota la duración de cada época en `callback.times`."""
+    import tensorflow as tf
+
+    inicio = []
+    callback = tf.keras.callbacks.LambdaCallback(
+        on_epoch_begin=lambda epoch, logs: inicio.append(time.perf_counter()),
+        on_epoch_end=lambda epoch, logs: callback.times.append(time.perf_counter() - inicio[-1]),
+    )
+    callback.times = []
+    return callback
+
+
+def medir(modo, anios, epocas, cache_dir, results):
+    import set_tf_env  # noqa: F401
+    from Controllers.model_build import TimeSeriesModel, window_dataset
+    from Etl.dataset import TimeSeriesDataset
+    from Etl.preprocessor import TimeSeriesPreprocessor
+
+    df = serie(anios)
+    dataset = TimeSeriesDataset()
+    model = TimeSeriesModel().build_model((24, df.shape[1]))
+    tiempos = epoch_times()
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    if modo == "arreglos":
+        data = dataset.prepare_dataset(df, target_col=TARGETS)
+        pre = TimeSeriesPreprocessor().fit_scalers(data["x_train"])
+        pre.fit_target_scaler(data["y_train"], TARGETS)
+        model.model.fit(
+            pre.scale_features(data["x_train"]), pre.scale_target(data["y_train"], TARGETS),
+            batch_size=BATCH, epochs=epocas, verbose=0, callbacks=[tiempos],
+            validation_data=(pre.scale_features(data["x_val"]), pre.scale_target(data["y_val"], TARGETS)),
+        )
+    else:
+        windows = dataset.prepare_windows(df, target_col=TARGETS)
+        pre = TimeSeriesPreprocessor().fit_scalers(windows["train"].input_rows()[None])
+        pre.fit_target_scaler(windows["train"].target_rows()[None], TARGETS)
+        cache = os.path.join(cache_dir, modo) if modo == "tfdata_cache" else None
+        model.model.fit(
+            window_dataset(windows["train"], BATCH, pre, shuffle=True, cache=cache and f"{cache}_train"),
+            validation_data=window_dataset(windows["val"], BATCH, pre, cache=cache and f"{cache}_val"),
+            epochs=epocas, verbose=0, callbacks=[tiempos],
+        )
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((modo, tiempos.times, base, pico))
+
+
+def main(anios=3, epocas=3):
+    print(f"Serie sintética de {anios} años horarios, {epocas} épocas, lotes de {BATCH}")
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    cache_dir = tempfile.mkdtemp()
+    try:
+        for modo in ("arreglos", "tfdata", "tfdata_cache"):
+            p = ctx.Process(target=medir, args=(modo, anios, epocas, cache_dir, results))
+            p.start()
+            nombre, tiempos, base, pico = results.get()
+            p.join()
+            epocas_s = " ".join(f"{t:5.1f}" for t in tiempos)
+            print(f"  {nombre:13s} épocas (s): {epocas_s}   RSS pico {pico:7.1f} MB (+{pico - base:6.1f} MB)")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(*(float(a) for a in sys.argv[1:2]), *(int(a) for a in sys.argv[2:3]))
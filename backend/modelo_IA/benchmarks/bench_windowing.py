@@ -0,0 +1,109 @@
+# bench_windowing.py - Ventanas de entrenamiento: bucle con copias vs vistas sin copia
+"""
+Prepara los conjuntos de entrenamiento de una serie horaria sintética de
+varios años de dos formas y mide memoria pico (RSS) y tiempo:
+
+- bucle: la construcción original (una copia por ventana con np.array sobre
+  una lista), escaladores ajustados sobre las ventanas y cada conjunto de
+  ventanas escalado (otra copia).
+- vistas: TimeSeriesDataset.prepare_windows, escaladores ajustados sobre
+  las filas base, la serie base escalada una vez y una época completa de
+  lotes materializados con WindowedSeries.batch (lo que consume model.fit).
+
+Cada modo corre en un proceso nuevo para que el pico de memoria de uno no
+contamine al otro. No se entrena el modelo: solo se mide la preparación.
+
+Uso:
+    python benchmarks/bench_windowing.py [años]
+"""
+
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+
+TARGETS = ["temp_c", "humidity"]
+BATCH = 256
+
+
+def serie(anios):
+    import pandas as pd
+
+    from Etl.preprocessor import FEATURE_COLUMNS
+
+    n = int(anios * 365.25 * 24)
+    rng = np.random.default_rng(123)
+    return pd.DataFrame(rng.normal(size=(n, len(FEATURE_COLUMNS))) * 10, columns=FEATURE_COLUMNS)
+
+
+def bucle(df):
+    from Etl.dataset import TimeSeriesDataset
+    from Etl.preprocessor import TimeSeriesPreprocessor
+
+    dataset = TimeSeriesDataset()
+    target_idxs = dataset._get_target_indices(df, TARGETS)
+    conjuntos = {}
+    for nombre, parte in zip(("train", "val", "test"), dataset.split_data(df)):
+        array = np.asarray(parte)
+        X, y = [], []
+        for i in range(len(parte) - dataset.input_length - dataset.output_length + 1):
+            X.append(array[i:i + dataset.input_length, :])
+            y.append(array[i + dataset.input_length:i + dataset.input_length + dataset.output_length, target_idxs])
+        conjuntos[nombre] = (np.array(X), np.array(y))
+
+    pre = TimeSeriesPreprocessor().fit_scalers(conjuntos["train"][0])
+    pre.fit_target_scaler(conjuntos["train"][1], TARGETS)
+    escalados = {
+        nombre: (pre.scale_features(x), pre.scale_target(y, TARGETS)) for nombre, (x, y) in conjuntos.items()
+    }
+    return len(escalados["train"][0])
+
+
+def vistas(df):
+    from Etl.dataset import TimeSeriesDataset
+    from Etl.preprocessor import TimeSeriesPreprocessor
+
+    windows = TimeSeriesDataset().prepare_windows(df, target_col=TARGETS)
+    pre = TimeSeriesPreprocessor().fit_scalers(windows["train"].input_rows()[None])
+    pre.fit_target_scaler(windows["train"].target_rows()[None], TARGETS)
+    escalados = {nombre: series.scaled(pre, TARGETS) for nombre, series in windows.items()}
+
+    train = escalados["train"]
+    orden = np.random.default_rng(123).permutation(len(train))
+    for inicio in range(0, len(orden), BATCH):
+        train.batch(orden[inicio:inicio + BATCH])
+    return len(train)
+
+
+def medir(modo, anios, results):
+    df = serie(anios)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    inicio = time.perf_counter()
+    ventanas = globals()[modo](df)
+    segundos = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((modo, ventanas, segundos, base, pico))
+
+
+def main(anios=10):
+    print(f"Serie sintética de {anios} años horarios ({int(anios * 365.25 * 24)} filas)")
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    for modo in ("bucle", "vistas"):
+        p = ctx.Process(target=medir, args=(modo, anios, results))
+        p.start()
+        nombre, ventanas, segundos, base, pico = results.get()
+        p.join()
+        print(
+            f"  {nombre:7s} ventanas de entrenamiento {ventanas:7d}   tiempo {segundos:6.2f} s   "
+            f"RSS pico {pico:7.1f} MB (+{pico - base:6.1f} MB sobre la serie cargada)"
+        )
+
+
+if __name__ == "__main__":
+    main(*(float(a) for a in sys.argv[1:2]))
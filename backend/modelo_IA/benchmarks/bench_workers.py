@@ -0,0 +1,120 @@
+# bench_workers.py - Memoria y rendimiento: N procesos con su modelo vs servidor del modelo
+"""
+Compara dos formas de escalar a N workers:
+
+- independiente: cada proceso importa TensorFlow y carga su propio modelo
+  (lo que pasa hoy con `uvicorn --workers N`).
+- servidor: un solo proceso con el modelo (Controllers/model_server.py) y N
+  procesos clientes sin TensorFlow que le envían las ventanas por memoria
+  compartida (como los workers de serve.py).
+
+Reporta RSS y PSS (memoria proporcional: las páginas compartidas se reparten)
+por proceso y el total de ventanas por segundo con los N procesos en paralelo.
+Usa el registro de CONFIG['RUTAS']['REGISTRO_MODELOS'] (se inicializa si está vacío).
+
+Uso:
+    python benchmarks/bench_workers.py [workers] [segundos]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+os.chdir(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+BATCH = 8
+
+
+def memory_mb(pid="self"):
+    """(RSS, PSS) en MB de un proceso."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1]) / 1024
+    return values["Rss:"], values["Pss:"]
+
+
+def _loop(model, barrier, seconds, results):
+    x = np.random.default_rng(os.getpid()).uniform(-1, 1, (BATCH, 24, 10)).astype(np.float32)
+    model.predict(x)
+    barrier.wait()
+    count, end = 0, time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        model.predict(x)
+        count += BATCH
+    results.put((os.getpid(), count / seconds, "tensorflow" in sys.modules))
+    barrier.wait()  # se mide la memoria antes de salir
+
+
+def independiente(barrier, seconds, results):
+    import set_tf_env  # noqa: F401
+    from Controllers.model_build import TimeSeriesModel
+
+    _loop(TimeSeriesModel().load(), barrier, seconds, results)
+
+
+def cliente(address, version, barrier, seconds, results):
+    from Controllers.model_server import RemoteModel
+
+    _loop(RemoteModel(address, version, "float32"), barrier, seconds, results)
+
+
+def medir(target, args, workers, seconds, extra_pids=()):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=target, args=args + (barrier, seconds, results)) for _ in range(workers)]
+    for p in processes:
+        p.start()
+    barrier.wait()  # todos cargados
+    rates = [results.get() for _ in processes]
+    memoria = {p.pid: memory_mb(p.pid) for p in processes}
+    memoria.update({pid: memory_mb(pid) for pid in extra_pids})
+    barrier.wait()
+    for p in processes:
+        p.join()
+    return rates, memoria
+
+
+def reporte(nombre, rates, memoria, extra_pids=()):
+    rss = sum(m[0] for m in memoria.values())
+    pss = sum(m[1] for m in memoria.values())
+    workers = [m for pid, m in memoria.items() if pid not in extra_pids]
+    print(f"\n{nombre}")
+    print(f"  RSS por worker: {np.mean([m[0] for m in workers]):7.1f} MB   PSS por worker: {np.mean([m[1] for m in workers]):7.1f} MB")
+    for pid in extra_pids:
+        print(f"  Servidor del modelo: RSS {memoria[pid][0]:7.1f} MB   PSS {memoria[pid][1]:7.1f} MB")
+    print(f"  Total: RSS {rss:7.1f} MB   PSS {pss:7.1f} MB")
+    print(f"  Rendimiento: {sum(r[1] for r in rates):8.0f} ventanas/s   TensorFlow en workers: {any(r[2] for r in rates)}")
+
+
+def main(workers=4, seconds=5):
+    from Controllers import model_server
+    from Controllers.model_registry import get_model_registry
+
+    version = get_model_registry().bootstrap()
+    print(f"{workers} workers, lotes de {BATCH} ventanas, {seconds} s, versión {version}")
+
+    rates, memoria = medir(independiente, (), workers, seconds)
+    reporte("Independiente (un modelo por proceso)", rates, memoria)
+
+    ctx = multiprocessing.get_context("spawn")
+    address = os.path.join(tempfile.gettempdir(), f"bench-model-{os.getpid()}.sock")
+    ready = ctx.Event()
+    server = ctx.Process(target=model_server.run, args=(address, ready), daemon=True)
+    server.start()
+    ready.wait(300)
+    rates, memoria = medir(cliente, (address, version), workers, seconds, extra_pids=(server.pid,))
+    reporte("Servidor del modelo (memoria compartida)", rates, memoria, extra_pids=(server.pid,))
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -1,9 +1,14 @@
 # main.py
+from Utils.startup import get_startup  # Primero: marca el inicio del proceso
 import set_tf_env
 import asyncio
 import threading
-from fastapi import FastAPI
-from routes import prediction_route
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from routes import admin_route, health_route, prediction_route
+from Controllers.weather_api import close_client
+from Utils.prediction_audit import get_prediction_audit
+from Utils.stage_executors import get_stages, shutdown_stages
 from config.db import engine, Base
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -38,7 +43,23 @@ aplicaciones web, móviles o de escritorio que requieren predicción de variable
 ---
 """
 
-app = FastAPI(title="ClimateViz", description=description, version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Modelo y chatbot se cargan en paralelo en segundo plano; el servidor acepta
+    # conexiones de inmediato y /health/ready indica cuándo está listo
+    await get_startup().start()
+    # Retraso del bucle de eventos (en /admin/metrics/, junto a las colas de cada etapa)
+    get_stages().lag.start()
+    yield
+    # Cerrar el pool de conexiones hacia WeatherAPI
+    await close_client()
+    # Escribir lo que quede en la cola de auditoría
+    await asyncio.to_thread(get_prediction_audit().close)
+    shutdown_stages(wait=False)
+
+
+app = FastAPI(title="ClimateViz", description=description, version="0.1.0", lifespan=lifespan)
 
 origins = ['*']
 
@@ -49,8 +70,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+
+@app.middleware("http")
+async def first_success(request: Request, call_next):
+    # Tiempo hasta la primera solicitud exitosa (se reporta en /health/ready)
+    response = await call_next(request)
+    get_startup().record_request(request.url.path, response.status_code)
+    return response
+
+
 # Incluir rutas
 app.include_router(prediction_route.router, tags=["Predictions"])
+app.include_router(admin_route.router, tags=["Admin"])
+app.include_router(health_route.router, tags=["Health"])
 
 
 @app.get("/")
@@ -0,0 +1,77 @@
+# routes/admin_route.py
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from routes.prediction_route import get_controller
+
+router = APIRouter(prefix="/admin")
+
+
+def _check_admin(token: Optional[str]):
+    """Las rutas de administración exigen el token ADMIN_TOKEN del entorno."""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="La administración está deshabilitada (defina ADMIN_TOKEN).")
+    if token != expected:
+        raise HTTPException(status_code=401, detail="Token de administración inválido. 🔐")
+
+
+@router.get(
+    "/models/",
+    summary="Versiones del modelo",
+    description="Lista las versiones del registro, indicando la que está en servicio y la que sigue residente para revertir.",
+    responses={200: {"description": "Versiones registradas"}},
+)
+async def list_models(x_admin_token: Optional[str] = Header(None)):
+    _check_admin(x_admin_token)
+    return (await get_controller()).list_models()
+
+
+@router.post(
+    "/models/{version}/activate",
+    summary="Activar una versión del modelo",
+    description="Carga y calienta la versión en segundo plano y la pone en servicio sin cortar solicitudes en curso.",
+    responses={
+        200: {"description": "Versión activada"},
+        404: {"description": "La versión no existe"},
+        409: {"description": "La versión no se puede servir con la configuración actual"},
+    },
+)
+async def activate_model(version: str, x_admin_token: Optional[str] = Header(None)):
+    _check_admin(x_admin_token)
+    try:
+        return {"active": await (await get_controller()).activate_model(version)}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post(
+    "/models/rollback",
+    summary="Revertir a la versión anterior",
+    description="Vuelve a la versión activa anterior; es inmediato si sigue residente en memoria.",
+    responses={
+        200: {"description": "Versión revertida"},
+        409: {"description": "No hay versión anterior"},
+    },
+)
+async def rollback_model(x_admin_token: Optional[str] = Header(None)):
+    _check_admin(x_admin_token)
+    try:
+        return {"active": await (await get_controller()).rollback_model()}
+    except KeyError as e:
+        raise HTTPException(status_code=409, detail=str(e.args[0]))
+
+
+@router.get(
+    "/metrics/",
+    summary="Métricas internas del servicio",
+    description="Expone contadores del pipeline de predicción (cortocircuito, colas, caché, versiones del modelo, etc.).",
+    responses={200: {"description": "Métricas actuales"}},
+)
+async def metrics(x_admin_token: Optional[str] = Header(None)):
+    _check_admin(x_admin_token)
+    return (await get_controller()).metrics()
@@ -0,0 +1,31 @@
+# routes/health_route.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from Utils.startup import get_startup
+
+router = APIRouter(prefix="/health")
+
+
+@router.get(
+    "/live",
+    summary="Proceso activo",
+    description="Responde mientras el proceso esté vivo, aunque los componentes sigan cargando.",
+    responses={200: {"description": "Proceso activo"}},
+)
+def live():
+    return {"status": "ok"}
+
+
+@router.get(
+    "/ready",
+    summary="Disponibilidad del servicio",
+    description="Estado y tiempos de carga de cada componente, y el tiempo hasta la primera solicitud exitosa. Responde 503 hasta que los componentes críticos estén listos.",
+    responses={
+        200: {"description": "Servicio listo"},
+        503: {"description": "Componentes críticos cargando o con error"},
+    },
+)
+def ready():
+    status = get_startup().status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
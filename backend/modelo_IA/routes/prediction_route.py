@@ -15,13 +15,14 @@ from telegram.ext import (
     CallbackContext,
 )
 
-from Controllers.prediction_controller import PredictionController
 from Controllers.report.export_data import ReportController
 from schemas.chatRequest import ChatRequest
 from schemas.forecastSchema import ForecastSchema
+from schemas.batchForecastSchema import BatchForecastRequest, CityForecastResult
 from config.db import get_db
-from Controllers.chatbot.weather_bot import WeatherBot
 from Controllers.userController import exist_user
+from Utils.stage_executors import run_stage
+from Utils.startup import get_startup
 
 from dotenv import load_dotenv
 
@@ -29,13 +30,36 @@ from dotenv import load_dotenv
 load_dotenv(".env")
 TOKEN = os.getenv("TELEGRAM_TOKEN")
 
+
+def _load_controller():
+    # TensorFlow se importa aquí, en el hilo de carga, y no al importar las rutas
+    from Controllers.prediction_controller import PredictionController
+
+    return PredictionController()
+
+
+def _load_weather_bot():
+    from Controllers.chatbot.weather_bot import WeatherBot
+
+    return WeatherBot()
+
+
+# Componentes pesados: se cargan en paralelo en el lifespan (ver Utils/startup.py)
+startup = get_startup()
+startup.register("prediction_controller", _load_controller, warmup=lambda c: c.warmup())
+# El chatbot no bloquea la disponibilidad de las predicciones
+startup.register("weather_bot", _load_weather_bot, critical=False)
+
 # Instancias globales
-controller = PredictionController()
-weather_bot = WeatherBot()
 router = APIRouter()
 reportController = ReportController()
 
 
+async def get_controller():
+    """PredictionController compartido (espera su carga si aún no terminó)."""
+    return await startup.get("prediction_controller")
+
+
 @router.post(
     "/predict_future_weather/",
     response_model=List[ForecastSchema],
@@ -91,13 +115,14 @@ async def predict(
             status_code=400, detail="Verifica los parámetros de la solicitud."
         )
     
-    if not exist_user(user_id, db):
+    if not await run_stage("persistencia", exist_user, user_id, db):
         raise HTTPException(
             status_code=401,
             detail="Debe estar autenticado para interactuar con el chatbot. Por favor, inicie sesión o regístrese. 🔐"
         )
 
     try:
+        controller = await get_controller()
         forecasts, _ = await controller.predict_from_api(city, days, db, user_id)
 
         return forecasts
@@ -107,6 +132,36 @@ async def predict(
         )
 
 
+@router.post(
+    "/predict_future_weather/batch/",
+    response_model=List[CityForecastResult],
+    summary="Predicción del clima para varias ciudades",
+    description="Predice el clima de varias ciudades en una sola solicitud. Los errores se reportan por ciudad sin afectar a las demás.",
+    responses={
+        200: {"description": "Resultado por ciudad (pronósticos o error)"},
+        401: {"description": "Usuario no autenticado"},
+        422: {"description": "Error en la solicitud. Verifica los parámetros."},
+        500: {"description": "Error interno del servidor"},
+    },
+)
+async def predict_batch(request: BatchForecastRequest, db: Session = Depends(get_db)):
+    if not await run_stage("persistencia", exist_user, request.user_id, db):
+        raise HTTPException(
+            status_code=401,
+            detail="Debe estar autenticado para interactuar con el chatbot. Por favor, inicie sesión o regístrese. 🔐"
+        )
+
+    try:
+        controller = await get_controller()
+        return await controller.predict_batch(
+            [(item.city, item.days) for item in request.items], db, request.user_id
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail="Error interno del servidor: " + str(e)
+        )
+
+
 @router.post(
     "/chat_bot/",
     summary="Interacción con el chatbot de clima",
@@ -127,12 +182,13 @@ async def chat_endpoint(
     
 ):
     try:
-        if not exist_user(user_id, db):
+        if not await run_stage("persistencia", exist_user, user_id, db):
             raise HTTPException(
                 status_code=401,
                 detail="Debe estar autenticado para interactuar con el chatbot. Por favor, inicie sesión o regístrese. 🔐"
             )
         context_id = "global_context"
+        controller, weather_bot = await asyncio.gather(get_controller(), startup.get("weather_bot"))
         result = await weather_bot.process_message(
             context_id, request.message, controller, db, user_id
         )    
@@ -168,4 +224,3 @@ async def chat_endpoint(
 )
 def report_excel(user_id: int, db: Session = Depends(get_db)):
     return reportController.export_data_excel(db, user_id)
-
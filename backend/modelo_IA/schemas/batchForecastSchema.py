@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from schemas.forecastSchema import ForecastSchema
+from Utils.config import CONFIG
+
+
+class CityForecastRequest(BaseModel):
+    city: str = Field(..., min_length=1, pattern=r"^[a-zA-ZáéíóúÁÉÍÓÚüÜñÑ\s]+$")
+    days: int = Field(..., ge=1, le=7)
+
+
+class BatchForecastRequest(BaseModel):
+    items: List[CityForecastRequest] = Field(
+        ..., min_length=1, max_length=CONFIG["LOTE_CIUDADES"]["MAX_CIUDADES"]
+    )
+    user_id: Optional[int] = None
+
+
+class CityForecastResult(BaseModel):
+    city: str
+    days: int
+    forecasts: Optional[List[ForecastSchema]] = None
+    error: Optional[str] = None
@@ -0,0 +1,152 @@
+# serve.py - Servidor de producción con varios workers
+"""
+Modo de producción (en desarrollo se sigue usando `uvicorn main:app --reload`).
+
+1. Inicia el servidor del modelo (Controllers/model_server.py) en un proceso
+   aparte con spawn: es el único que importa TensorFlow y carga el modelo.
+2. El proceso maestro importa la app y precarga el chatbot (spaCy y el
+   matcher de ciudades), congela el GC y hace fork de N workers que comparten
+   esas páginas copy-on-write.
+3. Cada worker corre uvicorn sobre el socket heredado y hace la inferencia
+   en el servidor del modelo (Unix socket + memoria compartida). La cuota de
+   WeatherAPI (RATE_PER_S y BURST) se reparte entre los workers.
+4. El maestro reinicia los workers o el servidor del modelo que terminen y
+   reenvía SIGTERM/SIGINT para un apagado ordenado.
+
+Uso:
+    python serve.py [--workers N] [--host 0.0.0.0] [--port 8000]
+"""
+
+from Utils.startup import get_startup  # Primero: marca el inicio del proceso
+
+import argparse
+import gc
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+from Utils.config import CONFIG
+from Utils.rate_limiter import split_quota
+
+
+def start_model_server(address):
+    from Controllers import model_server
+
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Event()
+    process = ctx.Process(target=model_server.run, args=(address, ready), name="model-server", daemon=True)
+    process.start()
+    if not ready.wait(timeout=300):
+        process.kill()
+        raise RuntimeError("❌ El servidor del modelo no arrancó.")
+    return process
+
+
+def preload(app_startup):
+    """Todo lo que no es TensorFlow se carga una vez aquí y lo heredan los workers."""
+    for name in ("weather_bot",):
+        try:
+            app_startup.preload(name)
+            print(f"✅ {name} precargado en el maestro")
+        except Exception as e:
+            # Cada worker lo intentará de nuevo y reportará el error en /health/ready
+            print(f"⚠️ No se pudo precargar {name}: {e}")
+
+
+def run_worker(sock):
+    import uvicorn
+
+    from config.db import engine
+    from main import app
+
+    # Las conexiones de la BD abiertas por el maestro no se comparten con el hijo
+    engine.dispose(close=False)
+    config = uvicorn.Config(app, lifespan="on", log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def fork_worker(sock):
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        try:
+            run_worker(sock)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClimateViz con varios workers")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", CONFIG["SERVIDOR_MODELO"]["WORKERS"])))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    # Cada worker tiene su propia cubeta de tokens: la cuota del plan se reparte
+    split_quota(args.workers)
+
+    address = os.path.join(tempfile.gettempdir(), f"climateviz-model-{os.getpid()}.sock")
+    CONFIG["SERVIDOR_MODELO"]["SOCKET"] = address
+    model_process = start_model_server(address)
+
+    import main as app_module  # noqa: F401  (rutas y componentes registrados)
+
+    app_startup = get_startup()
+    preload(app_startup)
+    if "tensorflow" in sys.modules:
+        print("⚠️ TensorFlow se importó en el maestro; los workers no deben usarlo")
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # Lo cargado hasta aquí no se vuelve a recorrer en el GC: no se ensucian las páginas compartidas
+    gc.collect()
+    gc.freeze()
+
+    workers = {fork_worker(sock) for _ in range(args.workers)}
+    print(f"🚀 {args.workers} workers en {args.host}:{args.port} (servidor del modelo pid {model_process.pid})")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        if not stopping and not model_process.is_alive():
+            print("⚠️ El servidor del modelo terminó; reiniciando")
+            model_process = start_model_server(address)
+        # waitpid por pid: el proceso del servidor del modelo lo espera multiprocessing
+        for pid in list(workers):
+            if os.waitpid(pid, os.WNOHANG)[0] == 0:
+                continue
+            workers.discard(pid)
+            if not stopping:
+                print(f"⚠️ Worker {pid} terminó; reiniciando")
+                workers.add(fork_worker(sock))
+        time.sleep(0.5)
+
+    model_process.terminate()
+    model_process.join(10)
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import asyncio
+import copy
+import tempfile
+import unittest
+from unittest.mock import patch
+import sys, os
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.dirname(__file__))
+
+os.environ.setdefault("DB_PORT", "3306")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models.tables
+from config.db import Base
+from Controllers import model_registry
+from Controllers.model_registry import ModelRegistry
+from Etl import observation_store
+from Etl.observation_store import HourlyObservationStore
+from Utils import history_cache, prediction_audit, rate_limiter, resilience
+from Utils.config import CONFIG
+from Utils.forecast_cache import current_issue_hour
+from Utils.history_cache import HistoryCache
+from Utils.prediction_audit import PredictionAuditLog, read_audit
+from weather_stub import WeatherStubServer
+
+DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data_train"))
+
+
+class BatchPredictionTest(unittest.TestCase):
+    """Test del pronóstico por lote de varias ciudades"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.server = WeatherStubServer().start()
+        cls.base_url = CONFIG["WEATHER_API"]["BASE_URL"]
+        CONFIG["WEATHER_API"]["BASE_URL"] = cls.server.base_url
+        history_cache._history_cache = HistoryCache(":memory:")
+        observation_store._observation_store = HourlyObservationStore(os.path.join(cls.tmp.name, "obs"))
+        prediction_audit._prediction_audit = PredictionAuditLog(os.path.join(cls.tmp.name, "audit"))
+        rate_limiter._scheduler = None
+        resilience._breaker = None
+        resilience._forecast_latency = None
+
+        registry = ModelRegistry(os.path.join(cls.tmp.name, "registry"))
+        version = registry.register(
+            os.path.join(DATA, "modelo_lstm_mejorado.keras"), scaler_pkl=os.path.join(DATA, "scalers.pkl")
+        )
+        registry.set_active(version)
+        model_registry._model_registry = registry
+
+        from Controllers.prediction_controller import PredictionController
+
+        cls.controller = PredictionController()
+
+    @classmethod
+    def tearDownClass(cls):
+        CONFIG["WEATHER_API"]["BASE_URL"] = cls.base_url
+        history_cache._history_cache = None
+        observation_store._observation_store = None
+        prediction_audit._prediction_audit.close()
+        prediction_audit._prediction_audit = None
+        model_registry._model_registry = None
+        rate_limiter._scheduler = None
+        resilience._breaker = None
+        resilience._forecast_latency = None
+        cls.server.stop()
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        # Una sola conexión compartida: la sesión se usa desde la etapa de persistencia
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.controller.forecast_cache.clear()
+        self.server.fail_cities = set()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_BP_01(self):
+        """BP-01: el lote coincide con las solicitudes individuales y comparte las pasadas del modelo"""
+        items = [("manizales", 3), ("bogota", 1), ("cali", 2)]
+        horizon = self.controller.bundle.horizon
+
+        steps = horizon.steps
+        results = asyncio.run(self.controller.predict_batch(items, self.db, user_id=1))
+        # 3 días = 3 pasadas para todas las ciudades juntas
+        self.assertEqual(horizon.steps - steps, 3)
+        self.assertEqual([r["error"] for r in results], [None, None, None])
+        self.assertEqual([len(r["forecasts"]) for r in results], [3, 1, 2])
+
+        self.controller.forecast_cache.clear()
+        for (city, days), result in zip(items, results):
+            single, _ = asyncio.run(self.controller.predict_from_api(city, days, self.db, user_id=1))
+            batch_hours = [h.temp_pred for f in result["forecasts"] for h in f.hours]
+            single_hours = [h.temp_pred for f in single for h in f.hours]
+            self.assertEqual(len(batch_hours), days * 24)
+            for a, b in zip(batch_hours, single_hours):
+                self.assertAlmostEqual(a, b, places=3)
+
+    def test_BP_02(self):
+        """BP-02: una ciudad que falla se reporta sin afectar al resto del lote"""
+        self.server.fail_cities = {"atlantida"}
+        items = [("manizales", 2), ("atlantida", 2), ("pereira", 5)]
+        results = asyncio.run(self.controller.predict_batch(items, self.db))
+
+        self.assertEqual(len(results[0]["forecasts"]), 2)
+        self.assertIsNone(results[0]["error"])
+        self.assertIsNone(results[1]["forecasts"])
+        self.assertIn("ventana de entrada", results[1]["error"])
+        # Sin usuario solo se permiten 2 días
+        self.assertIn("autenticado", results[2]["error"])
+
+        forecasts = self.db.query(models.tables.Forecast).all()
+        self.assertEqual(sorted({f.city for f in forecasts}), ["manizales"])
+
+        # Las predicciones calculadas quedan en la auditoría con la versión del modelo
+        self.controller.audit.flush()
+        audit = read_audit(self.controller.audit.directory)
+        self.assertNotIn("atlantida", set(audit["city"]))
+        manizales = audit[(audit["city"] == "manizales") & (audit["days"] == 2)]
+        self.assertEqual(len(manizales), 48)
+        self.assertEqual(set(manizales["model_version"]), {self.controller.bundle.version})
+
+    def test_BP_03(self):
+        """BP-03: un pronóstico que termina después de un cambio de versión no queda en la caché"""
+        original = self.controller.bundle
+        rollout = original.horizon.rollout
+
+        async def rollout_con_cambio(*args):
+            result = await rollout(*args)
+            # Otra versión entra en servicio mientras la solicitud sigue en curso
+            self.controller.bundle = copy.copy(original)
+            self.controller.forecast_cache.clear()
+            return result
+
+        try:
+            with patch.object(original.horizon, "rollout", rollout_con_cambio):
+                asyncio.run(self.controller.predict_from_api("manizales", 1, self.db, user_id=1))
+                results = asyncio.run(self.controller.predict_batch([("cali", 1)], self.db, user_id=1))
+        finally:
+            self.controller.bundle = original
+        self.assertIsNone(results[0]["error"])
+        issue_hour = current_issue_hour()
+        self.assertIsNone(self.controller.forecast_cache.get("manizales", 1, issue_hour))
+        self.assertIsNone(self.controller.forecast_cache.get("cali", 1, issue_hour))
+
+        # Sin cambio de versión el pronóstico sí se guarda
+        asyncio.run(self.controller.predict_from_api("manizales", 1, self.db, user_id=1))
+        self.assertIsNotNone(self.controller.forecast_cache.get("manizales", 1, issue_hour))
+
+    def test_BP_04(self):
+        """BP-04: la auditoría de la ruta individual registra el usuario, como la del lote"""
+        asyncio.run(self.controller.predict_from_api("pereira", 1, self.db, user_id=1))
+        asyncio.run(self.controller.predict_from_api("armenia", 1, self.db))
+        self.controller.audit.flush()
+        audit = read_audit(self.controller.audit.directory)
+        self.assertEqual(set(audit[audit["city"] == "pereira"]["user_id"]), {1})
+        self.assertTrue(audit[audit["city"] == "armenia"]["user_id"].isna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
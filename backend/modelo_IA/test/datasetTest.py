@@ -0,0 +1,93 @@
+import unittest
+import sys, os
+
+import numpy as np
+import pandas as pd
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Etl.dataset import TimeSeriesDataset
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+
+TARGETS = ["temp_c", "humidity"]
+
+
+def _frame(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(n, len(FEATURE_COLUMNS))) * 10, columns=FEATURE_COLUMNS)
+
+
+def _loop_sequences(df, target_idxs, input_length=24, output_length=24):
+    """Construcción original: una copia por ventana."""
+    array = np.asarray(df)
+    X, y = [], []
+    for i in range(len(df) - input_length - output_length + 1):
+        X.append(array[i:i + input_length, :])
+        y.append(array[i + input_length:i + input_length + output_length, target_idxs])
+    return np.array(X), np.array(y)
+
+
+class DatasetTest(unittest.TestCase):
+    """Test de las ventanas sin copia de TimeSeriesDataset"""
+
+    def test_DS_01(self):
+        """DS-01: las vistas coinciden bit a bit con el bucle original y no copian la serie"""
+        df = _frame(500)
+        dataset = TimeSeriesDataset()
+        target_idxs = [df.columns.get_loc(c) for c in TARGETS]
+        x_loop, y_loop = _loop_sequences(df, target_idxs)
+
+        array = df.to_numpy()
+        x_view, y_view = dataset.create_sequences(array, target_col=target_idxs, copy=False)
+        np.testing.assert_array_equal(x_view, x_loop)
+        np.testing.assert_array_equal(y_view, y_loop)
+        self.assertTrue(np.shares_memory(x_view, array))
+
+        x_copy, y_copy = dataset.create_sequences(df, target_col=TARGETS)
+        np.testing.assert_array_equal(x_copy, x_loop)
+        np.testing.assert_array_equal(y_copy, y_loop)
+        self.assertTrue(x_copy.flags.c_contiguous)
+
+        # Serie más corta que una ventana: conjuntos vacíos con la forma correcta
+        x_vacio, y_vacio = dataset.create_sequences(df.iloc[:30], target_col=TARGETS)
+        self.assertEqual(x_vacio.shape, (0, 24, len(FEATURE_COLUMNS)))
+        self.assertEqual(y_vacio.shape, (0, 24, 2))
+
+        series = dataset.prepare_windows(df, target_col=TARGETS)["train"]
+        indices = np.array([5, 0, 100, 7])
+        x_lote, y_lote = series.batch(indices)
+        np.testing.assert_array_equal(x_lote, series.x[indices])
+        np.testing.assert_array_equal(y_lote, series.y[indices])
+
+    def test_DS_02(self):
+        """DS-02: prepare_windows y el escalado sobre la serie base igualan la ruta original"""
+        df = _frame(1013)
+        dataset = TimeSeriesDataset()
+
+        legacy = dataset.prepare_dataset(df, target_col=TARGETS)
+        windows = dataset.prepare_windows(df, target_col=TARGETS)
+        for name in ("train", "val", "test"):
+            np.testing.assert_array_equal(windows[name].x, legacy[f"x_{name}"])
+            np.testing.assert_array_equal(windows[name].y, legacy[f"y_{name}"])
+
+        # Escaladores ajustados sobre las ventanas (original) vs sobre las filas base
+        pre_loop = TimeSeriesPreprocessor().fit_scalers(legacy["x_train"])
+        pre_loop.fit_target_scaler(legacy["y_train"], TARGETS)
+        pre_base = TimeSeriesPreprocessor().fit_scalers(windows["train"].input_rows()[None])
+        pre_base.fit_target_scaler(windows["train"].target_rows()[None], TARGETS)
+
+        for i in pre_loop.features_to_scale:
+            np.testing.assert_array_equal(pre_base.feature_scalers[i].data_min_, pre_loop.feature_scalers[i].data_min_)
+            np.testing.assert_array_equal(pre_base.feature_scalers[i].data_max_, pre_loop.feature_scalers[i].data_max_)
+        for name in TARGETS:
+            np.testing.assert_array_equal(pre_base.target_scalers[name].scale_, pre_loop.target_scalers[name].scale_)
+
+        for name in ("train", "val", "test"):
+            scaled = windows[name].scaled(pre_base, TARGETS)
+            np.testing.assert_array_equal(scaled.x, pre_loop.scale_features(legacy[f"x_{name}"]))
+            np.testing.assert_array_equal(scaled.y, pre_loop.scale_target(legacy[f"y_{name}"], TARGETS))
+
+
+if __name__ == "__main__":
+    unittest.main()
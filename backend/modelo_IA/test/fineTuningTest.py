@@ -0,0 +1,99 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Controllers.fine_tuning import FineTuner
+from Controllers.model_build import TimeSeriesModel
+from Controllers.model_registry import ModelRegistry
+from Etl.observation_store import HourlyObservationStore
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Utils.config import CONFIG, HORA_S
+
+TARGETS = ["temp_c", "humidity"]
+INICIO = int(np.datetime64("2025-03-01", "s").astype(np.int64))
+
+
+def _observaciones(start, hours, fase):
+    """Ciclo diario suave: el modelo puede aprenderlo en pocas épocas."""
+    epochs = start + np.arange(hours, dtype=np.int64) * HORA_S
+    dia = 2 * np.pi * (epochs % 86400) / 86400 + fase
+    values = np.column_stack([
+        1010 + 5 * np.sin(dia), 15 + 8 * np.sin(dia), 8 + 3 * np.sin(dia),
+        60 + 20 * np.cos(dia), 10 + 5 * np.cos(dia), (180 + 90 * np.sin(dia)) % 360,
+    ])
+    return epochs, values
+
+
+class FineTuningTest(unittest.TestCase):
+    """Test del ajuste fino incremental"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = HourlyObservationStore(os.path.join(self.tmp, "observaciones"))
+        self.registry = ModelRegistry(os.path.join(self.tmp, "registry"))
+
+        pre = TimeSeriesPreprocessor()
+        for city, fase in (("Bogotá", 0.0), ("Lima", 1.0)):
+            epochs, values = _observaciones(INICIO, 10 * 24, fase)
+            self.store.write(city, epochs, values)
+            features = pre.build_features(epochs, values)
+            pre.partial_fit_scalers(features)
+            pre.partial_fit_target_scaler(features[:, [FEATURE_COLUMNS.index(c) for c in TARGETS]], TARGETS)
+        pre.save_scalers(os.path.join(self.tmp, "scalers.pkl"))
+        model = TimeSeriesModel(units=8, learning_rate=1e-3).build_model((24, len(FEATURE_COLUMNS)))
+        model.model.save(os.path.join(self.tmp, "model.keras"))
+
+        # Bogotá ya se aprendió hasta el quinto día; Lima nunca
+        self.cursor = INICIO + (5 * 24 - 1) * HORA_S
+        self.base = self.registry.register(
+            os.path.join(self.tmp, "model.keras"), scaler_pkl=os.path.join(self.tmp, "scalers.pkl"),
+            metadata={"observaciones_hasta": {"bogota": self.cursor}},
+        )
+        self.registry.set_active(self.base)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_FT_01(self):
+        """FT-01: solo se leen las horas posteriores al cursor, se registra si mejora y el cursor avanza"""
+        ajuste = dict(CONFIG["AJUSTE_FINO"], EPOCAS=4, LEARNING_RATE=1e-2, BATCH_SIZE=32)
+        with patch.dict(CONFIG, {"AJUSTE_FINO": ajuste}):
+            tuner = FineTuner(self.registry, self.store)
+            windows, cursor, horas = tuner.new_windows(TimeSeriesPreprocessor(), {"bogota": self.cursor})
+            self.assertEqual(horas, 5 * 24 + 10 * 24 - 24)
+            self.assertEqual(cursor, {"bogota": INICIO + (10 * 24 - 1) * HORA_S, "lima": INICIO + (10 * 24 - 1) * HORA_S})
+            # Bogotá: 96 horas objetivo de entrenamiento y 24 de validación (73 + 1 ventanas);
+            # Lima: 172 y 44 (149 + 21). Ningún objetivo de entrenamiento cae en la validación
+            self.assertEqual((len(windows["train"]), len(windows["val"])), (73 + 149, 1 + 21))
+
+            result = tuner.run()
+            self.assertLess(result["rmse"], result["rmse_base"])
+            version = result["version"]
+            metadata = self.registry.metadata(version)
+            self.assertEqual(metadata["base"], self.base)
+            self.assertEqual(metadata["observaciones_hasta"], cursor)
+            self.assertEqual(self.registry.active_version(), self.base)
+
+            # Sin horas nuevas no hay nada que ajustar
+            self.assertIsNone(tuner.run(version))
+
+            # Dos días nuevos en una ciudad: solo se leen esas horas
+            epochs, values = _observaciones(INICIO + 10 * 24 * HORA_S, 48, 0.0)
+            self.store.write("Bogotá", epochs, values)
+            result = tuner.run(version, activate=True)
+            self.assertEqual(result["horas_nuevas"], 48)
+            if result["version"] is not None:
+                self.assertEqual(self.registry.active_version(), result["version"])
+                self.assertEqual(self.registry.metadata(result["version"])["observaciones_hasta"]["bogota"], int(epochs[-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
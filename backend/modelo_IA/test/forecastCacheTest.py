@@ -0,0 +1,63 @@
+import unittest
+import sys, os
+
+import pandas as pd
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Utils.forecast_cache import ForecastCache
+
+
+def _pred_df(days):
+    hours = days * 24
+    return pd.DataFrame({
+        "datetime": pd.date_range("2025-03-02", periods=hours, freq="h"),
+        "temp_pred": [float(i) for i in range(hours)],
+        "humidity_pred": [50.0] * hours,
+    })
+
+
+class ForecastCacheTest(unittest.TestCase):
+    """Test del caché de pronósticos por ciudad y hora de emisión"""
+
+    def test_FC_01(self):
+        """FC-01: el horizonte más largo sirve a los más cortos, no al revés"""
+        cache = ForecastCache(max_bytes=10**6)
+        cache.put("manizales", 3, _pred_df(3), [{"date": "2025-03-02"}], issue_hour=100)
+        self.assertIsNone(cache.get("manizales", 7, issue_hour=100))
+
+        cache.put("manizales", 7, _pred_df(7), [{"date": "2025-03-02"}], issue_hour=100)
+        cache.put("manizales", 2, _pred_df(2), [], issue_hour=100)  # no reemplaza al de 7 días
+        pred_df, info = cache.get("manizales", 2, issue_hour=100)
+        self.assertEqual(len(pred_df), 48)
+        self.assertEqual(pred_df["temp_pred"].iloc[-1], 47.0)
+        self.assertEqual(info, [{"date": "2025-03-02"}])
+        self.assertEqual(len(cache.get("manizales", 7, issue_hour=100)[0]), 168)
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_FC_02(self):
+        """FC-02: las entradas vencen al cambiar la hora de emisión"""
+        cache = ForecastCache(max_bytes=10**6)
+        cache.put("bogota", 7, _pred_df(7), [], issue_hour=100)
+        self.assertIsNone(cache.get("bogota", 1, issue_hour=101))
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_FC_03(self):
+        """FC-03: se desaloja la ciudad usada menos recientemente al superar el presupuesto"""
+        one = ForecastCache()._size(_pred_df(7), [])
+        cache = ForecastCache(max_bytes=int(one * 2.5))
+        cache.put("a", 7, _pred_df(7), [], issue_hour=1)
+        cache.put("b", 7, _pred_df(7), [], issue_hour=1)
+        cache.get("a", 1, issue_hour=1)
+        cache.put("c", 7, _pred_df(7), [], issue_hour=1)
+        self.assertIsNone(cache.get("b", 1, issue_hour=1))
+        self.assertIsNotNone(cache.get("a", 1, issue_hour=1))
+        self.assertIsNotNone(cache.get("c", 1, issue_hour=1))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
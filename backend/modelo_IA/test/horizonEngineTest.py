@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+import sys, os
+
+import numpy as np
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.dirname(__file__))
+
+from Controllers.horizon_engine import HorizonEngine, dewpoint_magnus
+from Controllers.weather_api import extract_hourly_arrays
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Etl.scaling import CompiledScaler
+from weather_stub import make_day_payload
+
+
+class ConstantModel:
+    """Modelo de prueba: guarda cada entrada y predice 20 °C y 50 % de humedad."""
+
+    def __init__(self):
+        self.inputs = []
+
+    async def predict(self, x):
+        self.inputs.append(x.copy())
+        pred = np.empty((len(x), 24, 2), dtype=np.float32)
+        pred[:, :, 0] = 20.0
+        pred[:, :, 1] = 50.0
+        return pred
+
+
+class HorizonEngineTest(unittest.TestCase):
+    """Test del despliegue autorregresivo sobre la última ventana"""
+
+    def setUp(self):
+        n = len(FEATURE_COLUMNS)
+        identity = CompiledScaler(np.ones(n), np.full(n, -0.0), np.ones(2), np.zeros(2),
+                                  ["temp_c", "humidity"])
+        self.model = ConstantModel()
+        self.pre = TimeSeriesPreprocessor()
+        self.engine = HorizonEngine(self.model.predict, identity, self.pre)
+        epochs, values = extract_hourly_arrays([make_day_payload("2025-03-01")])
+        self.epochs = np.stack([epochs, epochs])
+        self.values = np.stack([values, values + 1])
+
+    def test_HZ_01(self):
+        """HZ-01: el trabajo crece con el horizonte y todas las series comparten cada pasada"""
+        pred = asyncio.run(self.engine.rollout(self.epochs, self.values, 60))
+        self.assertEqual(pred.shape, (2, 60, 2))
+        self.assertEqual(len(self.model.inputs), 3)
+        self.assertTrue(all(x.shape == (2, 24, len(FEATURE_COLUMNS)) for x in self.model.inputs))
+        np.testing.assert_array_equal(pred[:, :, 0], 20.0)
+
+    def test_HZ_02(self):
+        """HZ-02: la ventana siguiente usa las predicciones, Magnus y la persistencia diurna"""
+        asyncio.run(self.engine.rollout(self.epochs, self.values, 48))
+        second = self.model.inputs[1][1]
+        expected = self.pre.build_features(self.epochs[1] + 86400, self.values[1])
+        expected[:, 1] = 20.0
+        expected[:, 3] = 50.0
+        expected[:, 2] = dewpoint_magnus(20.0, 50.0)
+        np.testing.assert_array_equal(second, expected)
+        self.assertAlmostEqual(float(dewpoint_magnus(20.0, 50.0)), 9.26, places=2)
+
+    def test_HZ_03(self):
+        """HZ-03: una ventana incompleta se rechaza"""
+        with self.assertRaises(ValueError):
+            asyncio.run(self.engine.rollout(self.epochs[:, 1:], self.values[:, 1:], 24))
+
+
+if __name__ == "__main__":
+    unittest.main()
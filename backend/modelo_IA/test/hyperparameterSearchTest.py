@@ -0,0 +1,128 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Controllers.hyperparameter_search import (
+    HyperparameterSearch,
+    TrialDatabase,
+    promote,
+    rung_budgets,
+    sample_configs,
+)
+from Controllers.model_registry import ModelRegistry
+from Etl.training_store import TrainingDataStore
+from Utils.config import CONFIG
+
+
+def _csv(path, n=1200):
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        "datetime": pd.date_range("2022-01-01", periods=n, freq="h"),
+        "pressure_mb": rng.uniform(990, 1030, n).round(1),
+        "temp_c": rng.uniform(-5, 35, n).round(1),
+        "dewpoint_c": rng.uniform(-10, 25, n).round(1),
+        "humidity": rng.integers(10, 100, n).astype(float),
+        "wind_kph": rng.uniform(0, 40, n).round(1),
+        "wind_degree": rng.integers(0, 360, n).astype(float),
+    })
+    df.to_csv(path, index=False)
+
+
+class HyperparameterSearchTest(unittest.TestCase):
+    """Test de la búsqueda de hiperparámetros"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_HP_01(self):
+        """HP-01: configuraciones distintas, peldaños del halving, promoción del mejor 1/eta y base de ensayos"""
+        space = {"LSTM_UNITS": [8, 16], "LEARNING_RATE": [1e-3], "BATCH_SIZE": [32, 64]}
+        configs = sample_configs(10, space, seed=1)
+        self.assertEqual(len(configs), 4)
+        self.assertEqual(len({tuple(c.values()) for c in configs}), 4)
+        self.assertEqual(sample_configs(3, space, seed=1), configs[:3])
+
+        self.assertEqual(rung_budgets(2, 3, 18), [2, 6, 18])
+        self.assertEqual(rung_budgets(2, 3, 10), [2, 6, 10])
+        self.assertEqual(rung_budgets(5, 3, 5), [5])
+        self.assertEqual(promote({1: 0.5, 2: 0.1, 3: 0.3, 4: 0.2, 5: 0.9, 6: 0.4}, 3), [2, 4])
+        self.assertEqual(promote({7: 0.5}, 3), [7])
+        self.assertEqual(promote({}, 3), [])
+
+        db = TrialDatabase(os.path.join(self.tmp, "ensayos.sqlite"))
+        a = db.create("e1", configs[0])
+        b = db.create("e1", configs[1])
+        db.create("e2", configs[2])
+        db.record_rung(a, 0, 2, 0.4, False, 1.0)
+        db.update(a, estado="podado", epocas=2, val_loss=0.4)
+        db.update(b, estado="completo", epocas=6, val_loss=0.2)
+        self.assertEqual([t["id"] for t in db.trials("e1")], [a, b])
+        self.assertEqual(db.best("e1")["params"], configs[1])
+        self.assertIsNone(db.best("e2"))
+        self.assertEqual(db.rungs(a)[0]["val_loss"], 0.4)
+
+        # Con una secuencia solo cuentan los ensayos con esas longitudes
+        largo = db.create("e3", {"INPUT_LENGTH": 48, "OUTPUT_LENGTH": 24})
+        corto = db.create("e3", {"INPUT_LENGTH": 24, "OUTPUT_LENGTH": 24})
+        db.update(largo, estado="completo", epocas=2, val_loss=0.1)
+        db.update(corto, estado="completo", epocas=2, val_loss=0.3)
+        self.assertEqual(db.best("e3")["id"], largo)
+        self.assertEqual(db.best("e3", {"INPUT_LENGTH": 24, "OUTPUT_LENGTH": 24})["id"], corto)
+        self.assertIsNone(db.best("e3", {"INPUT_LENGTH": 72, "OUTPUT_LENGTH": 24}))
+        db.close()
+
+    def test_HP_02(self):
+        """HP-02: búsqueda en un pool de procesos sobre memmaps compartidos y exportación al registro"""
+        csv_path = os.path.join(self.tmp, "datos.csv")
+        _csv(csv_path)
+        store = TrainingDataStore(os.path.join(self.tmp, "store"))
+        space = {
+            "LSTM_UNITS": [4, 8, 16],
+            "LEARNING_RATE": [1e-3],
+            "BATCH_SIZE": [64],
+            "INPUT_LENGTH": [24],
+            "OUTPUT_LENGTH": [24],
+        }
+        busqueda = dict(CONFIG["BUSQUEDA"], EPOCAS_MIN=1, ETA=3, EPOCAS_MAX=2, PACIENCIA=1)
+        rutas = dict(CONFIG["RUTAS"], DATOS=csv_path)
+        with patch.dict(CONFIG, {"BUSQUEDA": busqueda, "RUTAS": rutas}):
+            search = HyperparameterSearch(n_trials=3, workers=1, estudio="prueba",
+                                          root=os.path.join(self.tmp, "busqueda"), store=store, space=space)
+            best = search.run()
+
+            trials = search.db.trials("prueba")
+            self.assertEqual(len(trials), 3)
+            self.assertEqual(sum(t["estado"] == "podado" for t in trials), 2)
+            self.assertTrue(all(t["val_loss"] is not None for t in trials))
+            self.assertEqual(best["val_loss"], min(t["val_loss"] for t in trials))
+            self.assertEqual(best["epocas"], 2)
+            self.assertEqual(len(search.db.rungs(best["id"])), 2)
+
+            registry = ModelRegistry(os.path.join(self.tmp, "registry"))
+            # Con otra secuencia de servicio ningún ensayo se podría servir: no se exporta
+            with patch.dict(CONFIG, {"SECUENCIA": {"INPUT_LENGTH": 48, "OUTPUT_LENGTH": 24}}):
+                self.assertIsNone(search.export(registry))
+            self.assertEqual(registry.versions(), [])
+            version = search.export(registry)
+            metadata = registry.metadata(version)
+            self.assertEqual(metadata["source"], "busqueda")
+            self.assertEqual(metadata["params"], best["params"])
+            self.assertIsNone(registry.active_version())
+            for name in ("model.keras", "scalers.pkl", "scalers.npz"):
+                self.assertTrue(os.path.exists(os.path.join(registry.version_dir(version), name)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+import unittest
+import sys, os
+
+import numpy as np
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Utils.inference_batcher import InferenceBatcher
+
+
+class FakeModel:
+    """Modelo de prueba: registra el tamaño de cada lote y suma sobre el eje temporal."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def predict(self, x):
+        with self.lock:
+            self.calls.append(len(x))
+        time.sleep(self.delay)
+        return x.sum(axis=1)
+
+
+class InferenceBatcherTest(unittest.TestCase):
+    """Test de los micro-lotes de inferencia"""
+
+    def test_IB_01(self):
+        """IB-01: solicitudes concurrentes comparten una pasada y reciben su porción"""
+        model = FakeModel()
+        batcher = InferenceBatcher(model.predict, max_batch=64, max_wait_ms=50)
+        inputs = [np.full((i + 1, 24, 3), float(i)) for i in range(6)]
+
+        async def run():
+            return await asyncio.gather(*(batcher.predict(x) for x in inputs))
+
+        results = asyncio.run(run())
+        self.assertEqual(model.calls, [21])
+        for x, result in zip(inputs, results):
+            np.testing.assert_array_equal(result, x.sum(axis=1))
+        stats = batcher.stats()
+        self.assertEqual((stats["batches"], stats["requests"]), (1, 6))
+        self.assertEqual(stats["rows_per_batch"], {"32": 1})
+        self.assertEqual(stats["requests_per_batch"], {"8": 1})
+
+    def test_IB_02(self):
+        """IB-02: un lote no supera max_batch ni parte solicitudes"""
+        model = FakeModel(delay=0.02)
+        batcher = InferenceBatcher(model.predict, max_batch=8, max_wait_ms=1000)
+        inputs = [np.ones((3, 24, 3)) * i for i in range(5)] + [np.ones((12, 24, 3))]
+
+        async def run():
+            start = time.monotonic()
+            results = await asyncio.gather(*(batcher.predict(x) for x in inputs))
+            return results, time.monotonic() - start
+
+        results, elapsed = asyncio.run(run())
+        self.assertEqual(model.calls, [6, 6, 3, 12])
+        # Con lotes llenos no se espera max_wait_ms
+        self.assertLess(elapsed, 0.5)
+        for x, result in zip(inputs, results):
+            np.testing.assert_array_equal(result, x.sum(axis=1))
+
+    def test_IB_03(self):
+        """IB-03: un error del modelo llega a todas las solicitudes del lote"""
+        def failing(x):
+            raise RuntimeError("modelo no disponible")
+
+        batcher = InferenceBatcher(failing, max_batch=64, max_wait_ms=10)
+
+        async def run():
+            return await asyncio.gather(
+                *(batcher.predict(np.ones((1, 24, 3))) for _ in range(4)), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(batcher.stats()["batches"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
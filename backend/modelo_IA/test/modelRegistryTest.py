@@ -0,0 +1,80 @@
+import copy
+import tempfile
+import unittest
+import sys, os
+
+import numpy as np
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Controllers.model_registry import ModelBundle, ModelRegistry, check_sequence
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Utils.config import CONFIG
+
+DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data_train"))
+MODEL = os.path.join(DATA, "modelo_lstm_mejorado.keras")
+PKL = os.path.join(DATA, "scalers.pkl")
+
+
+class ModelRegistryTest(unittest.TestCase):
+    """Test del registro de versiones del modelo"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(os.path.join(self.tmp.name, "registry"))
+        self._config = copy.deepcopy(CONFIG)
+
+    def tearDown(self):
+        CONFIG.clear()
+        CONFIG.update(self._config)
+        self.tmp.cleanup()
+
+    def test_MR_01(self):
+        """MR-01: activar y revertir siguen el historial de versiones"""
+        v1 = self.registry.register(MODEL, scaler_pkl=PKL, metadata={"mae": 1.2})
+        v2 = self.registry.register(MODEL, scaler_pkl=PKL)
+        self.assertEqual((v1, v2), ("v1", "v2"))
+        self.assertTrue(os.path.exists(os.path.join(self.registry.version_dir(v2), "scalers.npz")))
+        self.assertIsNone(self.registry.active_version())
+
+        self.registry.set_active(v1)
+        self.registry.set_active(v2)
+        self.assertEqual(self.registry.previous_version(), v1)
+        self.registry.set_active(v1, rollback=True)
+        self.assertEqual(self.registry.active_version(), v1)
+        self.assertIsNone(self.registry.previous_version())
+
+        versions = self.registry.versions()
+        self.assertEqual([m["version"] for m in versions], ["v1", "v2"])
+        self.assertEqual([m["active"] for m in versions], [True, False])
+        self.assertEqual(versions[0]["mae"], 1.2)
+        with self.assertRaises(KeyError):
+            self.registry.set_active("v9")
+
+    def test_MR_02(self):
+        """MR-02: el modelo de CONFIG['RUTAS'] se importa como v1 y se carga listo para servir"""
+        CONFIG["RUTAS"]["MODELO"] = MODEL
+        CONFIG["RUTAS"]["SCALER"] = PKL
+        CONFIG["RUTAS"]["SCALER_NPZ"] = os.path.join(self.tmp.name, "no_existe.npz")
+        self.assertEqual(self.registry.bootstrap(), "v1")
+        self.assertEqual(self.registry.bootstrap(), "v1")
+
+        bundle = ModelBundle.load(self.registry, "v1", TimeSeriesPreprocessor())
+        x = np.zeros((2, 24, len(FEATURE_COLUMNS)), dtype=np.float32)
+        self.assertEqual(bundle.model.predict(x).shape, (2, 24, 2))
+        self.assertEqual(bundle.metadata["source"], "legacy")
+
+    def test_MR_03(self):
+        """MR-03: una versión con otras longitudes de secuencia no se carga para servir"""
+        version = self.registry.register(
+            MODEL, scaler_pkl=PKL, metadata={"secuencia": {"INPUT_LENGTH": 48, "OUTPUT_LENGTH": 24}}
+        )
+        with self.assertRaises(ValueError):
+            ModelBundle.load(self.registry, version, TimeSeriesPreprocessor())
+        CONFIG["SECUENCIA"]["INPUT_LENGTH"] = 48
+        check_sequence(self.registry.metadata(version))
+
+
+if __name__ == "__main__":
+    unittest.main()
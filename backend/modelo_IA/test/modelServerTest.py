@@ -0,0 +1,79 @@
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Controllers.model_registry import ModelRegistry, load_model
+from Controllers.model_server import ModelServer, RemoteModel
+
+DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data_train"))
+MODEL = os.path.join(DATA, "modelo_lstm_mejorado.keras")
+PKL = os.path.join(DATA, "scalers.pkl")
+
+
+class ModelServerTest(unittest.TestCase):
+    """Test del servidor del modelo compartido por los workers"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.registry = ModelRegistry(os.path.join(cls.tmp.name, "registry"))
+        cls.version = cls.registry.register(MODEL, scaler_pkl=PKL)
+        cls.registry.set_active(cls.version)
+        # Fuera de tmp: el Listener borra el socket al terminar el proceso
+        cls.address = os.path.join(tempfile.gettempdir(), f"model-test-{os.getpid()}.sock")
+        cls.server = ModelServer(cls.address, cls.registry)
+        ready = threading.Event()
+        threading.Thread(target=cls.server.serve_forever, args=(ready,), daemon=True).start()
+        ready.wait(10)
+        cls.x = np.random.default_rng(0).uniform(-1, 1, (10, 24, 10)).astype(np.float32)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_SV_01(self):
+        """SV-01: el cliente remoto devuelve lo mismo que el modelo local, también en trozos"""
+        local, variant = load_model(self.registry, self.version, "float32")
+        remote = RemoteModel(self.address, self.version, "float32", max_rows=4)
+        try:
+            out = remote.predict(self.x)
+            self.assertEqual(out.shape, (10, 24, 2))
+            np.testing.assert_allclose(out, local.predict(self.x), rtol=1e-5, atol=1e-6)
+            self.assertEqual(remote.variant, variant)
+            self.assertEqual(remote.predict(self.x[:0]).shape, (0, 24, 2))
+
+            with self.assertRaises(RuntimeError):
+                RemoteModel(self.address, "v9", "float32").predict(self.x[:1])
+        finally:
+            remote.close()
+
+    def test_SV_02(self):
+        """SV-02: un proceso hijo (fork) abre su propia conexión y su bloque compartido"""
+        remote = RemoteModel(self.address, self.version, "float32")
+        expected = remote.predict(self.x)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                out = remote.predict(self.x)
+                os.write(write_fd, pickle.dumps(out))
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as f:
+            child = pickle.loads(f.read())
+        os.waitpid(pid, 0)
+        remote.close()
+        np.testing.assert_allclose(child, expected, rtol=1e-5, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
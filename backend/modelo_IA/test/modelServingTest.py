@@ -0,0 +1,44 @@
+import unittest
+import sys, os
+
+import numpy as np
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Controllers.model_build import TimeSeriesModel
+
+
+class ModelServingTest(unittest.TestCase):
+    """Test de la ruta de inferencia compilada"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = TimeSeriesModel(units=8).build_model(input_shape=(24, 10))
+        cls.x = np.random.default_rng(0).uniform(-1, 1, size=(21, 24, 10))
+        cls.expected = cls.model.model.predict(cls.x, verbose=0)
+        cls.model.enable_serving(max_bucket=8)
+
+    def test_MS_01(self):
+        """MS-01: la ruta compilada coincide con keras predict para cualquier tamaño de lote"""
+        for n in (1, 3, 8, 21):
+            result = self.model.predict(self.x[:n])
+            self.assertEqual(result.shape, (n, 24, 2))
+            np.testing.assert_allclose(result, self.expected[:n], rtol=1e-5, atol=1e-6)
+
+    def test_MS_02(self):
+        """MS-02: tamaños de lote distintos no vuelven a trazar la función"""
+        self.assertEqual(self.model.buckets, [1, 2, 4, 8])
+        for n in (1, 2, 5, 7, 13):
+            self.model.predict(self.x[:n])
+        self.assertEqual(self.model._serve_fn.experimental_get_tracing_count(), 1)
+
+    def test_MS_03(self):
+        """MS-03: un lote vacío devuelve un arreglo vacío sin pasar por la función compilada"""
+        result = self.model.predict(self.x[:0])
+        self.assertEqual(result.shape, (0, 24, 2))
+        self.assertEqual(result.dtype, np.float32)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+import sys, os
+
+import numpy as np
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.dirname(__file__))
+
+from Controllers.weather_api import extract_hourly_data
+from Etl.observation_store import OBS_COLUMNS, HourlyObservationStore
+from weather_stub import make_day_payload
+
+
+class ObservationStoreTest(unittest.TestCase):
+    """Test del almacén columnar de observaciones horarias"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = HourlyObservationStore(self.tmp.name)
+        self.days = ["2025-01-30", "2025-01-31", "2025-02-01"]
+        self.df = extract_hourly_data([make_day_payload(d) for d in self.days])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_OS_01(self):
+        """OS-01: lo escrito se lee igual aunque cruce el cambio de mes"""
+        self.assertEqual(self.store.write_frame("Manizales", self.df), 72)
+        epochs, values = self.store.read_dates("manizales", self.days)
+        np.testing.assert_array_equal(values, self.df[OBS_COLUMNS].to_numpy())
+        np.testing.assert_array_equal(
+            epochs, self.df.index.values.astype("datetime64[s]").astype(np.int64)
+        )
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp.name, "manizales"))),
+                         ["2025-01.npy", "2025-02.npy"])
+
+    def test_OS_02(self):
+        """OS-02: solo se reportan como faltantes los días incompletos"""
+        self.store.write_frame("manizales", self.df.iloc[:40])
+        self.assertEqual(
+            self.store.missing_dates("manizales", self.days + ["2025-02-02"]),
+            ["2025-01-31", "2025-02-01", "2025-02-02"],
+        )
+
+    def test_OS_03(self):
+        """OS-03: una hora ya observada no se reescribe (solo anexar)"""
+        self.store.write_frame("manizales", self.df)
+        modified = self.df.copy()
+        modified["temp_c"] += 10
+        self.assertEqual(self.store.write_frame("manizales", modified), 0)
+        _, values = self.store.read_dates("manizales", self.days)
+        np.testing.assert_array_equal(values[:, 1], self.df["temp_c"].to_numpy())
+
+    def test_OS_04(self):
+        """OS-04: la exportación de entrenamiento omite horas faltantes y separa ciudades"""
+        self.store.write_frame("manizales", self.df)
+        self.store.write_frame("bogota", self.df.iloc[:30])
+        df = self.store.export_training_frame()
+        self.assertEqual(len(df), 102)
+        self.assertEqual(df["city"].value_counts().to_dict(), {"manizales": 72, "bogota": 30})
+        solo = self.store.export_training_frame(["manizales"], since_epoch=int(
+            self.df.index[47].value // 10**9))
+        self.assertEqual(list(solo.columns), OBS_COLUMNS)
+        self.assertEqual(len(solo), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
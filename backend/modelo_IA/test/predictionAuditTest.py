@@ -0,0 +1,94 @@
+import asyncio
+import tempfile
+import unittest
+import sys, os
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Utils.prediction_audit import PredictionAuditLog, read_audit
+
+
+def _frame(hours=24, start="2025-05-01 00:00"):
+    return pd.DataFrame({
+        "datetime": pd.date_range(start, periods=hours, freq="h"),
+        "temp_pred": np.linspace(10, 20, hours),
+        "humidity_pred": np.linspace(60, 90, hours),
+    })
+
+
+class PredictionAuditTest(unittest.TestCase):
+    """Test del registro de auditoría de predicciones"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_PA_01(self):
+        """PA-01: las predicciones encoladas se leen de los segmentos por fecha"""
+        audit = PredictionAuditLog(self.tmp.name, flush_rows=1000, flush_interval_s=60)
+
+        async def run():
+            await audit.log(_frame(24), "manizales", 1, "v1", "float32", user_id=7)
+            await audit.log(_frame(72), "bogota", 3, "v2", "int8")
+
+        asyncio.run(run())
+        self.assertEqual(audit.stats()["written_rows"], 0)  # solo se encoló
+        audit.flush()
+        asyncio.run(run())
+        audit.close()
+
+        df = read_audit(self.tmp.name)
+        self.assertEqual(len(df), 192)
+        self.assertEqual(audit.stats()["segments"], 2)
+        bogota = df[df["city"] == "bogota"]
+        self.assertEqual(set(bogota["model_version"]), {"v2"})
+        self.assertEqual(bogota["lead_hour"].max(), 72)
+        self.assertTrue(bogota["user_id"].isna().all())
+        self.assertEqual(set(df[df["city"] == "manizales"]["user_id"]), {7})
+        np.testing.assert_allclose(
+            bogota["temp_pred"].to_numpy()[:72], _frame(72)["temp_pred"], rtol=1e-6
+        )
+        fecha = pd.Timestamp.now().strftime("%Y-%m-%d")
+        self.assertEqual(os.listdir(self.tmp.name), [f"fecha={fecha}"])
+        self.assertEqual(len(read_audit(self.tmp.name, start="2000-01-01", end="2000-12-31")), 0)
+
+    def test_PA_02(self):
+        """PA-02: con la cola llena las filas se descartan y se cuentan"""
+        audit = PredictionAuditLog(self.tmp.name, max_rows=48, flush_rows=1000, flush_interval_s=60)
+
+        async def run():
+            return [await audit.log(_frame(24), "cali", 1) for _ in range(3)]
+
+        self.assertEqual(asyncio.run(run()), [True, True, False])
+        stats = audit.stats()
+        self.assertEqual((stats["queued_rows"], stats["dropped_rows"]), (48, 24))
+        audit.close()
+        self.assertEqual(len(read_audit(self.tmp.name)), 48)
+
+    def test_PA_03(self):
+        """PA-03: workers con el mismo contador que vacían en el mismo milisegundo no se pisan los segmentos"""
+        for pid in (101, 102):
+            # Cada worker hereda del maestro el contador en cero
+            audit = PredictionAuditLog(self.tmp.name, flush_rows=1000, flush_interval_s=60)
+            asyncio.run(audit.log(_frame(24), f"ciudad-{pid}", 1))
+            records = list(audit._pending)
+            audit._pending.clear()
+            with patch("Utils.prediction_audit.time.time", return_value=1714521600.123), \
+                    patch("Utils.prediction_audit.os.getpid", return_value=pid):
+                audit._write(records)
+            audit.close()
+
+        df = read_audit(self.tmp.name)
+        self.assertEqual(len(df), 48)
+        self.assertEqual(set(df["city"]), {"ciudad-101", "ciudad-102"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import tempfile
+import unittest
+import sys, os
+
+import numpy as np
+import pandas as pd
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.dirname(__file__))
+
+from Controllers.weather_api import extract_hourly_arrays, extract_hourly_data
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Etl.scaling import CompiledScaler, load_compiled_scaler
+from weather_stub import make_day_payload
+
+
+def _payloads(days=7):
+    fechas = pd.date_range("2025-03-01", periods=days).strftime("%Y-%m-%d")
+    # Orden de get_data: la fecha más reciente primero
+    return [make_day_payload(f, base_temp=15 + i) for i, f in enumerate(reversed(fechas))]
+
+
+SCALER_PKL = os.path.join(os.path.dirname(__file__), "../data_train/scalers.pkl")
+
+
+def _sklearn_scale_features(pre, data):
+    """Escalado original: un MinMaxScaler.transform por columna."""
+    scaled = np.zeros_like(data)
+    for i in pre.features_to_scale:
+        flat = pre.feature_scalers[i].transform(data[:, :, i].reshape(-1, 1))
+        scaled[:, :, i] = flat.reshape(data.shape[0], -1)
+    for i in pre.temporal_features:
+        scaled[:, :, i] = data[:, :, i]
+    return scaled
+
+
+def _sklearn_fit(data, columns):
+    """Ajuste original: un MinMaxScaler.fit por columna sobre las ventanas reformadas."""
+    from sklearn.preprocessing import MinMaxScaler
+
+    return {i: MinMaxScaler(feature_range=(-1, 1)).fit(data[:, :, i].reshape(-1, 1)) for i in columns}
+
+
+def _sklearn_inverse_target(pre, data, names):
+    original = np.zeros_like(data)
+    for i, name in enumerate(names):
+        flat = pre.target_scalers[name].inverse_transform(data[:, :, i].reshape(-1, 1))
+        original[:, :, i] = flat.reshape(data.shape[0], -1)
+    return original
+
+
+class PreprocessingTest(unittest.TestCase):
+    """Test de la ruta de preprocesamiento sobre arreglos"""
+
+    def test_PP_01(self):
+        """PP-01: extract_hourly_arrays + build_features coincide bit a bit con la ruta DataFrame"""
+        payloads = _payloads()
+        df = extract_hourly_data(payloads).sort_index()
+        df = df[~df.index.duplicated(keep="last")]
+        tiempo_s = df.index.map(pd.Timestamp.timestamp)
+        pre = TimeSeriesPreprocessor()
+        esperado = pre.process_wind_data(pre.add_cyclical_features(df.copy(), tiempo_s))
+
+        epochs, values = extract_hourly_arrays(payloads)
+        features = pre.build_features(epochs, values)
+
+        self.assertEqual(list(esperado.columns), FEATURE_COLUMNS)
+        np.testing.assert_array_equal(
+            epochs, df.index.values.astype("datetime64[s]").astype(np.int64)
+        )
+        self.assertEqual(features.tobytes(), esperado.to_numpy().tobytes())
+
+    def test_PP_02(self):
+        """PP-02: las horas repetidas se eliminan conservando la última"""
+        payloads = _payloads(2)
+        repetido = make_day_payload(payloads[0]["forecast"]["forecastday"][0]["date"], base_temp=30)
+        epochs, values = extract_hourly_arrays(payloads + [repetido])
+        self.assertEqual(len(epochs), 48)
+        self.assertTrue(np.all(np.diff(epochs) == 3600))
+        self.assertEqual(values[-24, 1], 30.0)
+
+    def test_PP_03(self):
+        """PP-03: el escalado compilado coincide bit a bit con los MinMaxScaler del pickle"""
+        pre = TimeSeriesPreprocessor().load_scalers(SCALER_PKL)
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=(5, 24, len(FEATURE_COLUMNS))) * 50
+        x[0, 0, 4] = -0.0  # la identidad de las columnas cíclicas conserva el signo del cero
+        y = rng.uniform(-1, 1, size=(5, 24, 2)).astype(np.float32)
+        names = ["temp_c", "humidity"]
+
+        esperado = _sklearn_scale_features(pre, x)
+        self.assertEqual(pre.scale_features(x).tobytes(), esperado.tobytes())
+        self.assertEqual(
+            pre.compiled_scaler().scale_features(x.copy(), inplace=True).tobytes(),
+            esperado.tobytes(),
+        )
+        self.assertTrue(np.signbit(pre.scale_features(x)[0, 0, 4]))
+
+        inverso = pre.inverse_scale_target(y, names)
+        self.assertEqual(inverso.dtype, np.float32)
+        self.assertEqual(inverso.tobytes(), _sklearn_inverse_target(pre, y, names).tobytes())
+        invertido = pre.inverse_scale_target(y[:, :, ::-1], names[::-1])
+        self.assertEqual(invertido.tobytes(), inverso[:, :, ::-1].tobytes())
+
+    def test_PP_04(self):
+        """PP-04: el .npz se genera desde el pickle una vez y se recarga igual"""
+        with tempfile.TemporaryDirectory() as tmp:
+            npz = os.path.join(tmp, "scalers.npz")
+            generado = load_compiled_scaler(npz, SCALER_PKL)
+            self.assertTrue(os.path.exists(npz))
+            cargado = load_compiled_scaler(npz, SCALER_PKL)
+            for attr in ("feature_scale", "feature_offset", "target_scale", "target_offset"):
+                self.assertEqual(getattr(cargado, attr).tobytes(), getattr(generado, attr).tobytes())
+            self.assertEqual(cargado.target_names, ["temp_c", "humidity"])
+            self.assertIsInstance(cargado, CompiledScaler)
+
+    def test_PP_05(self):
+        """PP-05: partial_fit por bloques de la serie base da los mismos parámetros que fit sobre las ventanas"""
+        from Etl.dataset import TimeSeriesDataset
+
+        rng = np.random.default_rng(5)
+        df = pd.DataFrame(rng.normal(size=(3000, len(FEATURE_COLUMNS))) * 12, columns=FEATURE_COLUMNS)
+        df.iloc[40, 2] = np.nan
+        train = TimeSeriesDataset().prepare_windows(df, target_col=["temp_c", "humidity"])["train"]
+        x, y = np.ascontiguousarray(train.x), np.ascontiguousarray(train.y)
+
+        esperado = TimeSeriesPreprocessor().fit_scalers(x)
+        vistas = TimeSeriesPreprocessor().fit_scalers(train.x)  # ventanas sin copiar
+        esperado_y = _sklearn_fit(y, range(2))
+        pre = TimeSeriesPreprocessor()
+        for chunk in train.input_chunks(250):
+            pre.partial_fit_scalers(chunk)
+        for chunk in train.target_chunks(250):
+            pre.partial_fit_target_scaler(chunk, ["temp_c", "humidity"])
+
+        atributos = ("data_min_", "data_max_", "data_range_", "scale_", "min_")
+        originales = _sklearn_fit(x, esperado.features_to_scale)
+        for i in esperado.features_to_scale:
+            for attr in atributos:
+                np.testing.assert_array_equal(getattr(pre.feature_scalers[i], attr), getattr(originales[i], attr))
+                np.testing.assert_array_equal(getattr(esperado.feature_scalers[i], attr), getattr(originales[i], attr))
+                np.testing.assert_array_equal(getattr(vistas.feature_scalers[i], attr), getattr(originales[i], attr))
+        for i, name in enumerate(["temp_c", "humidity"]):
+            for attr in atributos:
+                np.testing.assert_array_equal(getattr(pre.target_scalers[name], attr), getattr(esperado_y[i], attr))
+        # Las filas base se cuentan una vez, no una por cada ventana que las contiene
+        self.assertEqual(pre.feature_scalers[0].n_samples_seen_, len(train.input_rows()))
+        self.assertEqual(esperado.feature_scalers[0].n_samples_seen_, originales[0].n_samples_seen_)
+
+    def test_PP_06(self):
+        """PP-06: en un día con cambio de horario cada hora queda en su hora local de pared"""
+        # Europe/Madrid, 2025-03-30: de 02:00 se pasa a 03:00 (UTC+1 -> UTC+2), el día tiene 23 horas
+        payload = make_day_payload("2025-03-30")
+        dia = np.datetime64("2025-03-30T00:00", "s")
+        horas = [h for h in range(24) if h != 2]
+        payload["forecast"]["forecastday"][0]["hour"] = [
+            dict(payload["forecast"]["forecastday"][0]["hour"][h],
+                 time=str(dia + np.timedelta64(h, "h")).replace("T", " ")[:16],
+                 time_epoch=int((dia + np.timedelta64(h, "h")).astype(np.int64)) - (3600 if h < 2 else 7200))
+            for h in horas
+        ]
+        epochs, values = extract_hourly_arrays([payload])
+        np.testing.assert_array_equal((epochs - dia.astype(np.int64)) // 3600, horas)
+        self.assertEqual(values[-1, 1], payload["forecast"]["forecastday"][0]["hour"][-1]["temp_c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import copy
+import tempfile
+import unittest
+import sys, os
+
+import numpy as np
+import pandas as pd
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Controllers.model_build import TimeSeriesModel
+from Controllers.model_registry import ModelBundle, ModelRegistry
+from Controllers.quantization import TFLiteModel, quantize_version
+from Etl.observation_store import OBS_COLUMNS
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Utils.config import CONFIG
+
+PKL = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data_train/scalers.pkl"))
+
+
+def _frame(hours=600):
+    rng = np.random.default_rng(0)
+    t = np.arange(hours)
+    values = np.column_stack([
+        1020 + rng.normal(size=hours),
+        18 + 5 * np.sin(2 * np.pi * t / 24),
+        12 + rng.normal(size=hours),
+        70 + 10 * np.cos(2 * np.pi * t / 24),
+        rng.uniform(0, 20, hours),
+        rng.uniform(0, 360, hours),
+    ])
+    index = pd.date_range("2025-01-01", periods=hours, freq="h", name="datetime")
+    return pd.DataFrame(values, columns=OBS_COLUMNS, index=index)
+
+
+class QuantizationTest(unittest.TestCase):
+    """Test de las variantes cuantizadas y su compuerta de precisión"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._config = copy.deepcopy(CONFIG)
+        CONFIG["INFERENCIA"]["BUCKET_MAX"] = 4
+        cls.tmp = tempfile.TemporaryDirectory()
+        model_path = os.path.join(cls.tmp.name, "model.keras")
+        TimeSeriesModel(units=8).build_model(input_shape=(24, len(FEATURE_COLUMNS))).save(model_path)
+        cls.registry = ModelRegistry(os.path.join(cls.tmp.name, "registry"))
+        cls.version = cls.registry.register(model_path, scaler_pkl=PKL)
+        cls.report = quantize_version(cls.registry, cls.version, variants=("float16",),
+                                      frame=_frame(), tolerance=0.5)
+
+    @classmethod
+    def tearDownClass(cls):
+        CONFIG.clear()
+        CONFIG.update(cls._config)
+        cls.tmp.cleanup()
+
+    def test_QZ_01(self):
+        """QZ-01: el reporte incluye precisión, latencia y tamaño, y la variante pasa la compuerta"""
+        self.assertEqual(set(self.report), {"float32", "float16"})
+        for info in self.report.values():
+            self.assertEqual(set(info["latency_ms"]), {"1", "8", "64"})
+            self.assertGreater(info["size_bytes"], 0)
+        self.assertTrue(self.report["float16"]["accepted"])
+        metadata = self.registry.metadata(self.version)
+        self.assertEqual(metadata["quantization"]["buckets"], [1, 2, 4])
+
+    def test_QZ_02(self):
+        """QZ-02: la variante servida predice como el modelo float32 para cualquier lote"""
+        bundle = ModelBundle.load(self.registry, self.version, TimeSeriesPreprocessor(), variant="float16")
+        self.assertIsInstance(bundle.model, TFLiteModel)
+        self.assertEqual(bundle.variant, "float16")
+        base = TimeSeriesModel().load(os.path.join(self.registry.version_dir(self.version), "model.keras"))
+        x = np.random.default_rng(1).uniform(-1, 1, size=(7, 24, len(FEATURE_COLUMNS)))
+        np.testing.assert_allclose(bundle.model.predict(x), base.predict(x), atol=1e-2)
+        self.assertEqual(bundle.model.predict(x[:0]).shape, (0, 24, 2))
+
+    def test_QZ_03(self):
+        """QZ-03: una variante que empeora más que la tolerancia se rechaza y se sirve float32"""
+        report = quantize_version(self.registry, self.version, variants=("int8",),
+                                  frame=_frame(), tolerance=-1.0)
+        self.assertFalse(report["int8"]["accepted"])
+        bundle = ModelBundle.load(self.registry, self.version, TimeSeriesPreprocessor(), variant="int8")
+        self.assertEqual(bundle.variant, "float32")
+        self.assertIsInstance(bundle.model, TimeSeriesModel)
+
+
+if __name__ == "__main__":
+    unittest.main()
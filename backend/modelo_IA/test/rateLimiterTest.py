@@ -0,0 +1,72 @@
+import asyncio
+import time
+import unittest
+import sys, os
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Utils import rate_limiter
+from Utils.config import CONFIG
+from Utils.rate_limiter import PRIORIDAD_FONDO, PRIORIDAD_INTERACTIVA, OutboundScheduler
+
+
+class RateLimiterTest(unittest.TestCase):
+    """Test del planificador de llamadas salientes"""
+
+    def test_RL_01(self):
+        """RL-01: la ráfaga sale de inmediato y el resto respeta la tasa"""
+        scheduler = OutboundScheduler(rate=50, burst=5)
+
+        async def run():
+            started = time.monotonic()
+            await asyncio.gather(*(scheduler.acquire() for _ in range(15)))
+            return time.monotonic() - started
+
+        elapsed = asyncio.run(run())
+        # 5 tokens iniciales + 10 a 50/s -> ~0.2 s
+        self.assertGreater(elapsed, 0.15)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(scheduler.stats()["wait"]["interactiva"]["granted"], 15)
+
+    def test_RL_02(self):
+        """RL-02: las solicitudes interactivas adelantan a las de fondo en cola"""
+        scheduler = OutboundScheduler(rate=20, burst=1)
+        order = []
+
+        async def call(priority, name):
+            await scheduler.acquire(priority)
+            order.append(name)
+
+        async def run():
+            await scheduler.acquire()  # agota la ráfaga
+            tasks = [asyncio.ensure_future(call(PRIORIDAD_FONDO, f"fondo-{i}")) for i in range(3)]
+            await asyncio.sleep(0)
+            tasks += [asyncio.ensure_future(call(PRIORIDAD_INTERACTIVA, f"web-{i}")) for i in range(2)]
+            await asyncio.sleep(0)
+            depth = scheduler.stats()["queue_depth"]
+            await asyncio.gather(*tasks)
+            return depth
+
+        depth = asyncio.run(run())
+        self.assertEqual(depth, {"interactiva": 2, "fondo": 3})
+        self.assertEqual(order, ["web-0", "web-1", "fondo-0", "fondo-1", "fondo-2"])
+
+    def test_RL_03(self):
+        """RL-03: con N workers cada uno recibe 1/N de la cuota del plan"""
+        cfg = CONFIG["WEATHER_API"]
+        original = dict(cfg)
+        try:
+            cfg.update(RATE_PER_S=10.0, BURST=20)
+            rate_limiter.split_quota(4)
+            bucket = rate_limiter.get_scheduler().bucket
+            self.assertEqual((bucket.rate, bucket.capacity), (2.5, 5.0))
+            rate_limiter.split_quota(8)
+            self.assertEqual(cfg["BURST"], 1)
+        finally:
+            cfg.update(original)
+            rate_limiter._scheduler = None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+import sys, os
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Utils.single_flight import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    """Test de la coalescencia de trabajos idénticos en curso"""
+
+    def test_SF_01(self):
+        """SF-01: solicitudes concurrentes con la misma clave ejecutan el trabajo una vez"""
+        group = SingleFlight()
+        calls = []
+
+        async def work(city):
+            calls.append(city)
+            await asyncio.sleep(0.05)
+            return city.upper()
+
+        async def run():
+            return await asyncio.gather(
+                *(group.do(("manizales", 2), work, "manizales") for _ in range(20)),
+                group.do(("bogota", 2), work, "bogota"),
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(results[:20], ["MANIZALES"] * 20)
+        self.assertEqual(sorted(calls), ["bogota", "manizales"])
+        self.assertEqual(group.stats(), {"executed": 2, "coalesced": 19, "in_flight": 0})
+
+    def test_SF_02(self):
+        """SF-02: un error llega a todas las solicitudes que esperaban"""
+        group = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            raise ValueError("sin datos")
+
+        async def run():
+            return await asyncio.gather(
+                *(group.do("k", work) for _ in range(5)), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(group.stats()["executed"], 1)
+
+    def test_SF_03(self):
+        """SF-03: cancelar la solicitud que inició el trabajo no afecta a las demás"""
+        group = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return 42
+
+        async def run():
+            first = asyncio.ensure_future(group.do("k", work))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(group.do("k", work))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(run()), 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
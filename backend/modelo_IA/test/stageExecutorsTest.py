@@ -0,0 +1,157 @@
+import asyncio
+import gc
+import tempfile
+import time
+import unittest
+import sys, os
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.dirname(__file__))
+
+os.environ.setdefault("DB_PORT", "3306")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.tables
+from config.db import Base
+from Controllers import model_registry
+from Controllers.model_registry import ModelRegistry
+from Etl import observation_store
+from Etl.observation_store import HourlyObservationStore
+from Utils import history_cache, prediction_audit, rate_limiter, resilience, stage_executors
+from Utils.config import CONFIG
+from Utils.history_cache import HistoryCache
+from Utils.prediction_audit import PredictionAuditLog
+from Utils.stage_executors import LoopLagMonitor, StagePipeline, get_stages, run_stage
+from weather_stub import WeatherStubServer
+
+DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data_train"))
+CIUDADES = ["manizales", "bogota", "cali", "pereira", "medellin", "armenia", "pasto", "neiva"]
+
+
+class StageExecutorsTest(unittest.TestCase):
+    """Test de los ejecutores por etapa y del retraso del bucle de eventos"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.server = WeatherStubServer(delay=0.01).start()
+        cls.base_url = CONFIG["WEATHER_API"]["BASE_URL"]
+        CONFIG["WEATHER_API"]["BASE_URL"] = cls.server.base_url
+        history_cache._history_cache = HistoryCache(":memory:")
+        observation_store._observation_store = HourlyObservationStore(os.path.join(cls.tmp.name, "obs"))
+        prediction_audit._prediction_audit = PredictionAuditLog(os.path.join(cls.tmp.name, "audit"))
+        rate_limiter._scheduler = None
+        resilience._breaker = None
+        resilience._forecast_latency = None
+
+        registry = ModelRegistry(os.path.join(cls.tmp.name, "registry"))
+        version = registry.register(
+            os.path.join(DATA, "modelo_lstm_mejorado.keras"), scaler_pkl=os.path.join(DATA, "scalers.pkl")
+        )
+        registry.set_active(version)
+        model_registry._model_registry = registry
+
+        from Controllers.prediction_controller import PredictionController
+
+        cls.controller = PredictionController()
+        # Como en el lifespan: la carga y el calentamiento no cuentan en la medición
+        asyncio.run(cls.controller.warmup())
+        # Como al quedar listo el servicio (StartupLifecycle.freeze_heap)
+        gc.freeze()
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.unfreeze()
+        CONFIG["WEATHER_API"]["BASE_URL"] = cls.base_url
+        history_cache._history_cache = None
+        observation_store._observation_store = None
+        prediction_audit._prediction_audit.close()
+        prediction_audit._prediction_audit = None
+        model_registry._model_registry = None
+        rate_limiter._scheduler = None
+        resilience._breaker = None
+        resilience._forecast_latency = None
+        cls.server.stop()
+        cls.tmp.cleanup()
+
+    def test_SE_01(self):
+        """SE-01: cada etapa cuenta su cola y propaga los errores"""
+        pipeline = StagePipeline(sizes={"llm": 1})
+
+        def fail():
+            raise ValueError("falla")
+
+        async def run():
+            await asyncio.gather(*(pipeline.run("llm", time.sleep, 0.05) for _ in range(4)))
+            with self.assertRaises(ValueError):
+                await pipeline.run("llm", fail)
+
+        asyncio.run(run())
+        stats = pipeline.stats()["stages"]["llm"]
+        pipeline.shutdown()
+        self.assertEqual(stats["workers"], 1)
+        self.assertEqual(stats["submitted"], 5)
+        self.assertEqual((stats["queued"], stats["running"]), (0, 0))
+        # Con un solo hilo, tres de las cuatro llamadas esperaron en cola
+        self.assertEqual(stats["max_queued"], 3)
+        self.assertEqual(stats["failed"], 1)
+        self.assertGreater(stats["avg_wait_ms"], 10)
+
+    def test_SE_02(self):
+        """SE-02: con predicciones y llamadas lentas al LLM concurrentes el bucle no se bloquea"""
+        # Archivo y no memoria: cada sesión concurrente usa su propia conexión del pool
+        engine = create_engine(
+            "sqlite:///" + os.path.join(self.tmp.name, "load.sqlite"), connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(engine)
+        db_factory = sessionmaker(bind=engine)
+        rate_limiter._scheduler = None  # Sin la cuota de WeatherAPI para que la carga sea concurrente
+        rate, burst = CONFIG["WEATHER_API"]["RATE_PER_S"], CONFIG["WEATHER_API"]["BURST"]
+        CONFIG["WEATHER_API"]["RATE_PER_S"] = CONFIG["WEATHER_API"]["BURST"] = 1000
+
+        async def predict(city):
+            db = db_factory()
+            try:
+                forecasts, _ = await self.controller.predict_from_api(city, 3, db, user_id=1)
+                return len(forecasts)
+            finally:
+                await run_stage("persistencia", db.close)
+
+        async def run():
+            # La primera solicitud paga las importaciones diferidas (backend de anyio) y el primer flush
+            await predict("quibdo")
+            monitor = LoopLagMonitor(interval_s=0.005)
+            monitor.start()
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            # Gemini simulado: 0.3 s bloqueantes por respuesta
+            results = await asyncio.gather(
+                *(predict(city) for city in CIUDADES * 2),
+                *(run_stage("llm", time.sleep, 0.3) for _ in range(4)),
+            )
+            elapsed = time.perf_counter() - start
+            monitor.stop()
+            return results, elapsed, monitor.stats()
+
+        try:
+            results, elapsed, lag = asyncio.run(run())
+        finally:
+            CONFIG["WEATHER_API"]["RATE_PER_S"], CONFIG["WEATHER_API"]["BURST"] = rate, burst
+            rate_limiter._scheduler = None
+        self.assertEqual(results[: len(CIUDADES) * 2], [3] * len(CIUDADES) * 2)
+        self.assertGreater(lag["samples"], 20)
+        # Una sola llamada al LLM en el bucle lo habría bloqueado 300 ms
+        self.assertLess(lag["max_ms"], 100, lag)
+        self.assertLess(lag["p99_ms"], 30, lag)
+
+        stages = get_stages().stats()["stages"]
+        for name in ("io", "cpu", "inferencia", "persistencia", "llm"):
+            self.assertGreater(stages[name]["submitted"], 0, name)
+        print(f"Carga: {elapsed:.2f} s, retraso del bucle {lag}")
+
+
+if __name__ == "__main__":
+    unittest.main()
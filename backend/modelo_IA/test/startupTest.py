@@ -0,0 +1,119 @@
+import asyncio
+import time
+import unittest
+import sys, os
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Utils.startup import StartupLifecycle
+
+
+def _slow(value, seconds=0.2):
+    def load():
+        time.sleep(seconds)
+        return value
+
+    return load
+
+
+class StartupTest(unittest.TestCase):
+    """Test del ciclo de arranque de componentes"""
+
+    def test_SU_01(self):
+        """SU-01: los componentes cargan en paralelo y se reportan sus tiempos"""
+        startup = StartupLifecycle()
+        warmed = []
+
+        async def warmup(component):
+            warmed.append(component)
+
+        startup.register("modelo", _slow("m"), warmup=warmup)
+        startup.register("chatbot", _slow("c"), critical=False)
+
+        async def run():
+            start = time.perf_counter()
+            await startup.start()
+            self.assertFalse(startup.ready())
+            components = await asyncio.gather(startup.get("modelo"), startup.get("chatbot"))
+            return components, time.perf_counter() - start
+
+        components, elapsed = asyncio.run(run())
+        self.assertEqual(components, ["m", "c"])
+        self.assertLess(elapsed, 0.35)  # en serie tardarían 0.4 s
+        self.assertEqual(warmed, ["m"])
+        status = startup.status()
+        self.assertTrue(status["ready"])
+        self.assertEqual(status["components"]["modelo"]["status"], "ready")
+        self.assertGreaterEqual(status["components"]["chatbot"]["load_s"], 0.2)
+        self.assertIsNotNone(status["components"]["modelo"]["warmup_s"])
+
+    def test_SU_02(self):
+        """SU-02: un componente no crítico con error no bloquea la disponibilidad"""
+        startup = StartupLifecycle()
+
+        def broken():
+            raise OSError("modelo de spaCy no encontrado")
+
+        startup.register("modelo", _slow("m", 0.0))
+        startup.register("chatbot", broken, critical=False)
+
+        async def run():
+            # Sin start(): el componente se carga la primera vez que se pide
+            self.assertEqual(await startup.get("modelo"), "m")
+            with self.assertRaises(OSError):
+                await startup.get("chatbot")
+
+        asyncio.run(run())
+        self.assertTrue(startup.ready())
+        self.assertEqual(startup.components["chatbot"]["status"], "error")
+
+    def test_SU_03(self):
+        """SU-03: se registra solo la primera solicitud exitosa fuera de las rutas de salud"""
+        startup = StartupLifecycle()
+        startup.record_request("/health/ready", 200)
+        startup.record_request("/predict_future_weather/", 500)
+        self.assertIsNone(startup.first_success)
+        startup.record_request("/predict_future_weather/", 200)
+        startup.record_request("/admin/metrics/", 200)
+        self.assertEqual(startup.first_success["path"], "/predict_future_weather/")
+
+    def test_SU_04(self):
+        """SU-04: una carga fallida se reintenta pasada la espera; los críticos se reintentan solos"""
+        startup = StartupLifecycle(retry_s=0.1)
+        calls = {"modelo": 0, "chatbot": 0}
+
+        def flaky(name, value):
+            def load():
+                calls[name] += 1
+                if calls[name] == 1:
+                    raise OSError(f"{name} no disponible")
+                return value
+
+            return load
+
+        startup.register("modelo", flaky("modelo", "m"))
+        startup.register("chatbot", flaky("chatbot", "c"), critical=False)
+
+        async def run():
+            await startup.start()
+            with self.assertRaises(OSError):
+                await startup.get("chatbot")
+            # Durante la espera se relanza el error sin volver a cargar
+            with self.assertRaises(OSError):
+                await startup.get("chatbot")
+            self.assertEqual(calls["chatbot"], 1)
+            self.assertFalse(startup.ready())
+            await asyncio.sleep(0.2)
+            # El modelo (crítico) se reintentó sin que nadie lo pidiera
+            self.assertTrue(startup.ready())
+            self.assertEqual(calls["modelo"], 2)
+            self.assertEqual(await startup.get("chatbot"), "c")
+            self.assertEqual(calls["chatbot"], 2)
+
+        asyncio.run(run())
+        self.assertEqual(startup.components["chatbot"]["status"], "ready")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Etl.dataset import TimeSeriesDataset, column_view
+from Etl.observation_store import OBS_COLUMNS
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from Etl.training_store import TrainingDataStore
+
+TARGETS = ["temp_c", "humidity"]
+
+
+def _city_frame(city, n, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "datetime": pd.date_range("2021-01-01", periods=n, freq="h"),
+        "pressure_mb": rng.uniform(990, 1030, n).round(1),
+        "temp_c": rng.uniform(-5, 35, n).round(1),
+        "dewpoint_c": rng.uniform(-10, 25, n).round(1),
+        "humidity": rng.integers(10, 100, n).astype(float),
+        "wind_kph": rng.uniform(0, 40, n).round(1),
+        "wind_degree": rng.integers(0, 360, n).astype(float),
+    })
+    df["condition"] = "Soleado"
+    df["city"] = city
+    return df
+
+
+def _legacy_features(csv_path, city):
+    """Ruta original: read_csv completo y preprocesamiento sobre el DataFrame."""
+    df = pd.read_csv(csv_path, index_col="datetime", parse_dates=["datetime"])
+    df = df[df["city"] == city][OBS_COLUMNS]
+    tiempo_s = df.index.map(pd.Timestamp.timestamp)
+    pre = TimeSeriesPreprocessor()
+    df = pre.process_wind_data(pre.add_cyclical_features(df, tiempo_s))
+    return df.reset_index().drop(columns=["datetime"])
+
+
+class TrainingStoreTest(unittest.TestCase):
+    """Test del almacén columnar de entrenamiento"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.csv = os.path.join(self.tmp, "datos.csv")
+        bogota, lima = _city_frame("Bogotá", 700, 1), _city_frame("Lima", 500, 2)
+        # Ciudades intercaladas por tramos: cada una sigue en orden cronológico
+        pd.concat([bogota[:300], lima[:200], bogota[300:], lima[200:]]).to_csv(self.csv, index=False)
+        self.store = TrainingDataStore(os.path.join(self.tmp, "store"), rows_per_group=128, batch_rows=100)
+        self.store.block_bytes = 8 * 1024
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_TS_01(self):
+        """TS-01: ingesta por bloques a Parquet tipado y características por bloques iguales a la ruta pandas"""
+        self.assertEqual(self.store.ingest_csv(self.csv), ["bogota", "lima"])
+        self.assertEqual(self.store.series(), ["bogota", "lima"])
+        self.assertEqual(self.store.n_rows("bogota"), 700)
+
+        parquet = pq.ParquetFile(self.store._path("lima", "parquet"))
+        self.assertEqual(parquet.schema_arrow.names, ["datetime"] + OBS_COLUMNS)
+        self.assertTrue(pa.types.is_timestamp(parquet.schema_arrow.field("datetime").type))
+        self.assertEqual(parquet.schema_arrow.field("temp_c").type, pa.float64())
+        self.assertGreater(parquet.metadata.num_row_groups, 1)
+
+        for city, serie in (("Bogotá", "bogota"), ("Lima", "lima")):
+            features = self.store.features(serie)
+            self.assertIsInstance(features, np.memmap)
+            esperado = _legacy_features(self.csv, city)
+            self.assertEqual(list(esperado.columns), FEATURE_COLUMNS)
+            np.testing.assert_array_equal(features, esperado.to_numpy())
+
+        # Filas fuera de orden: error y ningún Parquet a medio escribir
+        desordenado = os.path.join(self.tmp, "desordenado.csv")
+        df = _city_frame("Quito", 50, 3)
+        pd.concat([df[25:], df[:25]]).to_csv(desordenado, index=False)
+        with self.assertRaises(ValueError):
+            self.store.ingest_csv(desordenado)
+        self.assertEqual(self.store.series(), ["bogota", "lima"])
+        self.assertEqual([f for f in os.listdir(self.store.root) if f.endswith(".tmp")], [])
+
+    def test_TS_02(self):
+        """TS-02: ventanas por serie sobre los memmaps iguales a la ruta en memoria"""
+        series = self.store.ingest_csv(self.csv)
+        target_idxs = [FEATURE_COLUMNS.index(c) for c in TARGETS]
+        dataset = TimeSeriesDataset()
+        features = [self.store.features(serie) for serie in series]
+        windows = dataset.prepare_series_windows([(a, column_view(a, target_idxs)) for a in features])
+
+        # Ninguna ventana cruza de una ciudad a otra
+        por_serie = [dataset.prepare_windows(pd.DataFrame(a, columns=FEATURE_COLUMNS), TARGETS) for a in features]
+        for name in ("train", "val", "test"):
+            np.testing.assert_array_equal(windows[name].x, np.concatenate([w[name].x for w in por_serie]))
+            np.testing.assert_array_equal(windows[name].y, np.concatenate([w[name].y for w in por_serie]))
+        frontera = len(por_serie[0]["train"])
+        indices = np.array([frontera - 1, frontera, 0, len(windows["train"]) - 1])
+        x_lote, y_lote = windows["train"].batch(indices)
+        np.testing.assert_array_equal(x_lote, windows["train"].x[indices])
+        np.testing.assert_array_equal(y_lote, windows["train"].y[indices])
+
+    def test_TS_03(self):
+        """TS-03: el CSV se vuelve a ingerir solo si es más reciente que sus Parquet"""
+        self.assertEqual(self.store.sync_csv(self.csv), ["bogota", "lima"])
+        parquet = self.store._path("bogota", "parquet")
+        features = self.store.features("bogota")
+        mtime = os.path.getmtime(parquet)
+        self.assertEqual(self.store.sync_csv(self.csv), ["bogota", "lima"])
+        self.assertEqual(os.path.getmtime(parquet), mtime)
+
+        # CSV nuevo, sin Lima y con más horas de Bogotá: se reingiere y Lima se borra
+        _city_frame("Bogotá", 800, 1).to_csv(self.csv, index=False)
+        os.utime(self.csv, (mtime + 10, mtime + 10))
+        self.assertEqual(self.store.sync_csv(self.csv), ["bogota"])
+        self.assertEqual(self.store.series(), ["bogota"])
+        self.assertFalse([f for f in os.listdir(self.store.root) if f.startswith("lima.")])
+        self.assertEqual(len(self.store.features("bogota")), 800)
+        self.assertEqual(len(features), 700)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import asyncio
+import email.utils
+import time
+import unittest
+import sys, os
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+sys.path.append(os.path.dirname(__file__))
+
+from Controllers import weather_api
+from Utils import history_cache, rate_limiter, resilience
+from Utils.config import CONFIG
+from Utils.history_cache import HistoryCache
+from weather_stub import WeatherStubServer, make_day_payload
+
+
+class WeatherApiTest(unittest.TestCase):
+    """Test del cliente de WeatherAPI contra un servidor local"""
+
+    def setUp(self):
+        self.server = WeatherStubServer(delay=0.2).start()
+        self.base_url = CONFIG["WEATHER_API"]["BASE_URL"]
+        CONFIG["WEATHER_API"]["BASE_URL"] = self.server.base_url
+        history_cache._history_cache = HistoryCache(":memory:")
+        rate_limiter._scheduler = None
+        resilience._breaker = None
+        resilience._forecast_latency = None
+        self.config = dict(CONFIG["WEATHER_API"])
+
+    def tearDown(self):
+        CONFIG["WEATHER_API"].update(self.config)
+        CONFIG["WEATHER_API"]["BASE_URL"] = self.base_url
+        history_cache._history_cache = None
+        rate_limiter._scheduler = None
+        resilience._breaker = None
+        resilience._forecast_latency = None
+        self.server.stop()
+
+    def test_WA_01(self):
+        """WA-01: las llamadas de history y forecast se lanzan a la vez"""
+
+        async def run():
+            async with weather_api._build_client() as client:
+                return await weather_api.fetch_weather_async("manizales", 7, 7, client=client)
+
+        datos, info = asyncio.run(run())
+        self.assertEqual(len(datos), 7)
+        self.assertEqual(len(info), 7)
+        self.assertEqual(self.server.count("history.json"), 7)
+        # 8 solicitudes de 0.2 s cada una: en serie tardarían 1.6 s
+        self.assertEqual(self.server.max_in_flight, 8)
+
+    def test_WA_02(self):
+        """WA-02: la API síncrona conserva el orden de fechas y el formato"""
+        datos = weather_api.get_data("manizales", 3)
+        fechas = [d["forecast"]["forecastday"][0]["date"] for d in datos]
+        self.assertEqual(fechas, sorted(fechas, reverse=True))
+        df = weather_api.extract_hourly_data(datos)
+        self.assertEqual(len(df), 72)
+
+    def test_WA_03(self):
+        """WA-03: un error HTTP no rompe la descarga, se omite el día"""
+        self.server.fail_status = 500
+        self.assertEqual(weather_api.get_data("manizales", 2), [])
+        self.assertEqual(weather_api.extract_additional_info("manizales", 2), [])
+
+    def test_WA_04(self):
+        """WA-04: los días pasados se sirven desde el caché en la segunda solicitud"""
+        weather_api.get_data("Manizales", 3)
+        datos = weather_api.get_data("  manizáles ", 3)
+        self.assertEqual(len(datos), 3)
+        self.assertEqual(self.server.count("history.json"), 3)
+        stats = history_cache.get_history_cache().stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 3))
+
+    def test_WA_05(self):
+        """WA-05: ante un 429 se pausa la cuota y se reintenta la solicitud"""
+        self.server.fail_status = 429
+        self.server.fail_times = 1
+        CONFIG["WEATHER_API"]["RETRY_AFTER_S"] = 0.1
+        datos = weather_api.get_data("manizales", 1)
+        self.assertEqual(len(datos), 1)
+        self.assertEqual(self.server.count("history.json"), 2)
+        self.assertEqual(rate_limiter.get_scheduler().stats()["throttled"], 1)
+
+    def test_WA_06(self):
+        """WA-06: tras varios fallos el circuito se abre y deja de enviar tráfico"""
+        CONFIG["WEATHER_API"]["BREAKER_FALLOS"] = 2
+        CONFIG["WEATHER_API"]["BREAKER_RESET_S"] = 0.3
+        self.server.fail_status = 503
+        weather_api.get_data("manizales", 2)
+        weather_api.get_data("bogota", 2)
+        self.assertEqual(self.server.count("history.json"), 2)
+        self.assertEqual(resilience.get_breaker().stats()["state"], resilience.ABIERTO)
+
+        # Pasado el tiempo de espera sale una sola sonda; si funciona se cierra
+        self.server.fail_status = None
+        time.sleep(0.35)
+        datos = weather_api.get_data("bogota", 2)
+        self.assertEqual(resilience.get_breaker().stats()["state"], resilience.CERRADO)
+        self.assertEqual(len(datos), 1)  # el segundo día llegó con el circuito semiabierto
+        self.assertEqual(len(weather_api.get_data("bogota", 2)), 2)
+
+    def test_WA_07(self):
+        """WA-07: con el circuito abierto se sirven los últimos datos en caché"""
+        CONFIG["WEATHER_API"]["BREAKER_FALLOS"] = 1
+        info = weather_api.extract_additional_info("manizales", 2)
+        hoy = weather_api.get_data("manizales", 0)
+        history_cache.get_history_cache().today_ttl_s = 1e-9
+
+        self.server.fail_status = 503
+        weather_api.get_data("otra", 1)
+        self.assertEqual(resilience.get_breaker().stats()["state"], resilience.ABIERTO)
+
+        peticiones = len(self.server.requests)
+        self.assertEqual(weather_api.extract_additional_info("manizales", 2), info)
+        self.assertEqual(weather_api.get_data("manizales", 0), hoy)
+        self.assertEqual(len(self.server.requests), peticiones)
+
+    def test_WA_08(self):
+        """WA-08: forecast.json lento se duplica tras el retardo y gana el duplicado"""
+        CONFIG["WEATHER_API"]["HEDGE_FORECAST"] = True
+        CONFIG["WEATHER_API"]["HEDGE_DELAY_S"] = 0.1
+        self.server.delay = 0.0
+        self.server.delays = [1.5]
+        started = time.monotonic()
+        info = weather_api.extract_additional_info("manizales", 2)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(len(info), 2)
+        self.assertEqual(self.server.count("forecast.json"), 2)
+        stats = resilience.get_forecast_latency().stats()
+        self.assertEqual((stats["hedges_sent"], stats["hedges_won"]), (1, 1))
+
+    def test_WA_09(self):
+        """WA-09: Retry-After en segundos o como fecha HTTP; lo ilegible usa la espera por defecto"""
+        self.assertEqual(weather_api._retry_after_s("3", 1.0), 3.0)
+        self.assertEqual(weather_api._retry_after_s(None, 1.0), 1.0)
+        en_diez = email.utils.formatdate(time.time() + 10, usegmt=True)
+        self.assertAlmostEqual(weather_api._retry_after_s(en_diez, 1.0), 10.0, delta=1.5)
+        self.assertEqual(weather_api._retry_after_s("Wed, 21 Oct 2015 07:28:00 GMT", 1.0), 0.0)
+        for value in ("pronto", "-5", "nan", "inf"):
+            self.assertEqual(weather_api._retry_after_s(value, 1.0), 1.0)
+
+        # Un 429 con fecha HTTP se reintenta en vez de abortar la descarga
+        self.server.fail_status = 429
+        self.server.fail_times = 1
+        self.server.fail_headers = {"Retry-After": email.utils.formatdate(time.time(), usegmt=True)}
+        self.assertEqual(len(weather_api.get_data("manizales", 1)), 1)
+        self.assertEqual(self.server.count("history.json"), 2)
+
+
+class HistoryCacheTest(unittest.TestCase):
+    """Test del caché persistente de días históricos"""
+
+    def test_HC_01(self):
+        """HC-01: el día actual vence tras su TTL; los días pasados no"""
+        cache = HistoryCache(":memory:", today_ttl_s=1)
+        cache.put("manizales", "2025-01-01", make_day_payload("2025-01-01"))
+        cache.put("manizales", "2025-01-02", make_day_payload("2025-01-02"))
+        cache._conn.execute("UPDATE history SET stored_at = stored_at - 10")
+        self.assertIsNotNone(cache.get("manizales", "2025-01-01", today="2025-01-02"))
+        self.assertIsNone(cache.get("manizales", "2025-01-02", today="2025-01-02"))
+        self.assertIsNotNone(
+            cache.get("manizales", "2025-01-02", today="2025-01-02", allow_stale=True)
+        )
+
+    def test_HC_02(self):
+        """HC-02: al superar el tamaño máximo se desaloja la entrada menos usada"""
+        payload = make_day_payload("2025-01-01")
+        cache = HistoryCache(":memory:")
+        cache.put("a", "2025-01-01", payload)
+        cache.max_bytes = int(cache.stats()["bytes"] * 2.5)
+        cache.put("b", "2025-01-01", payload)
+        cache._conn.execute("UPDATE history SET accessed_at = accessed_at - 5 WHERE city = 'b'")
+        cache.get("a", "2025-01-01")
+        cache.put("c", "2025-01-01", payload)
+        self.assertIsNone(cache.get("b", "2025-01-01"))
+        self.assertIsNotNone(cache.get("a", "2025-01-01"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Servidor HTTP local que imita los endpoints history.json y forecast.json de
+WeatherAPI, para probar el cliente sin salir a internet.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Diferencia horaria de America/Bogota respecto a UTC, en segundos
+TZ_OFFSET_S = -5 * 3600
+
+
+def make_day_payload(date, city="manizales", base_temp=18.0):
+    """Genera una respuesta history.json sintética (24 horas) para una fecha."""
+    day = datetime.strptime(date, "%Y-%m-%d")
+    hours = []
+    for h in range(24):
+        local = day + timedelta(hours=h)
+        local_epoch = int((local - datetime(1970, 1, 1)).total_seconds())
+        hours.append(
+            {
+                "time_epoch": local_epoch - TZ_OFFSET_S,
+                "time": local.strftime("%Y-%m-%d %H:%M"),
+                "temp_c": base_temp + (h % 12) * 0.5,
+                "pressure_mb": 1012.0 + (h % 5),
+                "dewpoint_c": 12.0 + (h % 3) * 0.1,
+                "humidity": 70 + (h % 10),
+                "wind_kph": 7.2 + h * 0.1,
+                "wind_degree": (h * 15) % 360,
+                "cloud": 40,
+                "uv": 3.0,
+            }
+        )
+    return {
+        "location": {"name": city.title(), "tz_id": "America/Bogota"},
+        "forecast": {"forecastday": [{"date": date, "day": {}, "astro": {}, "hour": hours}]},
+    }
+
+
+def make_forecast_payload(days, city="manizales"):
+    """Genera una respuesta forecast.json sintética desde la fecha actual."""
+    today = datetime.now()
+    forecastday = []
+    for i in range(days):
+        date = (today + timedelta(days=i)).strftime("%Y-%m-%d")
+        forecastday.append(make_day_payload(date, city)["forecast"]["forecastday"][0])
+    return {
+        "location": {"name": city.title(), "tz_id": "America/Bogota"},
+        "current": {"temp_c": 20.0},
+        "forecast": {"forecastday": forecastday},
+        "alerts": {"alert": []},
+    }
+
+
+class WeatherStubServer:
+    """
+    Servidor de pruebas en un hilo. Permite simular latencia (`delay`, o
+    `delays` para las próximas solicitudes),
+    errores HTTP (`fail_status`, las primeras `fail_times` solicitudes o todas
+    si es None, con las cabeceras `fail_headers`; `fail_cities` responde 400 para esas ciudades) y cuenta las solicitudes recibidas por endpoint.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.delays = []  # latencias puntuales para las próximas solicitudes
+        self.fail_status = None
+        self.fail_times = None
+        self.fail_headers = {}
+        self.fail_cities = set()
+        self.requests = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/v1"
+
+    def count(self, endpoint):
+        with self.lock:
+            return sum(1 for path, _ in self.requests if path.endswith(endpoint))
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _should_fail(self):
+        with self.lock:
+            if not self.fail_status:
+                return False
+            if self.fail_times is None:
+                return True
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                return True
+            return False
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                with server.lock:
+                    server.requests.append((parsed.path, params))
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    with server.lock:
+                        delay = server.delays.pop(0) if server.delays else server.delay
+                    if delay:
+                        time.sleep(delay)
+                    if params.get("q") in server.fail_cities:
+                        self._send(400, {"error": {"message": "No matching location found."}})
+                    elif server._should_fail():
+                        self._send(server.fail_status, {"error": {"message": "stub"}}, server.fail_headers)
+                    elif parsed.path.endswith("history.json"):
+                        self._send(200, make_day_payload(params["dt"], params["q"]))
+                    elif parsed.path.endswith("forecast.json"):
+                        self._send(200, make_forecast_payload(int(params["days"]), params["q"]))
+                    else:
+                        self._send(404, {})
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def _send(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
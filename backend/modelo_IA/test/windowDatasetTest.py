@@ -0,0 +1,70 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# aseguramos que los módulos del backend estén en el path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from Controllers.model_build import TimeSeriesModel, window_dataset
+from Etl.dataset import TimeSeriesDataset, WindowedSeries, column_view
+from Etl.preprocessor import FEATURE_COLUMNS, TimeSeriesPreprocessor
+from datasetTest import _frame
+
+TARGETS = ["temp_c", "humidity"]
+
+
+def _starts(dataset):
+    """Fila inicial de cada ventana (la columna 0 de la serie es el número de fila)."""
+    return np.concatenate([x[:, 0, 0] for x, _ in dataset.as_numpy_iterator()]).astype(int)
+
+
+class WindowDatasetTest(unittest.TestCase):
+    """Test de la canalización tf.data de entrenamiento"""
+
+    def test_TD_01(self):
+        """TD-01: los lotes de tf.data escalados en el grafo son los de la ruta original (split_data + ventanas copiadas)"""
+        df = _frame(900, seed=3)
+        dataset = TimeSeriesDataset()
+        legacy = dataset.prepare_dataset(df, target_col=TARGETS)
+        pre = TimeSeriesPreprocessor().fit_scalers(legacy["x_train"])
+        pre.fit_target_scaler(legacy["y_train"], TARGETS)
+
+        windows = dataset.prepare_windows(df, target_col=TARGETS)
+        for name in ("train", "val", "test"):
+            lotes = list(window_dataset(windows[name], 64, pre).as_numpy_iterator())
+            x = np.concatenate([x for x, _ in lotes])
+            y = np.concatenate([y for _, y in lotes])
+            np.testing.assert_array_equal(x, pre.scale_features(legacy[f"x_{name}"]).astype(np.float32))
+            np.testing.assert_array_equal(y, pre.scale_target(legacy[f"y_{name}"], TARGETS).astype(np.float32))
+
+        solo_x = next(window_dataset(windows["test"], 16, pre, targets=False).as_numpy_iterator())
+        self.assertEqual(solo_x.shape, (16, 24, len(FEATURE_COLUMNS)))
+
+        model = TimeSeriesModel(units=8).build_model(input_shape=(24, len(FEATURE_COLUMNS)))
+        metrics, _ = model.evaluate_windows(windows["test"], scaler=pre, batch_size=64)
+        esperado, _ = model.evaluate(pre.scale_features(legacy["x_test"]), pre.scale_target(legacy["y_test"], TARGETS), scaler=pre)
+        self.assertAlmostEqual(metrics["mae"], esperado["mae"], places=5)
+
+    def test_TD_02(self):
+        """TD-02: barajado acotado sin repetir ventanas, distinto en cada época, y caché en archivo"""
+        rows = np.arange(600, dtype=np.float64)[:, None] * np.ones(len(FEATURE_COLUMNS))
+        series = WindowedSeries(rows, column_view(rows, [1, 3]))
+        tmp = tempfile.mkdtemp()
+        try:
+            for cache in (None, os.path.join(tmp, "train")):
+                dataset = window_dataset(series, 32, shuffle=True, cache=cache)
+                primera, segunda = _starts(dataset), _starts(dataset)
+                np.testing.assert_array_equal(np.sort(primera), np.arange(len(series)))
+                np.testing.assert_array_equal(np.sort(segunda), np.arange(len(series)))
+                self.assertFalse(np.array_equal(primera, segunda))
+            self.assertTrue(any(f.startswith("train") for f in os.listdir(tmp)))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()